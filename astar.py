@@ -1,6 +1,7 @@
 from maze import MazeGenerator
 import heapq
 import time
+from array import array
 import argparse
 
 def manhattan_distance(c1, c2):
@@ -9,15 +10,26 @@ def manhattan_distance(c1, c2):
     
     return abs(c1[0] - c2[0]) + abs(c1[1] - c2[1])
 
-def solve_maze_astar(maze_gen):
+def solve_maze_astar(maze_gen, probe=None, heuristic=None):
     """
     Solve the maze using the A* algorithm with four metrics_astar:
       1. runtime_astar (seconds)
       2. states_expanded_astar (cells popped from the priority queue)
       3. peak_memory_usage_astar (max queue size)
       4. path_length_astar (length of the found path)
+      path_extraction_time_astar also reports the part of the runtime spent rebuilding the path.
+      graph_build_time_astar reports building the maze's cached neighbor graph, which is not part of the runtime.
+      With a memory_probe.MemoryProbe as probe, the sizes of the frontier, parents and g_score are recorded.
+    heuristic maps a flat cell id (row * cols + col) to a lower bound on its distance to
+    the goal, e.g. landmarks.Landmarks(maze_gen).heuristic(maze_gen.goal) for ALT;
+    the default is the Manhattan distance. It must be consistent for optimal paths.
     """
-    start_time_astar = time.time()
+    # Build the cached CSR adjacency before the timer starts, so the first solver
+    # run on a maze is not charged for it; its cost is reported on its own
+    graph_start_astar = time.perf_counter()
+    graph = maze_gen.neighbor_graph()
+    graph_build_time_astar = time.perf_counter() - graph_start_astar
+    start_time_astar = time.perf_counter()
 
     start = maze_gen.start
     goal = maze_gen.goal
@@ -26,6 +38,8 @@ def solve_maze_astar(maze_gen):
     if not (0 <= start[0] < maze_gen.rows and 0 <= start[1] < maze_gen.cols):
         return [], {
             "runtime_astar": 0,
+            "graph_build_time_astar": graph_build_time_astar,
+            "path_extraction_time_astar": 0,
             "states_expanded_astar": 0,
             "peak_memory_usage_astar": 0,
             "path_length_astar": 0
@@ -33,6 +47,8 @@ def solve_maze_astar(maze_gen):
     if not (0 <= goal[0] < maze_gen.rows and 0 <= goal[1] < maze_gen.cols):
         return [], {
             "runtime_astar": 0,
+            "graph_build_time_astar": graph_build_time_astar,
+            "path_extraction_time_astar": 0,
             "states_expanded_astar": 0,
             "peak_memory_usage_astar": 0,
             "path_length_astar": 0
@@ -40,18 +56,34 @@ def solve_maze_astar(maze_gen):
     if maze_gen.maze[start] == 1 or maze_gen.maze[goal] == 1:
         return [], {
             "runtime_astar": 0,
+            "graph_build_time_astar": graph_build_time_astar,
+            "path_extraction_time_astar": 0,
             "states_expanded_astar": 0,
             "peak_memory_usage_astar": 0,
             "path_length_astar": 0
         }
 
+    # Search over flat cell ids (row * cols + col) using the cached CSR adjacency.
+    # Ids order like (row, col) tuples, so heap ties break the same way.
+    offsets = graph.offsets_list
+    neighbors = graph.neighbors_list
+    cols = maze_gen.cols
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+    if heuristic is None:
+        def heuristic(cell):
+            return manhattan_distance(divmod(cell, cols), goal)
+
     # Priority queue holds (f_score, cell)
     open_set_astar = []
-    heapq.heappush(open_set_astar, (0, start))
+    heapq.heappush(open_set_astar, (0, start_id))
 
-    came_from_astar = {start: None}
+    # Flat search state: 4 bytes per cell each for parents and g, -1 means unset
+    num_cells = maze_gen.rows * cols
+    came_from_astar = array('i', [-1]) * num_cells
     # cost from start to current
-    g_score = {start: 0}  
+    g_score = array('i', [-1]) * num_cells
+    g_score[start_id] = 0
     states_expanded_astar = 0
     peak_memory_usage_astar = 1  
 
@@ -59,28 +91,38 @@ def solve_maze_astar(maze_gen):
         f_current, current = heapq.heappop(open_set_astar)
         states_expanded_astar += 1
 
-        if current == goal:
+        if current == goal_id:
             break  
 
-        for neighbor in maze_gen.get_neighbors(*current):
+        for neighbor in neighbors[offsets[current]:offsets[current + 1]]:
             # cost is 1 per move
             tentative_g = g_score[current] + 1 
-            if neighbor not in g_score or tentative_g < g_score[neighbor]:
+            if g_score[neighbor] < 0 or tentative_g < g_score[neighbor]:
                 g_score[neighbor] = tentative_g
-                f_score = tentative_g + manhattan_distance(neighbor, goal)
+                f_score = tentative_g + heuristic(neighbor)
                 heapq.heappush(open_set_astar, (f_score, neighbor))
                 came_from_astar[neighbor] = current
 
         if len(open_set_astar) > peak_memory_usage_astar:
             peak_memory_usage_astar = len(open_set_astar)
+            if probe is not None:
+                probe.record("frontier", open_set_astar)
+
+    if probe is not None:
+        probe.record("parents", came_from_astar)
+        probe.record("g_score", g_score)
 
     # Reconstruct the path
-    path = maze_gen.reconstruct_solution_path(came_from_astar, start, goal)
+    path_start_astar = time.perf_counter()
+    path = maze_gen.reconstruct_path_from_parents(came_from_astar, start_id, goal_id)
+    path_extraction_time_astar = time.perf_counter() - path_start_astar
     path_length_astar = len(path)
-    runtime_astar = time.time() - start_time_astar
+    runtime_astar = time.perf_counter() - start_time_astar
 
     metrics_astar = {
         "runtime_astar": runtime_astar,
+        "graph_build_time_astar": graph_build_time_astar,
+        "path_extraction_time_astar": path_extraction_time_astar,
         "states_expanded_astar": states_expanded_astar,
         "peak_memory_usage_astar": peak_memory_usage_astar,
         "path_length_astar": path_length_astar
@@ -103,11 +145,29 @@ if __name__ == "__main__":
         default=50,
         help="Number of columns for the maze (default: 50)"
     )
+    parser.add_argument(
+        "--landmarks",
+        type=int,
+        default=0,
+        help="Use the ALT heuristic with this many landmarks instead of Manhattan (default: 0)"
+    )
+    parser.add_argument(
+        "--landmark-strategy",
+        choices=("farthest", "random", "corners"),
+        default="farthest",
+        help="Landmark placement for --landmarks (default: farthest)"
+    )
     args = parser.parse_args()
 
     maze_gen = MazeGenerator(args.rows, args.cols)
     maze_gen.generate_maze()
     maze_gen.add_loops(probability=0.1)
-    path, metrics_astar = solve_maze_astar(maze_gen)
+    heuristic = None
+    if args.landmarks > 0:
+        from landmarks import Landmarks
+        landmarks = Landmarks(maze_gen, count=args.landmarks, strategy=args.landmark_strategy)
+        print(f"Landmark preprocessing: {landmarks.preprocessing_time:.4f}s, {landmarks.nbytes} bytes")
+        heuristic = landmarks.heuristic(maze_gen.goal)
+    path, metrics_astar = solve_maze_astar(maze_gen, heuristic=heuristic)
     print("A* metrics:", metrics_astar)
     maze_gen.visualize_maze(solution=path, title="Maze with A* Solution")
\ No newline at end of file
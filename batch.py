@@ -0,0 +1,263 @@
+import time
+import argparse
+import numpy as np
+from maze import NO_ACTION, greedy_actions, value_tie_tolerance
+
+
+def stack_mazes(generators):
+    """
+    Stack same-shape MazeGenerators into (mazes, starts, goals): an (N, rows, cols)
+    uint8 array of grids and (N, 2) int64 arrays of (row, col) starts and goals.
+    """
+    shapes = sorted({(g.rows, g.cols) for g in generators})
+    if len(shapes) != 1:
+        raise ValueError(f"Mazes in a batch must share one shape, got {shapes}")
+    mazes = np.stack([g.maze for g in generators]).astype(np.uint8, copy=False)
+    starts = np.array([g.start for g in generators], dtype=np.int64)
+    goals = np.array([g.goal for g in generators], dtype=np.int64)
+    return mazes, starts, goals
+
+
+def _check_batch(mazes, starts, goals):
+    mazes = np.asarray(mazes, dtype=np.uint8)
+    if mazes.ndim != 3:
+        raise ValueError(f"mazes must have shape (N, rows, cols), got {mazes.shape}")
+    count, rows, cols = mazes.shape
+    cells = {}
+    for name, value in (("starts", starts), ("goals", goals)):
+        value = np.asarray(value, dtype=np.int64)
+        if value.shape != (count, 2):
+            raise ValueError(f"{name} must have shape ({count}, 2), got {value.shape}")
+        if ((value < 0) | (value >= (rows, cols))).any():
+            raise ValueError(f"{name} must lie inside the {rows}x{cols} grid")
+        cells[name] = value
+    return mazes, cells["starts"], cells["goals"]
+
+
+def _flat_ids(cells, rows, cols):
+    """Flat ids into the flattened (N, rows, cols) stack of one (row, col) cell per maze."""
+    return np.arange(len(cells)) * (rows * cols) + cells[:, 0] * cols + cells[:, 1]
+
+
+def batch_open_neighbor_masks(mazes):
+    """
+    (4, N, rows, cols) bool masks in (up, down, left, right) order:
+    MazeGenerator.open_neighbor_masks() of every maze in the stack.
+    """
+    open_cells = mazes == 0
+    masks = np.zeros((4,) + mazes.shape, dtype=bool)
+    masks[0, :, 1:, :] = open_cells[:, :-1, :]
+    masks[1, :, :-1, :] = open_cells[:, 1:, :]
+    masks[2, :, :, 1:] = open_cells[:, :, :-1]
+    masks[3, :, :, :-1] = open_cells[:, :, 1:]
+    return masks
+
+
+def solve_mazes_bfs_batch(mazes, starts, goals):
+    """
+    BFS from the goal of every maze in an (N, rows, cols) stack at once, the batched
+    MazeGenerator.goal_distances(). All N wavefronts are one frontier of flat ids
+    into the flattened stack, so a BFS layer costs a few array operations for the
+    whole batch; masks keep every move inside its own maze.
+    Returns (distances, metrics): (N, rows, cols) int32 moves to the goal (-1 out
+    of reach) and a dict of per-maze (N,) arrays plus the batch runtime:
+      1. runtime_bfs_batch (seconds, whole batch)
+      2. states_expanded_bfs_batch (cells reached from the goal)
+      3. peak_memory_usage_bfs_batch (largest BFS layer)
+      4. path_length_bfs_batch (cells on a shortest start-goal path, 0 when there is
+         none or start or goal is a wall, like len(path) from solve_maze_bfs)
+    """
+    start_time = time.perf_counter()
+    mazes, starts, goals = _check_batch(mazes, starts, goals)
+    count, rows, cols = mazes.shape
+    cells_per_maze = rows * cols
+    masks = batch_open_neighbor_masks(mazes).reshape(4, -1)
+    steps = (-cols, cols, -1, 1)
+
+    dist = np.full(count * cells_per_maze, -1, dtype=np.int32)
+    frontier = _flat_ids(goals, rows, cols)
+    dist[frontier] = 0
+    peak = np.ones(count, dtype=np.int64)
+    layer = 0
+    while frontier.size:
+        layer += 1
+        candidates = np.concatenate([frontier[masks[k, frontier]] + steps[k] for k in range(4)])
+        frontier = np.unique(candidates[dist[candidates] < 0])
+        dist[frontier] = layer
+        np.maximum(peak, np.bincount(frontier // cells_per_maze, minlength=count), out=peak)
+    dist = dist.reshape(count, rows, cols)
+
+    index = np.arange(count)
+    start_dist = dist[index, starts[:, 0], starts[:, 1]]
+    walls = (mazes[index, starts[:, 0], starts[:, 1]] == 1) | (mazes[index, goals[:, 0], goals[:, 1]] == 1)
+    path_length = np.where((start_dist >= 0) & ~walls, start_dist + 1, 0)
+    metrics = {
+        "runtime_bfs_batch": time.perf_counter() - start_time,
+        "states_expanded_bfs_batch": np.count_nonzero(dist >= 0, axis=(1, 2)),
+        "peak_memory_usage_bfs_batch": peak,
+        "path_length_bfs_batch": path_length
+    }
+    return dist, metrics
+
+
+def batch_policy_path_lengths(policy, starts, goals):
+    """
+    Follow every maze's policy ((N, rows, cols) action codes) from its start, all
+    mazes one step at a time together. Returns (N,) path lengths in cells, like
+    len(path) from maze.follow_policy when it reaches the goal, and 0 for mazes
+    whose walk stops at a cell without an action, leaves the grid or cycles.
+    """
+    count, rows, cols = policy.shape
+    codes = policy.reshape(-1)
+    current = _flat_ids(starts, rows, cols)
+    goal_ids = _flat_ids(goals, rows, cols)
+    steps = np.array([-cols, cols, -1, 1, 0])
+    lengths = np.ones(count, dtype=np.int64)
+    walking = np.flatnonzero(current != goal_ids)
+    # A walk longer than the grid has revisited a cell
+    for _ in range(rows * cols):
+        if not walking.size:
+            break
+        cell = current[walking]
+        code = codes[cell].astype(np.int64)
+        moved = cell + steps[np.minimum(code, NO_ACTION)]
+        column = cell % cols
+        valid = (code < NO_ACTION) & (moved // (rows * cols) == cell // (rows * cols))
+        valid &= ~((code == 2) & (column == 0)) & ~((code == 3) & (column == cols - 1))
+        lengths[walking[~valid]] = 0
+        walking, moved = walking[valid], moved[valid]
+        current[walking] = moved
+        lengths[walking] += 1
+        walking = walking[moved != goal_ids[walking]]
+    lengths[walking] = 0
+    return lengths
+
+
+def solve_mazes_value_iteration_batch(mazes, starts, goals, gamma=0.9, theta=1e-4, max_iter=5000,
+                                      distances=None):
+    """
+    Jacobi Value Iteration on every maze of an (N, rows, cols) stack at once, with
+    the same start values, backups, tie-breaking and stopping rule per maze as
+    solve_maze_value_iteration (so V and the policy match it maze for maze): a
+    maze's policy is read off its last sweep with maze.greedy_actions.
+    The goal-reachable states of all mazes form one compact list of flat ids into
+    the flattened stack, sorted by maze, with a (4, states) table of neighbor ids,
+    so a sweep of the whole batch is one gather; per-maze changes come from a
+    segmented max. A maze's states leave the list as soon as its change drops
+    below theta, so converged mazes cost nothing.
+    distances reuses the result of solve_mazes_bfs_batch for the same stack.
+    Returns (V, policy, metrics): (N, rows, cols) float64 values, (N, rows, cols)
+    int8 action codes (maze.ACTION_NAMES order, NO_ACTION elsewhere) and a dict of
+    per-maze (N,) arrays plus the batch runtime:
+      1. runtime_value_batch (seconds, whole batch)
+      2. iterations_value_batch (sweeps until the change was below theta)
+      3. states_expanded_value_batch (state evaluations)
+      4. path_length_value_batch (cells on the greedy path from start, see
+         batch_policy_path_lengths)
+    """
+    start_time = time.perf_counter()
+    mazes, starts, goals = _check_batch(mazes, starts, goals)
+    if distances is None:
+        distances, _ = solve_mazes_bfs_batch(mazes, starts, goals)
+    count, rows, cols = mazes.shape
+    cells_per_maze = rows * cols
+    num_cells = count * cells_per_maze
+
+    # Flat values with the -inf sentinel that blocked moves point at
+    values = np.empty(num_cells + 1)
+    values[:num_cells] = np.where(distances >= 0, -distances.astype(np.float64), -9999.0).ravel()
+    values[_flat_ids(goals, rows, cols)] = 0.0
+    values[num_cells] = -np.inf
+    policy = np.full(num_cells, NO_ACTION, dtype=np.int8)
+
+    # Goal-reachable cells other than the goal, as in MazeGenerator.goal_component
+    states = np.flatnonzero(distances.ravel() > 0)
+    maze_of = states // cells_per_maze
+    num_states = np.bincount(maze_of, minlength=count)
+    masks = batch_open_neighbor_masks(mazes).reshape(4, -1)[:, states]
+    steps = np.array([-cols, cols, -1, 1])[:, np.newaxis]
+    neighbors = np.where(masks, states + steps, num_cells)
+    # Mazes without states stop after their first, empty sweep
+    iterations = (num_states == 0).astype(np.int64)
+    live = np.flatnonzero(num_states)
+    segment_starts = np.searchsorted(maze_of, live)
+    # Moves to the goal from every cell, -1 for the sentinel, to break ties in the policy
+    distance_of = np.append(distances.ravel(), -1)
+    tolerance = value_tie_tolerance(gamma)
+
+    for sweep in range(max_iter):
+        if not states.size:
+            break
+        q_values = values[neighbors]
+        q_values *= gamma
+        q_values -= 1
+        # Elementwise maxima: max along the short first axis walks the array with a
+        # stride and is several times slower
+        best_value = np.maximum(np.maximum(q_values[0], q_values[1]), np.maximum(q_values[2], q_values[3]))
+        change = np.abs(best_value - values[states])
+        values[states] = best_value
+        iterations[live] += 1
+
+        done = np.maximum.reduceat(change, segment_starts) < theta
+        if sweep == max_iter - 1:
+            done[:] = True
+        # Mazes that stop here keep the policy of this sweep
+        finished = np.repeat(done, num_states[live])
+        if finished.any():
+            policy[states[finished]] = greedy_actions(q_values[:, finished], distance_of[neighbors[:, finished]],
+                                                      tolerance)
+        if done.any():
+            keep = np.repeat(~done, num_states[live])
+            states, maze_of, neighbors = states[keep], maze_of[keep], neighbors[:, keep]
+            live = live[~done]
+            segment_starts = np.searchsorted(maze_of, live)
+
+    V = values[:num_cells].reshape(mazes.shape)
+    policy = policy.reshape(mazes.shape)
+    metrics = {
+        "runtime_value_batch": time.perf_counter() - start_time,
+        "iterations_value_batch": iterations,
+        "states_expanded_value_batch": iterations * num_states,
+        "path_length_value_batch": batch_policy_path_lengths(policy, starts, goals)
+    }
+    return V, policy, metrics
+
+
+if __name__ == "__main__":
+    from mdp_comparison import build_mdp_maze
+    from bfs import solve_maze_bfs
+    from value_iteration import solve_maze_value_iteration
+    from maze import follow_policy
+
+    parser = argparse.ArgumentParser(
+        description="Solve a stack of same-size mazes in one batch and compare with solving them one by one."
+    )
+    parser.add_argument("--count", type=int, default=200, help="Mazes in the batch (default: 200)")
+    parser.add_argument("--rows", type=int, default=31, help="Number of rows (default: 31)")
+    parser.add_argument("--cols", type=int, default=31, help="Number of columns (default: 31)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first maze (default: 0)")
+    args = parser.parse_args()
+
+    generators = [build_mdp_maze(args.rows, args.cols, seed=args.seed + i) for i in range(args.count)]
+    mazes, starts, goals = stack_mazes(generators)
+
+    distances, metrics_bfs = solve_mazes_bfs_batch(mazes, starts, goals)
+    V, policy, metrics_value = solve_mazes_value_iteration_batch(mazes, starts, goals, distances=distances)
+
+    start_time = time.perf_counter()
+    lengths_bfs = [solve_maze_bfs(g)[1]["path_bfs_length"] for g in generators]
+    loop_bfs = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    lengths_value = []
+    for g in generators:
+        _, single_policy, _ = solve_maze_value_iteration(g, gamma=0.9, theta=1e-4, max_iter=5000)
+        path, reason = follow_policy(single_policy, g.start, g.goal, maze=g.maze)
+        lengths_value.append(len(path) if reason == "goal" else 0)
+    loop_value = time.perf_counter() - start_time
+
+    assert np.array_equal(metrics_bfs["path_length_bfs_batch"], lengths_bfs)
+    assert np.array_equal(metrics_value["path_length_value_batch"], lengths_value)
+    print(f"BFS: batch {metrics_bfs['runtime_bfs_batch']:.4f}s, one by one {loop_bfs:.4f}s")
+    print(f"Value Iteration: batch {metrics_value['runtime_value_batch']:.4f}s, one by one {loop_value:.4f}s")
+    print(f"Mean path length: {np.mean(metrics_bfs['path_length_bfs_batch']):.1f}, "
+          f"mean sweeps: {np.mean(metrics_value['iterations_value_batch']):.1f}")
@@ -0,0 +1,168 @@
+import csv
+import math
+import argparse
+import statistics
+from time import perf_counter_ns
+import numpy as np
+
+from maze import extract_path
+from search_comparison import SEARCH_ALGORITHMS, build_search_maze
+from mdp_comparison import MDP_ALGORITHMS, build_mdp_maze
+
+
+def summarize(samples_ns, confidence=0.95):
+    """
+    Summary statistics of timing samples given in nanoseconds, reported in seconds:
+    n, median, q1, q3, iqr, mean, stdev, and a distribution-free confidence
+    interval for the median (ci_low, ci_high) taken from order statistics.
+    """
+    x = np.sort(np.asarray(samples_ns, dtype=np.float64)) / 1e9
+    n = x.size
+    if n == 0:
+        return {"n": 0}
+    q1, median, q3 = np.percentile(x, [25, 50, 75])
+    # Ranks of the median's confidence bounds from the binomial(n, 1/2) normal approximation
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * math.sqrt(n) / 2
+    low_rank = max(0, math.floor(n / 2 - half_width) - 1)
+    high_rank = min(n - 1, math.ceil(n / 2 + half_width))
+    return {
+        "n": n,
+        "median": float(median),
+        "q1": float(q1),
+        "q3": float(q3),
+        "iqr": float(q3 - q1),
+        "mean": float(x.mean()),
+        "stdev": float(x.std(ddof=1)) if n > 1 else 0.0,
+        "ci_low": float(x[low_rank]),
+        "ci_high": float(x[high_rank]),
+    }
+
+
+def time_generation(build, rows, cols, seed, warmup=1, repeat=5):
+    """Time build(rows, cols, seed) repeatedly; returns the samples in nanoseconds."""
+    samples = []
+    for i in range(warmup + repeat):
+        start = perf_counter_ns()
+        build(rows, cols, seed)
+        elapsed = perf_counter_ns() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+def time_solver(algorithm, maze_gen, warmup=2, repeat=10, cold_caches=True):
+    """
+    Run one algorithm from SEARCH_ALGORITHMS or MDP_ALGORITHMS on the identical maze
+    warmup + repeat times and return per-phase samples in nanoseconds:
+      'solve' -> the solver call without path extraction.
+      'path'  -> path extraction (reported by the search solvers, extract_path on
+                 the policy for the MDP solvers).
+      'total' -> both.
+      'setup' -> building the maze's cached neighbor graph, for the search solvers that
+                 report it apart from their runtime; it is excluded from 'solve' and 'total'.
+    With cold_caches, the maze's cached adjacency is dropped before every run, so
+    each sample pays the same setup cost as a first solve.
+    """
+    samples = {"solve": [], "path": [], "total": [], "setup": []}
+    for i in range(warmup + repeat):
+        if cold_caches:
+            maze_gen.invalidate_caches()
+        if algorithm in SEARCH_ALGORITHMS:
+            solver, columns = SEARCH_ALGORITHMS[algorithm]
+            start = perf_counter_ns()
+            path, metrics = solver(maze_gen)
+            suffix = columns["runtime"][len("runtime"):]
+            setup = metrics.get("graph_build_time" + suffix)
+            setup_ns = None if setup is None else int(setup * 1e9)
+            total = perf_counter_ns() - start - (setup_ns or 0)
+            path_ns = int(metrics.get("path_extraction_time" + suffix, 0) * 1e9)
+        else:
+            solver, params = MDP_ALGORITHMS[algorithm]
+            start = perf_counter_ns()
+            V, policy, states_expanded = solver(maze_gen, **params)
+            solved = perf_counter_ns()
+            extract_path(policy, maze_gen.start, maze_gen.goal, maze=maze_gen.maze)
+            total = perf_counter_ns() - start
+            path_ns = total - (solved - start)
+            setup_ns = None
+        if i >= warmup:
+            samples["solve"].append(total - path_ns)
+            samples["path"].append(path_ns)
+            samples["total"].append(total)
+            if setup_ns is not None:
+                samples["setup"].append(setup_ns)
+    return {phase: phase_samples for phase, phase_samples in samples.items() if phase_samples}
+
+
+def positive_int(text):
+    """argparse type for counts that must be at least 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def benchmark(algorithms, maze_sizes, warmup=2, repeat=10, seed=0, cold_caches=True, confidence=0.95):
+    """
+    Benchmark maze generation and every algorithm on one seeded maze per size.
+    Returns rows with one entry per (size, algorithm, phase); generation is
+    reported under the algorithm name of the maze builder.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+    results = []
+    for rows, cols in maze_sizes:
+        builders = {}
+        for algorithm in algorithms:
+            build = build_search_maze if algorithm in SEARCH_ALGORITHMS else build_mdp_maze
+            builders.setdefault(build, []).append(algorithm)
+        for build, names in builders.items():
+            generation = time_generation(build, rows, cols, seed, warmup=min(warmup, 1), repeat=repeat)
+            results.append(_result_row(build.__name__, rows, cols, "generate", generation, confidence))
+            maze_gen = build(rows, cols, seed)
+            for algorithm in names:
+                samples = time_solver(algorithm, maze_gen, warmup=warmup, repeat=repeat, cold_caches=cold_caches)
+                for phase, phase_samples in samples.items():
+                    results.append(_result_row(algorithm, rows, cols, phase, phase_samples, confidence))
+    return results
+
+
+def _result_row(name, rows, cols, phase, samples, confidence):
+    row = {"algorithm": name, "maze_rows": rows, "maze_cols": cols, "phase": phase}
+    row.update(summarize(samples, confidence))
+    return row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark maze generation and solvers with warmups, repetitions and statistics."
+    )
+    parser.add_argument("--rows", type=int, default=50, help="Number of rows (default: 50)")
+    parser.add_argument("--cols", type=int, default=50, help="Number of columns (default: 50)")
+    parser.add_argument("--algorithms", default="DFS,BFS,A*,Value Iteration",
+                        help="Comma-separated algorithm names (default: DFS,BFS,A*,Value Iteration)")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed warmup runs (default: 2)")
+    parser.add_argument("--repeat", type=positive_int, default=10, help="Timed runs, at least 1 (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="Maze seed (default: 0)")
+    parser.add_argument("--warm-caches", action="store_true",
+                        help="Keep the maze's adjacency caches between runs")
+    parser.add_argument("--csv", default=None, help="Also write the results to this CSV file")
+    args = parser.parse_args()
+
+    algorithms = [name.strip() for name in args.algorithms.split(",")]
+    for name in algorithms:
+        if name not in SEARCH_ALGORITHMS and name not in MDP_ALGORITHMS:
+            parser.error(f"unknown algorithm {name!r}")
+    results = benchmark(algorithms, [(args.rows, args.cols)], warmup=args.warmup, repeat=args.repeat,
+                        seed=args.seed, cold_caches=not args.warm_caches)
+
+    print(f"{'algorithm':<20}{'phase':<10}{'median (s)':>14}{'IQR (s)':>14}{'95% CI (s)':>28}")
+    for row in results:
+        ci = f"[{row['ci_low']:.6f}, {row['ci_high']:.6f}]"
+        print(f"{row['algorithm']:<20}{row['phase']:<10}{row['median']:>14.6f}{row['iqr']:>14.6f}{ci:>28}")
+    if args.csv:
+        with open(args.csv, "w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
@@ -0,0 +1,282 @@
+import heapq
+import time
+from array import array
+import argparse
+from maze import MazeGenerator
+from astar import manhattan_distance
+
+
+def _empty_metrics(suffix, graph_build_time):
+    return [], {
+        f"runtime_{suffix}": 0,
+        f"graph_build_time_{suffix}": graph_build_time,
+        f"path_extraction_time_{suffix}": 0,
+        f"states_expanded_{suffix}": 0,
+        f"peak_memory_usage_{suffix}": 0,
+        f"path_length_{suffix}": 0
+    }
+
+
+def _invalid_endpoints(maze_gen):
+    """True if the start or goal is off the grid or inside a wall."""
+    for r, c in (maze_gen.start, maze_gen.goal):
+        if not (0 <= r < maze_gen.rows and 0 <= c < maze_gen.cols):
+            return True
+    return maze_gen.maze[maze_gen.start] == 1 or maze_gen.maze[maze_gen.goal] == 1
+
+
+def _join_paths(maze_gen, parents_forward, parents_backward, start_id, forward_end, backward_end):
+    """
+    Path from start to forward_end through the forward parents, followed by
+    backward_end to the goal through the backward parents.
+    """
+    path = maze_gen.reconstruct_path_from_parents(parents_forward, start_id, forward_end)
+    current = backward_end
+    while current != -1:
+        path.append(divmod(current, maze_gen.cols))
+        current = parents_backward[current]
+    return path
+
+
+def solve_maze_bidirectional_bfs(maze_gen, probe=None):
+    """
+    Solve the maze with bidirectional Breadth-First Search, growing one BFS from
+    the start and one from the goal. Each step expands a whole layer of the
+    smaller frontier; the first layer that touches the other side's labels ends
+    the search, and the shortest connection found in that layer is optimal.
+    Metrics use the keys of solve_maze_bfs with the suffix _bibfs:
+      1. runtime_bibfs (seconds)
+      2. states_expanded_bibfs (cells expanded on both sides)
+      3. peak_memory_usage_bibfs (max combined size of both frontiers)
+      4. path_length_bibfs (length of the found path)
+      path_extraction_time_bibfs also reports the part of the runtime spent rebuilding the path.
+      graph_build_time_bibfs reports building the maze's cached neighbor graph, which is not part of the runtime.
+      With a memory_probe.MemoryProbe as probe, the sizes of the frontiers, visited and parents are recorded.
+    """
+    # The cached neighbor graph is built outside the timed search
+    graph_start = time.perf_counter()
+    graph = maze_gen.neighbor_graph()
+    graph_build_time = time.perf_counter() - graph_start
+    start_time = time.perf_counter()
+    if _invalid_endpoints(maze_gen):
+        return _empty_metrics("bibfs", graph_build_time)
+
+    offsets = graph.offsets_list
+    neighbors = graph.neighbors_list
+    cols = maze_gen.cols
+    start_id = maze_gen.start[0] * cols + maze_gen.start[1]
+    goal_id = maze_gen.goal[0] * cols + maze_gen.goal[1]
+
+    # Per side: BFS depth (-1 = not reached) and parent toward that side's root
+    num_cells = maze_gen.rows * cols
+    dist_forward = array('i', [-1]) * num_cells
+    dist_backward = array('i', [-1]) * num_cells
+    parents_forward = array('i', [-1]) * num_cells
+    parents_backward = array('i', [-1]) * num_cells
+    dist_forward[start_id] = 0
+    dist_backward[goal_id] = 0
+    layer_forward = [start_id]
+    layer_backward = [goal_id]
+
+    states_expanded = 0
+    peak_memory_usage = 2 if start_id != goal_id else 1
+    # Best connection so far: total length and the edge (forward cell, backward cell)
+    best_length = 0 if start_id == goal_id else -1
+    meeting = (start_id, -1)
+
+    while best_length < 0 and layer_forward and layer_backward:
+        forward = len(layer_forward) <= len(layer_backward)
+        if forward:
+            layer, dist, parents, other_dist = layer_forward, dist_forward, parents_forward, dist_backward
+        else:
+            layer, dist, parents, other_dist = layer_backward, dist_backward, parents_backward, dist_forward
+
+        next_layer = []
+        for current in layer:
+            states_expanded += 1
+            depth = dist[current] + 1
+            for neighbor in neighbors[offsets[current]:offsets[current + 1]]:
+                if other_dist[neighbor] >= 0:
+                    length = depth + other_dist[neighbor]
+                    if best_length < 0 or length < best_length:
+                        best_length = length
+                        meeting = (current, neighbor) if forward else (neighbor, current)
+                if dist[neighbor] < 0:
+                    dist[neighbor] = depth
+                    parents[neighbor] = current
+                    next_layer.append(neighbor)
+
+        if forward:
+            layer_forward = next_layer
+        else:
+            layer_backward = next_layer
+        if len(layer_forward) + len(layer_backward) > peak_memory_usage:
+            peak_memory_usage = len(layer_forward) + len(layer_backward)
+            if probe is not None:
+                probe.record("frontier", (layer_forward, layer_backward))
+
+    if probe is not None:
+        probe.record("visited", (dist_forward, dist_backward))
+        probe.record("parents", (parents_forward, parents_backward))
+
+    path_start = time.perf_counter()
+    if best_length >= 0:
+        path = _join_paths(maze_gen, parents_forward, parents_backward, start_id, meeting[0], meeting[1])
+    else:
+        path = []
+    path_extraction_time = time.perf_counter() - path_start
+
+    runtime = time.perf_counter() - start_time
+    metrics = {
+        "runtime_bibfs": runtime,
+        "graph_build_time_bibfs": graph_build_time,
+        "path_extraction_time_bibfs": path_extraction_time,
+        "states_expanded_bibfs": states_expanded,
+        "peak_memory_usage_bibfs": peak_memory_usage,
+        "path_length_bibfs": len(path)
+    }
+    return path, metrics
+
+
+def solve_maze_bidirectional_astar(maze_gen, probe=None):
+    """
+    Solve the maze with bidirectional A*, one search from the start toward the
+    goal and one from the goal toward the start.
+    Both sides use the averaged potential p(v) = (h_goal(v) - h_start(v)) / 2
+    (negated for the backward side) over Manhattan distances, which keeps both
+    searches consistent, so each cell is settled at most once per side. Keys are
+    doubled to stay integral. The search stops once the two smallest keys add up
+    to at least twice the best start-goal connection seen, which is then optimal.
+    Metrics use the keys of solve_maze_astar with the suffix _biastar:
+      1. runtime_biastar (seconds)
+      2. states_expanded_biastar (cells settled on both sides)
+      3. peak_memory_usage_biastar (max combined size of both priority queues)
+      4. path_length_biastar (length of the found path)
+      path_extraction_time_biastar also reports the part of the runtime spent rebuilding the path.
+      graph_build_time_biastar reports building the maze's cached neighbor graph, which is not part of the runtime.
+      With a memory_probe.MemoryProbe as probe, the sizes of the frontiers, visited and parents are recorded.
+    """
+    # The cached neighbor graph is built outside the timed search
+    graph_start = time.perf_counter()
+    graph = maze_gen.neighbor_graph()
+    graph_build_time = time.perf_counter() - graph_start
+    start_time = time.perf_counter()
+    if _invalid_endpoints(maze_gen):
+        return _empty_metrics("biastar", graph_build_time)
+
+    offsets = graph.offsets_list
+    neighbors = graph.neighbors_list
+    cols = maze_gen.cols
+    start, goal = maze_gen.start, maze_gen.goal
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+
+    def potential(cell):
+        # Twice the forward potential; the backward side uses its negation
+        position = divmod(cell, cols)
+        return manhattan_distance(position, goal) - manhattan_distance(position, start)
+
+    num_cells = maze_gen.rows * cols
+    g_forward = array('i', [-1]) * num_cells
+    g_backward = array('i', [-1]) * num_cells
+    parents_forward = array('i', [-1]) * num_cells
+    parents_backward = array('i', [-1]) * num_cells
+    closed_forward = bytearray(num_cells)
+    closed_backward = bytearray(num_cells)
+    g_forward[start_id] = 0
+    g_backward[goal_id] = 0
+    # Priority queues hold (2 * g + side potential, cell)
+    open_forward = [(potential(start_id), start_id)]
+    open_backward = [(-potential(goal_id), goal_id)]
+
+    states_expanded = 0
+    peak_memory_usage = 2
+    # Best connection so far: its length and the cell where both sides meet
+    best_length = 0 if start_id == goal_id else -1
+    meeting = start_id
+
+    while open_forward and open_backward:
+        if best_length >= 0 and open_forward[0][0] + open_backward[0][0] >= 2 * best_length:
+            break
+        forward = open_forward[0][0] <= open_backward[0][0]
+        if forward:
+            open_set, g, parents, closed, other_g, sign = (
+                open_forward, g_forward, parents_forward, closed_forward, g_backward, 1)
+        else:
+            open_set, g, parents, closed, other_g, sign = (
+                open_backward, g_backward, parents_backward, closed_backward, g_forward, -1)
+
+        _, current = heapq.heappop(open_set)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        states_expanded += 1
+
+        tentative_g = g[current] + 1
+        for neighbor in neighbors[offsets[current]:offsets[current + 1]]:
+            if g[neighbor] < 0 or tentative_g < g[neighbor]:
+                g[neighbor] = tentative_g
+                parents[neighbor] = current
+                heapq.heappush(open_set, (2 * tentative_g + sign * potential(neighbor), neighbor))
+            if other_g[neighbor] >= 0:
+                length = g[neighbor] + other_g[neighbor]
+                if best_length < 0 or length < best_length:
+                    best_length = length
+                    meeting = neighbor
+
+        if len(open_forward) + len(open_backward) > peak_memory_usage:
+            peak_memory_usage = len(open_forward) + len(open_backward)
+            if probe is not None:
+                probe.record("frontier", (open_forward, open_backward))
+
+    if probe is not None:
+        probe.record("visited", (closed_forward, closed_backward))
+        probe.record("parents", (parents_forward, parents_backward))
+        probe.record("g_score", (g_forward, g_backward))
+
+    path_start = time.perf_counter()
+    if best_length >= 0:
+        path = _join_paths(maze_gen, parents_forward, parents_backward, start_id,
+                           meeting, parents_backward[meeting])
+    else:
+        path = []
+    path_extraction_time = time.perf_counter() - path_start
+
+    runtime = time.perf_counter() - start_time
+    metrics = {
+        "runtime_biastar": runtime,
+        "graph_build_time_biastar": graph_build_time,
+        "path_extraction_time_biastar": path_extraction_time,
+        "states_expanded_biastar": states_expanded,
+        "peak_memory_usage_biastar": peak_memory_usage,
+        "path_length_biastar": len(path)
+    }
+    return path, metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate and solve a maze using bidirectional BFS and bidirectional A*."
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=50,
+        help="Number of rows for the maze (default: 50)"
+    )
+    parser.add_argument(
+        "--cols",
+        type=int,
+        default=50,
+        help="Number of columns for the maze (default: 50)"
+    )
+    args = parser.parse_args()
+
+    maze_gen = MazeGenerator(args.rows, args.cols)
+    maze_gen.generate_maze()
+    maze_gen.add_loops(probability=0.1)
+    path_bibfs, metrics_bibfs = solve_maze_bidirectional_bfs(maze_gen)
+    print("Bidirectional BFS metrics:", metrics_bibfs)
+    path_biastar, metrics_biastar = solve_maze_bidirectional_astar(maze_gen)
+    print("Bidirectional A* metrics:", metrics_biastar)
+    maze_gen.visualize_maze(solution=path_biastar, title="Maze with Bidirectional A* Solution")
@@ -0,0 +1,322 @@
+import time
+import argparse
+import numpy as np
+from maze import MazeGenerator
+
+WORD_BITS = 64
+# Shift distances of the occluded fills: together they cover runs of up to 63 cells
+FILL_SHIFTS = (1, 2, 4, 8, 16, 32)
+HIGH_BIT = np.uint64(1 << 63)
+LOW_BIT = np.uint64(1)
+
+
+# Set bits of every byte value, for NumPy versions without np.bitwise_count (added in 2.0)
+BYTE_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+def _popcount(words):
+    """Total set bits of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].sum(dtype=np.int64))
+
+
+def _column_mask(cols):
+    """(words per row,) uint64 with the bits of real columns set, the padding of the last word clear."""
+    num_words = -(-cols // WORD_BITS)
+    mask = np.full(num_words, np.iinfo(np.uint64).max, dtype=np.uint64)
+    used = cols - WORD_BITS * (num_words - 1)
+    if used < WORD_BITS:
+        mask[-1] = ~np.uint64((1 << (WORD_BITS - used)) - 1)
+    return mask
+
+
+def _toward_higher_columns(x, k):
+    return x >> np.uint64(k)
+
+
+def _toward_lower_columns(x, k):
+    return x << np.uint64(k)
+
+
+def _toward_higher_rows(x, k):
+    y = np.zeros_like(x)
+    y[:, k:] = x[:, :-k]
+    return y
+
+
+def _toward_lower_rows(x, k):
+    y = np.zeros_like(x)
+    y[:, :-k] = x[:, k:]
+    return y
+
+
+def _occluded_fill(reached, passable, shift):
+    """
+    Grow reached in place through passable, up to 63 cells in one direction inside
+    every tile, with log2 doubling steps (the Kogge-Stone fill of chess bitboards).
+    """
+    for k in FILL_SHIFTS:
+        reached |= passable & shift(reached, k)
+        passable = passable & shift(passable, k)
+    return reached
+
+
+class BitboardReachability:
+    """
+    Flood-fill reachability on a maze stored as bitboards: open cells, and every
+    reached set, are packed 64 cells to a uint64 word, so a board takes one bit per
+    cell, an eighth of the uint8 grid. Boards are split into tiles of 64 x 64 cells
+    with one word per tile row: cell (r, c) is bit 63 - c % 64 (the bit order of
+    np.packbits) of row r % 64 of tile (r // 64, c // 64). The open board is built
+    from MazeGenerator.packed_bits(), so a packed maze is never unpacked.
+    A flood runs in rounds. Each round seeds the tiles whose neighbors gained cells
+    on their shared border and fills every one of them to closure with occluded
+    fills (shifts and ANDs over 64 cells at a time), all active tiles at once, so the
+    work follows the frontier instead of sweeping the whole board.
+    After every query, stats holds iterations (rounds), words_processed,
+    words_per_iteration (list) and memory_bytes (boards and per-round temporaries).
+    The board describes the maze at construction time.
+    """
+    def __init__(self, maze_gen):
+        self.rows = maze_gen.rows
+        self.cols = maze_gen.cols
+        self.num_words = -(-self.cols // WORD_BITS)
+        self.tile_rows = -(-self.rows // WORD_BITS)
+        self.num_tiles = self.tile_rows * self.num_words
+
+        packed = maze_gen.packed_bits()
+        padded = np.zeros((self.tile_rows * WORD_BITS, self.num_words * 8), dtype=np.uint8)
+        padded[:self.rows, :packed.shape[1]] = packed
+        open_rows = ~padded.view(">u8").astype(np.uint64) & _column_mask(self.cols)
+        open_rows[self.rows:] = 0
+        # One extra all-wall tile for the off-board neighbors to point at
+        self.open = np.zeros((self.num_tiles + 1, WORD_BITS), dtype=np.uint64)
+        self.open[:-1] = self._to_tiles(open_rows)
+
+        tiles = np.arange(self.num_tiles)
+        tile_row, tile_col = np.divmod(tiles, self.num_words)
+        # Neighbor tiles in U, D, L, R order
+        self.neighbors = np.stack([
+            np.where(tile_row > 0, tiles - self.num_words, self.num_tiles),
+            np.where(tile_row < self.tile_rows - 1, tiles + self.num_words, self.num_tiles),
+            np.where(tile_col > 0, tiles - 1, self.num_tiles),
+            np.where(tile_col < self.num_words - 1, tiles + 1, self.num_tiles),
+        ])
+        self.stats = {}
+
+    def _to_tiles(self, board):
+        """(tile rows * 64, words) row-major board -> (tiles, 64) tile words."""
+        return (board.reshape(self.tile_rows, WORD_BITS, self.num_words)
+                .transpose(0, 2, 1).reshape(self.num_tiles, WORD_BITS))
+
+    def _to_rows(self, tiles):
+        """(tiles, 64) tile words -> (rows, words) row-major board."""
+        return np.ascontiguousarray(
+            tiles[:self.num_tiles].reshape(self.tile_rows, self.num_words, WORD_BITS)
+            .transpose(0, 2, 1).reshape(self.tile_rows * WORD_BITS, self.num_words)[:self.rows])
+
+    @property
+    def nbytes(self):
+        return self.open.nbytes
+
+    def _cell_bit(self, cell):
+        """(tile, row in the tile, bit) of a (row, col) cell."""
+        r, c = cell
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise ValueError(f"Cell outside the {self.rows}x{self.cols} grid: {cell}")
+        tile = (r // WORD_BITS) * self.num_words + c // WORD_BITS
+        return tile, r % WORD_BITS, np.uint64(1) << np.uint64(WORD_BITS - 1 - c % WORD_BITS)
+
+    def _flood(self, cell, stop_cell=None):
+        """Tile board of the cells connected to cell, and the ids of the tiles it touched."""
+        reached = np.zeros_like(self.open)
+        tile, row, bit = self._cell_bit(cell)
+        stop = self._cell_bit(stop_cell) if stop_cell is not None else None
+        up, down, left, right = self.neighbors
+        active = np.array([tile])
+        touched = [active]
+        words_per_iteration = []
+        peak_active = 1
+        while active.size:
+            if stop is not None and reached[stop[0], stop[1]] & stop[2]:
+                break
+            before = reached[active]
+            # Seed each active tile with the reached cells across its four borders
+            grown = before | (reached[left[active]] << np.uint64(WORD_BITS - 1))
+            grown |= reached[right[active]] >> np.uint64(WORD_BITS - 1)
+            grown[:, 0] |= reached[up[active], WORD_BITS - 1]
+            grown[:, -1] |= reached[down[active], 0]
+            mask = self.open[active]
+            grown &= mask
+            grown |= before
+            if not words_per_iteration:
+                # The seed, kept even on a wall, gains cells like any other
+                grown[0, row] |= bit
+
+            # Fill every active tile to closure, dropping tiles as they settle
+            words = 0
+            work = np.arange(active.size)
+            while work.size:
+                tiles = grown[work]
+                settled = tiles.copy()
+                tile_mask = mask[work]
+                for shift in (_toward_higher_columns, _toward_lower_columns,
+                              _toward_higher_rows, _toward_lower_rows):
+                    _occluded_fill(tiles, tile_mask, shift)
+                words += tiles.size
+                grown[work] = tiles
+                work = work[(tiles != settled).any(axis=1)]
+            words_per_iteration.append(words)
+            peak_active = max(peak_active, active.size)
+            reached[active] = grown
+
+            # Next round: the neighbors across every border that gained cells
+            gained = grown & ~before
+            following = np.concatenate([
+                up[active[gained[:, 0] != 0]],
+                down[active[gained[:, -1] != 0]],
+                left[active[(gained & HIGH_BIT).any(axis=1)]],
+                right[active[(gained & LOW_BIT).any(axis=1)]],
+            ])
+            active = np.unique(following[following < self.num_tiles])
+            touched.append(active)
+        self.stats = {
+            "iterations": len(words_per_iteration),
+            "words_processed": sum(words_per_iteration),
+            "words_per_iteration": words_per_iteration,
+            # open and reached, plus about eight gathers the size of the largest round
+            "memory_bytes": 2 * self.open.nbytes + 8 * peak_active * WORD_BITS * 8,
+        }
+        return reached, np.unique(np.concatenate(touched))
+
+    def flood(self, cell, stop_cell=None):
+        """
+        (rows, words) row-major board of the cells connected to cell (cell itself is
+        included even if it is a wall). With stop_cell, the fill stops in the round
+        that reaches that cell, leaving a partial board.
+        """
+        reached, _ = self._flood(cell, stop_cell)
+        return self._to_rows(reached)
+
+    def is_path(self, start, goal):
+        """True if goal can be reached from start (both open, or start == goal); False from a wall."""
+        if tuple(start) == tuple(goal):
+            return True
+        # A wall seed still spreads into its open neighbors, so rule it out first
+        start_tile, start_row, start_bit = self._cell_bit(start)
+        if not self.open[start_tile, start_row] & start_bit:
+            return False
+        tile, row, bit = self._cell_bit(goal)
+        if not self.open[tile, row] & bit:
+            return False
+        reached, _ = self._flood(start, stop_cell=goal)
+        return bool(reached[tile, row] & bit)
+
+    def reachable_count(self, cell):
+        """Number of cells connected to cell, itself included."""
+        reached, touched = self._flood(cell)
+        return _popcount(reached[touched])
+
+    def to_grid(self, board):
+        """Unpack a (rows, words) board from flood() into a rows x cols bool array."""
+        bits = np.ascontiguousarray(board.astype(">u8")).view(np.uint8)
+        return np.unpackbits(bits, axis=1, count=self.cols).astype(bool)
+
+    def components(self, labels=None):
+        """
+        Connected components of the open cells, in raster order of their first cell.
+        Returns a list of (first (row, col) cell, size). Per-cell labels are only
+        written when labels is given (see label_components).
+        """
+        seen = np.zeros_like(self.open)
+        components = []
+        words_per_iteration = []
+        memory_bytes = 0
+        for tile_row in range(self.tile_rows):
+            band = slice(tile_row * self.num_words, (tile_row + 1) * self.num_words)
+            while True:
+                # Open cells of this band of 64 rows not in a component yet, row by row
+                left_over = (self.open[band] & ~seen[band]).T
+                position = np.flatnonzero(left_over)
+                if not position.size:
+                    break
+                row, word = divmod(int(position[0]), self.num_words)
+                cell = (tile_row * WORD_BITS + row,
+                        word * WORD_BITS + WORD_BITS - int(left_over[row, word]).bit_length())
+                component, touched = self._flood(cell)
+                words_per_iteration += self.stats["words_per_iteration"]
+                memory_bytes = max(memory_bytes, self.stats["memory_bytes"] + seen.nbytes)
+                component = component[touched]
+                seen[touched] |= component
+                if labels is not None:
+                    self._label(labels, component, touched, len(components))
+                components.append((cell, _popcount(component)))
+        self.stats = {
+            "iterations": len(words_per_iteration),
+            "words_processed": sum(words_per_iteration),
+            "words_per_iteration": words_per_iteration,
+            "memory_bytes": memory_bytes,
+        }
+        return components
+
+    def _label(self, labels, component, touched, index):
+        """Write index into labels at the cells of component, given as the words of the touched tiles."""
+        bits = np.ascontiguousarray(component.astype(">u8")).view(np.uint8)
+        tile, row, col = np.nonzero(np.unpackbits(bits.reshape(touched.size, WORD_BITS, 8), axis=2))
+        tile_row, tile_col = np.divmod(touched[tile], self.num_words)
+        labels[tile_row * WORD_BITS + row, tile_col * WORD_BITS + col] = index
+
+    def label_components(self):
+        """
+        rows x cols int32 labels (index into components(), -1 on walls) and the
+        list of components. The labels take 4 bytes per cell, unlike the boards.
+        """
+        labels = np.full((self.rows, self.cols), -1, dtype=np.int32)
+        components = self.components(labels)
+        return labels, components
+
+
+def is_solvable(maze_gen):
+    """Bitboard check that maze_gen.goal can be reached from maze_gen.start."""
+    return BitboardReachability(maze_gen).is_path(maze_gen.start, maze_gen.goal)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check solvability and count components of a large maze with bitboard flood fills."
+    )
+    parser.add_argument("--rows", type=int, default=2001, help="Number of rows (default: 2001)")
+    parser.add_argument("--cols", type=int, default=2001, help="Number of columns (default: 2001)")
+    parser.add_argument("--algorithm", default="kruskal", choices=["backtracker", "kruskal", "wilson"],
+                        help="Lattice maze generator (default: kruskal)")
+    parser.add_argument("--loops", type=float, default=0.1, help="Extra loop probability (default: 0.1)")
+    parser.add_argument("--seed", type=int, default=0, help="Maze seed (default: 0)")
+    args = parser.parse_args()
+
+    maze_gen = MazeGenerator(args.rows, args.cols, seed=args.seed)
+    maze_gen.generate_lattice_maze(algorithm=args.algorithm)
+    maze_gen.add_loops(probability=args.loops)
+    maze_gen.pack()
+
+    start_time = time.perf_counter()
+    engine = BitboardReachability(maze_gen)
+    solvable = engine.is_path(maze_gen.start, maze_gen.goal)
+    runtime = time.perf_counter() - start_time
+    stats = engine.stats
+    print(f"Solvable: {solvable} in {runtime:.4f}s, {stats['iterations']} rounds, "
+          f"{stats['words_processed']} words processed "
+          f"(up to {max(stats['words_per_iteration'], default=0)} per round)")
+    print(f"Bitboard memory: {stats['memory_bytes']} bytes (uint8 grid: {args.rows * args.cols} bytes)")
+
+    start_time = time.perf_counter()
+    count = engine.reachable_count(maze_gen.goal)
+    print(f"Cells reachable from the goal: {count} in {time.perf_counter() - start_time:.4f}s")
+    start_time = time.perf_counter()
+    components = engine.components()
+    print(f"Components: {len(components)}, largest {max((size for _, size in components), default=0)} cells, "
+          f"in {time.perf_counter() - start_time:.4f}s")
+
+    start_time = time.perf_counter()
+    maze_gen.is_path_to_goal()
+    print(f"MazeGenerator.is_path_to_goal: {time.perf_counter() - start_time:.4f}s")
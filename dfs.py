@@ -1,5 +1,6 @@
 import time
 import argparse
+from array import array
 from maze import MazeGenerator
 
 import numpy as np
@@ -7,15 +8,23 @@ import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
 
 
-def solve_maze_dfs(maze_gen):
+def solve_maze_dfs(maze_gen, probe=None):
     """
     Use Depth-First Search (DFS) with four metrics_dfs to solve the maze.
     1. runtime_dfs: total time in seconds
     2. states_expanded_dfs: number of cells popped from the stack_dfs
     3. peak_memory_usage_dfs: maximum stack_dfs size ever existing
     4. path_length_dfs: length of the last path (quality of solution)
+    path_extraction_time_dfs also reports the part of the runtime spent rebuilding the path.
+    graph_build_time_dfs reports building the maze's cached neighbor graph, which is not part of the runtime.
+    With a memory_probe.MemoryProbe as probe, the sizes of the frontier, visited and parents are recorded.
     """
-    start_time_dfs = time.time()
+    # Build the cached CSR adjacency before the timer starts, so the first solver
+    # run on a maze is not charged for it; its cost is reported on its own
+    graph_start_dfs = time.perf_counter()
+    graph = maze_gen.neighbor_graph()
+    graph_build_time_dfs = time.perf_counter() - graph_start_dfs
+    start_time_dfs = time.perf_counter()
 
     start = maze_gen.start
     goal = maze_gen.goal
@@ -24,6 +33,8 @@ def solve_maze_dfs(maze_gen):
     if not (0 <= start[0] < maze_gen.rows and 0 <= start[1] < maze_gen.cols):
         return [], {
             "runtime_dfs": 0,
+            "graph_build_time_dfs": graph_build_time_dfs,
+            "path_extraction_time_dfs": 0,
             "states_expanded_dfs": 0,
             "peak_memory_usage_dfs": 0,
             "path_length_dfs": 0
@@ -31,6 +42,8 @@ def solve_maze_dfs(maze_gen):
     if not (0 <= goal[0] < maze_gen.rows and 0 <= goal[1] < maze_gen.cols):
         return [], {
             "runtime_dfs": 0,
+            "graph_build_time_dfs": graph_build_time_dfs,
+            "path_extraction_time_dfs": 0,
             "states_expanded_dfs": 0,
             "peak_memory_usage_dfs": 0,
             "path_length_dfs": 0
@@ -38,14 +51,26 @@ def solve_maze_dfs(maze_gen):
     if maze_gen.maze[start] == 1 or maze_gen.maze[goal] == 1:
         return [], {
             "runtime_dfs": 0,
+            "graph_build_time_dfs": graph_build_time_dfs,
+            "path_extraction_time_dfs": 0,
             "states_expanded_dfs": 0,
             "peak_memory_usage_dfs": 0,
             "path_length_dfs": 0
         }
 
-    stack_dfs = [start]
-    visited_dfs = set([start])
-    came_from_dfs = {start: None}
+    # Search over flat cell ids (row * cols + col) using the cached CSR adjacency
+    offsets = graph.offsets_list
+    neighbors = graph.neighbors_list
+    cols = maze_gen.cols
+    start_id = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+
+    stack_dfs = [start_id]
+    # Flat search state: 1 byte per cell for visited, 4 bytes per cell for parents
+    num_cells = maze_gen.rows * cols
+    visited_dfs = bytearray(num_cells)
+    visited_dfs[start_id] = 1
+    came_from_dfs = array('i', [-1]) * num_cells
 
     states_expanded_dfs = 0
     # stack_dfs initially has 1 item
@@ -55,25 +80,35 @@ def solve_maze_dfs(maze_gen):
         current = stack_dfs.pop()
         states_expanded_dfs += 1
 
-        if current == goal:
+        if current == goal_id:
             break
 
-        for neighbor in maze_gen.get_neighbors(*current):
-            if neighbor not in visited_dfs:
-                visited_dfs.add(neighbor)
+        for neighbor in neighbors[offsets[current]:offsets[current + 1]]:
+            if not visited_dfs[neighbor]:
+                visited_dfs[neighbor] = 1
                 came_from_dfs[neighbor] = current
                 stack_dfs.append(neighbor)
 
         if len(stack_dfs) > peak_memory_usage_dfs:
             peak_memory_usage_dfs = len(stack_dfs)
+            if probe is not None:
+                probe.record("frontier", stack_dfs)
+
+    if probe is not None:
+        probe.record("visited", visited_dfs)
+        probe.record("parents", came_from_dfs)
 
     # Reconstruct the path
-    path = maze_gen.reconstruct_solution_path(came_from_dfs, start, goal)
+    path_start_dfs = time.perf_counter()
+    path = maze_gen.reconstruct_path_from_parents(came_from_dfs, start_id, goal_id)
+    path_extraction_time_dfs = time.perf_counter() - path_start_dfs
     path_length_dfs = len(path)
 
-    runtime_dfs = time.time() - start_time_dfs
+    runtime_dfs = time.perf_counter() - start_time_dfs
     metrics_dfs = {
         "runtime_dfs": runtime_dfs,
+        "graph_build_time_dfs": graph_build_time_dfs,
+        "path_extraction_time_dfs": path_extraction_time_dfs,
         "states_expanded_dfs": states_expanded_dfs,
         "peak_memory_usage_dfs": peak_memory_usage_dfs,
         "path_length_dfs": path_length_dfs
@@ -0,0 +1,278 @@
+import heapq
+import time
+from array import array
+import argparse
+import numpy as np
+from maze import MazeGenerator
+
+# g / rhs value of cells with no known route to the goal
+INFINITY = 2 ** 31 - 1
+
+
+class IncrementalPlanner:
+    """
+    D* Lite shortest-path planner over maze_gen that repairs its search after wall edits
+    instead of starting over. The search runs backward from the goal (g and rhs hold
+    step counts to the goal) toward the start with the Manhattan distance to the start
+    as heuristic, so plan() alone is A* with the roles of start and goal swapped.
+    apply_edits() opens or closes cells, writes them through to maze_gen.maze, and
+    re-plans touching only the cells whose distance to the goal can have changed.
+    move_start() lets the agent advance along the path between edits.
+    Both return (path, metrics) like the solve_maze_* functions, with the suffix _dstar:
+      1. runtime_dstar (seconds, the repair alone when called after edits)
+      2. states_expanded_dstar (cells popped and made consistent)
+      3. peak_memory_usage_dstar (max priority queue size during this call)
+      4. path_length_dstar (length of the found path)
+      path_extraction_time_dstar, cells_touched_dstar (distinct cells whose g or rhs
+      was recomputed), vertex_updates_dstar (rhs recomputations) and cells_edited_dstar
+      (edits that changed the grid) report the cost of the repair.
+    maze_gen.start is read once; later start moves go through move_start(). The goal is fixed.
+    """
+    def __init__(self, maze_gen, probe=None):
+        self.maze_gen = maze_gen
+        self.probe = probe
+        self.rows = maze_gen.rows
+        self.cols = maze_gen.cols
+        # Grid padded with one ring of walls, so neighbor steps need no bounds checks
+        self.width = self.cols + 2
+        self.grid = bytearray(np.pad(np.asarray(maze_gen.maze, dtype=np.uint8), 1,
+                                     constant_values=1).tobytes())
+        self.steps = (-self.width, self.width, -1, 1)
+        num_cells = len(self.grid)
+        self.g = array('i', [INFINITY]) * num_cells
+        self.rhs = array('i', [INFINITY]) * num_cells
+        self.start = maze_gen.start
+        self.goal = maze_gen.goal
+        self.start_id = self._padded_id(self.start)
+        self.goal_id = self._padded_id(self.goal)
+        # Key offset that keeps old queue keys valid lower bounds after the start moves
+        self.km = 0
+        self.open_set = []
+        self.planned = False
+        self.vertex_updates = 0
+
+    def _padded_id(self, cell):
+        return (cell[0] + 1) * self.width + cell[1] + 1
+
+    def _heuristic(self, cell):
+        r, c = divmod(cell, self.width)
+        return abs(r - self.start[0] - 1) + abs(c - self.start[1] - 1)
+
+    def _key(self, cell):
+        best = min(self.g[cell], self.rhs[cell])
+        return (best + self._heuristic(cell) + self.km, best)
+
+    def _update_vertex(self, cell, touched):
+        """Recompute rhs(cell) from its neighbors and queue it if it is inconsistent."""
+        grid, g, rhs = self.grid, self.g, self.rhs
+        if cell == self.goal_id:
+            best = 0 if not grid[cell] else INFINITY
+        elif grid[cell]:
+            best = INFINITY
+        else:
+            best = INFINITY
+            for step in self.steps:
+                neighbor = cell + step
+                if not grid[neighbor] and g[neighbor] + 1 < best:
+                    best = g[neighbor] + 1
+        rhs[cell] = best
+        touched.add(cell)
+        self.vertex_updates += 1
+        if g[cell] != best:
+            # Entries of cells that became consistent are dropped when popped
+            heapq.heappush(self.open_set, self._key(cell) + (cell,))
+
+    def _compute_shortest_path(self, touched, counters):
+        grid, g, rhs, steps = self.grid, self.g, self.rhs, self.steps
+        open_set = self.open_set
+        start_id = self.start_id
+        while open_set and (open_set[0][:2] < self._key(start_id) or rhs[start_id] != g[start_id]):
+            k1, k2, cell = heapq.heappop(open_set)
+            if g[cell] == rhs[cell]:
+                continue
+            key = self._key(cell)
+            if (k1, k2) < key:
+                # Queued before the start moved (or before g rose): requeue with the current key
+                heapq.heappush(open_set, key + (cell,))
+                continue
+            if (k1, k2) > key:
+                # A newer entry with the smaller current key is already queued
+                continue
+            counters["states_expanded"] += 1
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INFINITY
+                self._update_vertex(cell, touched)
+            for step in steps:
+                neighbor = cell + step
+                if not grid[neighbor]:
+                    self._update_vertex(neighbor, touched)
+            if len(open_set) > counters["peak_memory_usage"]:
+                counters["peak_memory_usage"] = len(open_set)
+                if self.probe is not None:
+                    self.probe.record("frontier", open_set)
+
+    def _extract_path(self):
+        """Greedy descent on g from the start; [] when the start cannot reach the goal."""
+        grid, g = self.grid, self.g
+        current = self.start_id
+        if grid[current] or g[current] >= INFINITY:
+            return []
+        path = [current]
+        while current != self.goal_id:
+            best, best_g = -1, g[current]
+            for step in self.steps:
+                neighbor = current + step
+                if not grid[neighbor] and g[neighbor] < best_g:
+                    best, best_g = neighbor, g[neighbor]
+            if best < 0:
+                return []
+            current = best
+            path.append(current)
+        return [(cell // self.width - 1, cell % self.width - 1) for cell in path]
+
+    def _run(self, start_time, cells_edited, touched):
+        counters = {"states_expanded": 0, "peak_memory_usage": len(self.open_set)}
+        self._compute_shortest_path(touched, counters)
+        if self.probe is not None:
+            self.probe.record("g_score", self.g)
+            self.probe.record("rhs", self.rhs)
+
+        path_start = time.perf_counter()
+        path = self._extract_path()
+        path_extraction_time = time.perf_counter() - path_start
+        runtime = time.perf_counter() - start_time
+        metrics = {
+            "runtime_dstar": runtime,
+            "path_extraction_time_dstar": path_extraction_time,
+            "states_expanded_dstar": counters["states_expanded"],
+            "peak_memory_usage_dstar": counters["peak_memory_usage"],
+            "path_length_dstar": len(path),
+            "cells_touched_dstar": len(touched),
+            "vertex_updates_dstar": self.vertex_updates,
+            "cells_edited_dstar": cells_edited
+        }
+        return path, metrics
+
+    def plan(self):
+        """
+        Run the initial search, or just return the current path when it is up to date.
+        """
+        start_time = time.perf_counter()
+        self.vertex_updates = 0
+        touched = set()
+        if not self.planned:
+            self.planned = True
+            self._update_vertex(self.goal_id, touched)
+        return self._run(start_time, 0, touched)
+
+    def apply_edits(self, edits):
+        """
+        Apply a batch of edits, each ((row, col), wall) with wall truthy to close the
+        cell and falsy to open it, then repair the search and return (path, metrics).
+        maze_gen.maze is edited in place and its cached adjacency is invalidated.
+        Edits outside the grid raise ValueError before anything changes.
+        """
+        start_time = time.perf_counter()
+        edits = [((int(r), int(c)), 1 if wall else 0) for (r, c), wall in edits]
+        for (r, c), _ in edits:
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                raise ValueError(f"Edit outside the {self.rows}x{self.cols} grid: {(r, c)}")
+        if not self.planned:
+            self.plan()
+
+        grid = self.grid
+        maze = self.maze_gen.maze
+        self.vertex_updates = 0
+        touched = set()
+        cells_edited = 0
+        for (r, c), wall in edits:
+            cell = self._padded_id((r, c))
+            if grid[cell] == wall:
+                continue
+            grid[cell] = wall
+            maze[r, c] = wall
+            cells_edited += 1
+            # Every edge into or out of the cell changed cost
+            self._update_vertex(cell, touched)
+            for step in self.steps:
+                neighbor = cell + step
+                if not grid[neighbor]:
+                    self._update_vertex(neighbor, touched)
+        if cells_edited:
+            self.maze_gen.invalidate_caches()
+        return self._run(start_time, cells_edited, touched)
+
+    def move_start(self, cell):
+        """
+        Move the start to the (row, col) cell, e.g. the next step of the current path,
+        and return the re-planned (path, metrics). Queued keys stay usable through km.
+        """
+        start_time = time.perf_counter()
+        if not self.planned:
+            self.plan()
+        self.vertex_updates = 0
+        new_id = self._padded_id(cell)
+        self.km += self._heuristic(new_id)
+        self.start = tuple(cell)
+        self.start_id = new_id
+        self.maze_gen.start = self.start
+        return self._run(start_time, 0, set())
+
+    def distance(self, cell):
+        """Steps from the (row, col) cell to the goal as far as the search has settled it, None if unknown."""
+        value = self.g[self._padded_id(cell)]
+        return None if value >= INFINITY else value
+
+
+def random_edits(maze_gen, count, rng):
+    """count random wall toggles on interior cells other than the start and goal."""
+    edits = []
+    while len(edits) < count:
+        r = int(rng.integers(1, maze_gen.rows - 1))
+        c = int(rng.integers(1, maze_gen.cols - 1))
+        if (r, c) in (maze_gen.start, maze_gen.goal):
+            continue
+        edits.append(((r, c), 1 - maze_gen.maze[r, c]))
+    return edits
+
+
+if __name__ == "__main__":
+    from astar import solve_maze_astar
+
+    parser = argparse.ArgumentParser(
+        description="Toggle walls between queries and compare D* Lite repairs with full A* replans."
+    )
+    parser.add_argument("--rows", type=int, default=101, help="Number of rows (default: 101)")
+    parser.add_argument("--cols", type=int, default=101, help="Number of columns (default: 101)")
+    parser.add_argument("--rounds", type=int, default=20, help="Edit batches to apply (default: 20)")
+    parser.add_argument("--edits", type=int, default=5, help="Wall toggles per batch (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Maze and edit seed (default: 0)")
+    args = parser.parse_args()
+
+    maze_gen = MazeGenerator(args.rows, args.cols, seed=args.seed)
+    maze_gen.generate_maze()
+    maze_gen.add_loops(probability=0.1)
+    planner = IncrementalPlanner(maze_gen)
+    path, metrics = planner.plan()
+    print("Initial D* Lite plan:", metrics)
+
+    rng = np.random.default_rng(args.seed)
+    repair = {"runtime": 0.0, "states_expanded": 0, "cells_touched": 0}
+    replan = {"runtime": 0.0, "states_expanded": 0}
+    for _ in range(args.rounds):
+        path, metrics = planner.apply_edits(random_edits(maze_gen, args.edits, rng))
+        _, metrics_astar = solve_maze_astar(maze_gen)
+        assert metrics["path_length_dstar"] == metrics_astar["path_length_astar"]
+        repair["runtime"] += metrics["runtime_dstar"]
+        repair["states_expanded"] += metrics["states_expanded_dstar"]
+        repair["cells_touched"] += metrics["cells_touched_dstar"]
+        replan["runtime"] += metrics_astar["runtime_astar"]
+        replan["states_expanded"] += metrics_astar["states_expanded_astar"]
+    print(f"D* Lite repair per batch: {repair['runtime'] / args.rounds:.5f}s, "
+          f"{repair['states_expanded'] / args.rounds:.1f} states expanded, "
+          f"{repair['cells_touched'] / args.rounds:.1f} cells touched")
+    print(f"Full A* replan per batch: {replan['runtime'] / args.rounds:.5f}s, "
+          f"{replan['states_expanded'] / args.rounds:.1f} states expanded")
+    maze_gen.visualize_maze(solution=path, title="Maze with D* Lite Solution after edits")
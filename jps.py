@@ -0,0 +1,176 @@
+import heapq
+import time
+from array import array
+import argparse
+import numpy as np
+from maze import MazeGenerator
+from astar import manhattan_distance
+
+
+def solve_maze_jps(maze_gen, probe=None):
+    """
+    Solve the maze with Jump Point Search adapted to the 4-connected unit-cost grid.
+    From every expanded cell the search jumps straight ahead, skipping corridor
+    cells, and only stops on a jump point: the goal, or a cell with an open
+    neighbor perpendicular to the jump (the only places a shortest path can turn).
+    A straight run into a wall is a dead end and yields no jump point. A* then
+    runs over the jump points with segment lengths as costs and the Manhattan
+    heuristic, so paths are optimal and as long as the ones from solve_maze_astar.
+    Moving back the way a cell was reached is pruned, since no shortest path does that.
+    Metrics:
+      1. runtime_jps (seconds)
+      2. states_expanded_jps (jump points popped from the priority queue)
+      3. peak_memory_usage_jps (max queue size)
+      4. path_length_jps (length of the found path, in cells)
+      jump_points_jps counts the jump points found, cells_scanned_jps the cells stepped
+      over while jumping, and path_extraction_time_jps the part of the runtime spent
+      rebuilding the path.
+      With a memory_probe.MemoryProbe as probe, the sizes of the frontier, parents and g_score are recorded.
+    """
+    start_time_jps = time.perf_counter()
+
+    start = maze_gen.start
+    goal = maze_gen.goal
+
+    # Edge case checks
+    if not (0 <= start[0] < maze_gen.rows and 0 <= start[1] < maze_gen.cols) or \
+            not (0 <= goal[0] < maze_gen.rows and 0 <= goal[1] < maze_gen.cols) or \
+            maze_gen.maze[start] == 1 or maze_gen.maze[goal] == 1:
+        return [], {
+            "runtime_jps": 0,
+            "path_extraction_time_jps": 0,
+            "states_expanded_jps": 0,
+            "peak_memory_usage_jps": 0,
+            "path_length_jps": 0,
+            "jump_points_jps": 0,
+            "cells_scanned_jps": 0
+        }
+
+    # Flat ids on a copy of the grid padded with one ring of walls, so jumps need no bounds checks
+    width = maze_gen.cols + 2
+    grid = np.pad(np.asarray(maze_gen.maze, dtype=np.uint8), 1, constant_values=1).tobytes()
+    start_id = (start[0] + 1) * width + start[1] + 1
+    goal_id = (goal[0] + 1) * width + goal[1] + 1
+    goal_padded = (goal[0] + 1, goal[1] + 1)
+    # U, D, L, R steps; the reverse of direction d is d ^ 1
+    steps = (-width, width, -1, 1)
+    perpendicular = ((-1, 1), (-1, 1), (-width, width), (-width, width))
+
+    num_cells = len(grid)
+    came_from_jps = array('i', [-1]) * num_cells
+    g_score = array('i', [-1]) * num_cells
+    # Direction each jump point was reached with, 4 for the start
+    arrived_by = bytearray(b'\x04') * num_cells
+    g_score[start_id] = 0
+
+    open_set_jps = [(manhattan_distance(divmod(start_id, width), goal_padded), start_id)]
+    states_expanded_jps = 0
+    peak_memory_usage_jps = 1
+    jump_points_jps = 0
+    cells_scanned_jps = 0
+    reached = False
+
+    while open_set_jps:
+        f_current, current = heapq.heappop(open_set_jps)
+        if f_current - manhattan_distance(divmod(current, width), goal_padded) > g_score[current]:
+            # Stale entry: the cell was pushed again with a smaller g
+            continue
+        states_expanded_jps += 1
+        if current == goal_id:
+            reached = True
+            break
+
+        came_in = arrived_by[current]
+        g_current = g_score[current]
+        for direction in range(4):
+            if direction ^ 1 == came_in:
+                continue
+            step = steps[direction]
+            side_a, side_b = perpendicular[direction]
+            # Jump straight ahead until a jump point or a wall
+            cell = current
+            distance = 0
+            jump_point = -1
+            while True:
+                cell += step
+                if grid[cell]:
+                    break
+                distance += 1
+                if cell == goal_id or not grid[cell + side_a] or not grid[cell + side_b]:
+                    jump_point = cell
+                    break
+            cells_scanned_jps += distance
+            if jump_point < 0:
+                continue
+
+            jump_points_jps += 1
+            tentative_g = g_current + distance
+            if g_score[jump_point] < 0 or tentative_g < g_score[jump_point]:
+                g_score[jump_point] = tentative_g
+                came_from_jps[jump_point] = current
+                arrived_by[jump_point] = direction
+                f_score = tentative_g + manhattan_distance(divmod(jump_point, width), goal_padded)
+                heapq.heappush(open_set_jps, (f_score, jump_point))
+
+        if len(open_set_jps) > peak_memory_usage_jps:
+            peak_memory_usage_jps = len(open_set_jps)
+            if probe is not None:
+                probe.record("frontier", open_set_jps)
+
+    if probe is not None:
+        probe.record("parents", came_from_jps)
+        probe.record("g_score", g_score)
+
+    # Reconstruct the path, filling in the straight segments between jump points
+    path_start_jps = time.perf_counter()
+    path = []
+    if reached:
+        current = goal_id
+        while current != start_id:
+            parent = came_from_jps[current]
+            step = steps[arrived_by[current]]
+            while current != parent:
+                path.append(current)
+                current -= step
+        path.append(start_id)
+        path.reverse()
+        path = [(cell // width - 1, cell % width - 1) for cell in path]
+    path_extraction_time_jps = time.perf_counter() - path_start_jps
+    path_length_jps = len(path)
+    runtime_jps = time.perf_counter() - start_time_jps
+
+    metrics_jps = {
+        "runtime_jps": runtime_jps,
+        "path_extraction_time_jps": path_extraction_time_jps,
+        "states_expanded_jps": states_expanded_jps,
+        "peak_memory_usage_jps": peak_memory_usage_jps,
+        "path_length_jps": path_length_jps,
+        "jump_points_jps": jump_points_jps,
+        "cells_scanned_jps": cells_scanned_jps
+    }
+    return path, metrics_jps
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate and solve a maze using Jump Point Search."
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=50,
+        help="Number of rows for the maze (default: 50)"
+    )
+    parser.add_argument(
+        "--cols",
+        type=int,
+        default=50,
+        help="Number of columns for the maze (default: 50)"
+    )
+    args = parser.parse_args()
+
+    maze_gen = MazeGenerator(args.rows, args.cols)
+    maze_gen.generate_maze()
+    maze_gen.add_loops(probability=0.1)
+    path, metrics_jps = solve_maze_jps(maze_gen)
+    print("JPS metrics:", metrics_jps)
+    maze_gen.visualize_maze(solution=path, title="Maze with JPS Solution")
@@ -0,0 +1,630 @@
+import heapq
+import time
+from array import array
+import argparse
+import numpy as np
+from maze import MazeGenerator, PolicyGrid, value_tie_tolerance
+from astar import manhattan_distance
+
+
+class JunctionGraph:
+    """
+    Weighted graph of maze junctions, built from a MazeGenerator in two passes:
+      1. Dead-end pruning: open cells with at most one open neighbor are peeled
+         off repeatedly (never the start or goal). Each pruned cell remembers the
+         neighbor it hung from, so the pruned trees can be filled in afterwards.
+      2. Corridor contraction: of the cells left, those whose degree is not 2
+         (plus the start and goal) become nodes. Every corridor of degree-2
+         cells between two nodes becomes a pair of directed edges weighted by
+         its length in steps. A loop of degree-2 cells with no junction on it
+         gets one of its cells as a node.
+    Cells are flat ids (row * cols + col) and nodes are indices into node_cells.
+    Edges are in CSR form: the edges leaving node u are
+    edge_offsets[u]:edge_offsets[u + 1], in U, D, L, R order of their first step.
+    For edge e, edge_target[e] is the node it ends at, edge_weight[e] its length,
+    edge_direction[e] the index (U=0, D=1, L=2, R=3) of its first step, and
+    corridor_cells[corridor_offsets[e]:corridor_offsets[e + 1]] the cells strictly
+    between its two ends, in walking order.
+    """
+    def __init__(self, maze_gen):
+        rows, cols = maze_gen.rows, maze_gen.cols
+        self.rows = rows
+        self.cols = cols
+        self.start_id = maze_gen.start[0] * cols + maze_gen.start[1]
+        self.goal_id = maze_gen.goal[0] * cols + maze_gen.goal[1]
+
+        graph = maze_gen.neighbor_graph()
+        offsets = graph.offsets_list
+        neighbors = graph.neighbors_list
+        open_cells = (maze_gen.maze == 0).ravel()
+        num_cells = rows * cols
+        self.open_cells = int(np.count_nonzero(open_cells))
+
+        # Pass 1: peel off dead ends
+        kept = bytearray(open_cells.astype(np.uint8).tobytes())
+        degree = array('i', np.where(open_cells, np.diff(graph.offsets), 0).astype(np.int32).tobytes())
+        protected = {self.start_id, self.goal_id}
+        pruned_parent = array('i', [-1]) * num_cells
+        pruned_order = array('i')
+        stack = [int(cell) for cell in np.flatnonzero(open_cells & (np.asarray(degree) <= 1))
+                 if cell not in protected]
+        while stack:
+            cell = stack.pop()
+            if not kept[cell]:
+                continue
+            kept[cell] = 0
+            pruned_order.append(cell)
+            for neighbor in neighbors[offsets[cell]:offsets[cell + 1]]:
+                if kept[neighbor]:
+                    pruned_parent[cell] = neighbor
+                    degree[neighbor] -= 1
+                    if degree[neighbor] <= 1 and neighbor not in protected:
+                        stack.append(neighbor)
+        self.pruned_order = pruned_order
+        self.pruned_parent = pruned_parent
+
+        # Pass 2: contract corridors between nodes
+        node_of = array('i', [-1]) * num_cells
+        node_cells = array('i')
+        for cell in np.flatnonzero(np.frombuffer(kept, dtype=np.uint8) &
+                                   (np.asarray(degree) != 2)).tolist():
+            node_of[cell] = len(node_cells)
+            node_cells.append(cell)
+        for cell in protected:
+            if kept[cell] and node_of[cell] < 0:
+                node_of[cell] = len(node_cells)
+                node_cells.append(cell)
+        # Nodes get their edges in order, so node u's edges are contiguous
+        node_cells = array('i', sorted(node_cells))
+        for index, cell in enumerate(node_cells):
+            node_of[cell] = index
+
+        steps = (-cols, cols, -1, 1)
+        covered = bytearray(num_cells)
+        edge_offsets = array('i', [0])
+        edge_target = array('i')
+        edge_weight = array('i')
+        edge_direction = array('b')
+        corridor_offsets = array('i', [0])
+        corridor_cells = array('i')
+
+        def add_edges(node_cell):
+            for neighbor in neighbors[offsets[node_cell]:offsets[node_cell + 1]]:
+                if not kept[neighbor]:
+                    continue
+                previous, current, weight = node_cell, neighbor, 1
+                while node_of[current] < 0:
+                    covered[current] = 1
+                    corridor_cells.append(current)
+                    for following in neighbors[offsets[current]:offsets[current + 1]]:
+                        if kept[following] and following != previous:
+                            break
+                    previous, current = current, following
+                    weight += 1
+                edge_target.append(node_of[current])
+                edge_weight.append(weight)
+                edge_direction.append(steps.index(neighbor - node_cell))
+                corridor_offsets.append(len(corridor_cells))
+            edge_offsets.append(len(edge_target))
+
+        index = 0
+        while index < len(node_cells):
+            add_edges(node_cells[index])
+            index += 1
+        # Junction-free loops of corridor cells: promote one cell of each to a node
+        uncovered = np.frombuffer(kept, dtype=np.bool_) & ~np.frombuffer(covered, dtype=np.bool_)
+        for cell in np.flatnonzero(uncovered).tolist():
+            if covered[cell] or node_of[cell] >= 0:
+                continue
+            node_of[cell] = len(node_cells)
+            node_cells.append(cell)
+            add_edges(cell)
+
+        self.node_of = np.frombuffer(node_of, dtype=np.int32)
+        self.node_cells = np.frombuffer(node_cells, dtype=np.int32)
+        self.edge_offsets = np.frombuffer(edge_offsets, dtype=np.int32)
+        self.edge_target = np.frombuffer(edge_target, dtype=np.int32)
+        self.edge_weight = np.frombuffer(edge_weight, dtype=np.int32)
+        self.edge_direction = np.frombuffer(edge_direction, dtype=np.int8)
+        self.corridor_offsets = np.frombuffer(corridor_offsets, dtype=np.int32)
+        self.corridor_cells = np.frombuffer(corridor_cells, dtype=np.int32)
+        # array.array views for Python loops
+        self.edge_offsets_list = edge_offsets
+        self.edge_target_list = edge_target
+        self.edge_weight_list = edge_weight
+        self.corridor_offsets_list = corridor_offsets
+        self.corridor_cells_list = corridor_cells
+
+    @property
+    def num_nodes(self):
+        return len(self.node_cells)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_target)
+
+    def stats(self):
+        """Sizes before and after pruning and contraction."""
+        return {
+            "open_cells": self.open_cells,
+            "pruned_cells": len(self.pruned_order),
+            "nodes": self.num_nodes,
+            "edges": self.num_edges,
+            "reduction": self.open_cells / max(1, self.num_nodes),
+        }
+
+    def expand_path(self, parent_edge, goal_node):
+        """
+        Turn a search tree over nodes into the full cell path ending at goal_node.
+        parent_edge[v] is the edge the search reached node v through, -1 at the root.
+        Returns the path as (row, col) tuples.
+        """
+        source = np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.edge_offsets))
+        cells = []
+        node = goal_node
+        while parent_edge[node] >= 0:
+            edge = parent_edge[node]
+            cells.append(self.node_cells[node])
+            corridor = self.corridor_cells_list[self.corridor_offsets_list[edge]:self.corridor_offsets_list[edge + 1]]
+            cells.extend(reversed(corridor))
+            node = int(source[edge])
+        cells.append(self.node_cells[node])
+        cells.reverse()
+        return [divmod(int(cell), self.cols) for cell in cells]
+
+    def expand_values(self, node_values, best_edge, gamma, distances=None, tolerance=None):
+        """
+        Per-cell values and policy from node values and each node's chosen edge
+        (-1 for none), for the maze MDP with reward -1 per step and discount gamma.
+        Corridor cells take the better of walking to either end and pruned cells walk
+        back toward the cell they hung from. Cells that cannot reach the goal (nodes
+        valued -9999, and the corridors and pruned trees that only lead to them)
+        are -9999 with no action, as in the cell solvers.
+        Corridor values within tolerance (value_tie_tolerance by default) of each
+        other are ties, broken toward the end with fewer steps to the goal when
+        distances (flat BFS moves to the goal, as from MazeGenerator.goal_distances)
+        is given.
+        Returns (V, policy_idx): rows x cols arrays of values and action indices
+        (0..3 for U, D, L, R, 4 for none); walls have value 0 and no action.
+        """
+        cols = self.cols
+        num_cells = self.rows * cols
+        out_of_reach = -9999.0
+        if tolerance is None:
+            tolerance = value_tie_tolerance(gamma)
+        V = np.zeros(num_cells)
+        policy_idx = np.full(num_cells, 4, dtype=np.int8)
+
+        V[self.node_cells] = node_values
+        has_edge = best_edge >= 0
+        policy_idx[self.node_cells[has_edge]] = self.edge_direction[best_edge[has_edge]]
+
+        # Corridor cells: candidate k steps into edge e, heading on toward its end
+        lengths = np.diff(self.corridor_offsets)
+        if self.corridor_cells.size:
+            edge_of = np.repeat(np.arange(self.num_edges), lengths)
+            position = np.arange(self.corridor_cells.size) - self.corridor_offsets[edge_of] + 1
+            remaining = self.edge_weight[edge_of] - position
+            discount = np.power(gamma, remaining)
+            target_values = node_values[self.edge_target[edge_of]]
+            values = np.where(target_values > out_of_reach,
+                              -(1 - discount) / (1 - gamma) + discount * target_values, out_of_reach)
+            following = np.roll(self.corridor_cells, -1)
+            last = self.corridor_offsets[1:][lengths > 0] - 1
+            following[last] = self.node_cells[self.edge_target[edge_of[last]]]
+            delta = following - self.corridor_cells
+            direction = np.select([delta == -cols, delta == cols, delta == -1], [0, 1, 2], 3).astype(np.int8)
+            # Moves left to the goal through each candidate, for breaking ties
+            if distances is None:
+                steps_left = np.zeros(edge_of.size, dtype=np.int64)
+            else:
+                steps_left = _steps_through(remaining, distances[self.node_cells[self.edge_target[edge_of]]])
+            # Best value per cell, then the candidates within tolerance of it
+            order = np.lexsort((-values, self.corridor_cells))
+            cells = self.corridor_cells[order]
+            first = np.ones(cells.size, dtype=bool)
+            first[1:] = cells[1:] != cells[:-1]
+            cell_best = np.empty(num_cells)
+            cell_best[cells[first]] = values[order][first]
+            tied = values >= cell_best[self.corridor_cells] - tolerance
+            # Best candidate per cell; ties go toward the goal, then to the first action in U, D, L, R order
+            order = np.lexsort((direction, steps_left, ~tied, self.corridor_cells))
+            cells = self.corridor_cells[order]
+            V[cells[first]] = values[order][first]
+            policy_idx[cells[first]] = np.where(values[order][first] > out_of_reach, direction[order][first], 4)
+
+        # Pruned trees, from the cells nearest the kept graph outward
+        steps = {-cols: 0, cols: 1, -1: 2, 1: 3}
+        for cell in reversed(self.pruned_order):
+            parent = self.pruned_parent[cell]
+            if parent < 0 or V[parent] <= out_of_reach:
+                V[cell] = out_of_reach
+            else:
+                V[cell] = -1 + gamma * V[parent]
+                policy_idx[cell] = steps[parent - cell]
+
+        V[self.goal_id] = 0.0
+        policy_idx[self.goal_id] = 4
+        return V.reshape(self.rows, cols), policy_idx.reshape(self.rows, cols)
+
+
+def _search(graph, method, probe=None):
+    """
+    Shortest path from the start node to the goal node.
+    method: 'bfs' (bucket queue over integer distances, a BFS generalized to
+    weighted edges), 'dijkstra' (binary heap) or 'astar' (binary heap with the
+    Manhattan heuristic, which edge lengths never undercut).
+    Returns (parent_edge, reached, states_expanded, peak_memory_usage).
+    """
+    num_nodes = graph.num_nodes
+    edge_offsets = graph.edge_offsets_list
+    edge_target = graph.edge_target_list
+    edge_weight = graph.edge_weight_list
+    node_cells = graph.node_cells
+    start_node = graph.node_of[graph.start_id]
+    goal_node = graph.node_of[graph.goal_id]
+    goal = divmod(graph.goal_id, graph.cols)
+
+    dist = array('i', [-1]) * num_nodes
+    parent_edge = array('i', [-1]) * num_nodes
+    settled = bytearray(num_nodes)
+    dist[start_node] = 0
+    states_expanded = 0
+    peak_memory_usage = 1
+    reached = False
+
+    if method == "bfs":
+        # Circular buckets: no tentative distance is more than max weight ahead of the current one
+        num_buckets = int(graph.edge_weight.max(initial=1)) + 1
+        buckets = [[] for _ in range(num_buckets)]
+        buckets[0].append(start_node)
+        queued = 1
+        current_dist = 0
+        while queued:
+            bucket = buckets[current_dist % num_buckets]
+            if not bucket:
+                current_dist += 1
+                continue
+            node = bucket.pop()
+            queued -= 1
+            if settled[node] or dist[node] != current_dist:
+                continue
+            settled[node] = 1
+            states_expanded += 1
+            if node == goal_node:
+                reached = True
+                break
+            for edge in range(edge_offsets[node], edge_offsets[node + 1]):
+                target = edge_target[edge]
+                tentative = current_dist + edge_weight[edge]
+                if dist[target] < 0 or tentative < dist[target]:
+                    dist[target] = tentative
+                    parent_edge[target] = edge
+                    buckets[tentative % num_buckets].append(target)
+                    queued += 1
+            if queued > peak_memory_usage:
+                peak_memory_usage = queued
+                if probe is not None:
+                    probe.record("frontier", buckets)
+        if probe is not None:
+            probe.record("visited", settled)
+            probe.record("parents", parent_edge)
+        return parent_edge, reached, states_expanded, peak_memory_usage
+
+    if method not in ("dijkstra", "astar"):
+        raise ValueError(f"Unknown junction search method: {method!r}")
+
+    def heuristic(node):
+        if method == "dijkstra":
+            return 0
+        return manhattan_distance(divmod(int(node_cells[node]), graph.cols), goal)
+
+    open_set = [(heuristic(start_node), start_node)]
+    while open_set:
+        _, node = heapq.heappop(open_set)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        states_expanded += 1
+        if node == goal_node:
+            reached = True
+            break
+        for edge in range(edge_offsets[node], edge_offsets[node + 1]):
+            target = edge_target[edge]
+            tentative = dist[node] + edge_weight[edge]
+            if dist[target] < 0 or tentative < dist[target]:
+                dist[target] = tentative
+                parent_edge[target] = edge
+                heapq.heappush(open_set, (tentative + heuristic(target), target))
+        if len(open_set) > peak_memory_usage:
+            peak_memory_usage = len(open_set)
+            if probe is not None:
+                probe.record("frontier", open_set)
+    if probe is not None:
+        probe.record("visited", settled)
+        probe.record("parents", parent_edge)
+    return parent_edge, reached, states_expanded, peak_memory_usage
+
+
+def _solve_maze_junction_search(maze_gen, method, suffix, graph, probe):
+    start_time = time.perf_counter()
+    start, goal = maze_gen.start, maze_gen.goal
+    if not (0 <= start[0] < maze_gen.rows and 0 <= start[1] < maze_gen.cols) or \
+            not (0 <= goal[0] < maze_gen.rows and 0 <= goal[1] < maze_gen.cols) or \
+            maze_gen.maze[start] == 1 or maze_gen.maze[goal] == 1:
+        return [], {
+            f"runtime_{suffix}": 0,
+            f"contraction_time_{suffix}": 0,
+            f"path_extraction_time_{suffix}": 0,
+            f"states_expanded_{suffix}": 0,
+            f"peak_memory_usage_{suffix}": 0,
+            f"path_length_{suffix}": 0,
+            f"graph_nodes_{suffix}": 0
+        }
+
+    if graph is None:
+        graph = JunctionGraph(maze_gen)
+    contraction_time = time.perf_counter() - start_time
+    parent_edge, reached, states_expanded, peak_memory_usage = _search(graph, method, probe)
+
+    path_start = time.perf_counter()
+    path = graph.expand_path(parent_edge, graph.node_of[graph.goal_id]) if reached else []
+    path_extraction_time = time.perf_counter() - path_start
+
+    runtime = time.perf_counter() - start_time
+    metrics = {
+        f"runtime_{suffix}": runtime,
+        f"contraction_time_{suffix}": contraction_time,
+        f"path_extraction_time_{suffix}": path_extraction_time,
+        f"states_expanded_{suffix}": states_expanded,
+        f"peak_memory_usage_{suffix}": peak_memory_usage,
+        f"path_length_{suffix}": len(path),
+        f"graph_nodes_{suffix}": graph.num_nodes
+    }
+    return path, metrics
+
+
+def solve_maze_junction_bfs(maze_gen, graph=None, probe=None):
+    """
+    Solve the maze with a bucket-queue BFS over the junction graph.
+    Metrics use the usual keys with the suffix _jbfs (states_expanded counts
+    junction nodes), plus contraction_time_jbfs for building the graph and
+    graph_nodes_jbfs for its size.
+    graph reuses a JunctionGraph already built for this maze, start and goal,
+    so repeated queries skip the contraction.
+    With a memory_probe.MemoryProbe as probe, the sizes of the frontier, visited and parents are recorded.
+    """
+    return _solve_maze_junction_search(maze_gen, "bfs", "jbfs", graph, probe)
+
+
+def solve_maze_junction_dijkstra(maze_gen, graph=None, probe=None):
+    """
+    Solve the maze with Dijkstra's algorithm over the junction graph.
+    Metrics, graph and probe are as in solve_maze_junction_bfs, with the suffix _jdijkstra.
+    """
+    return _solve_maze_junction_search(maze_gen, "dijkstra", "jdijkstra", graph, probe)
+
+
+def solve_maze_junction_astar(maze_gen, graph=None, probe=None):
+    """
+    Solve the maze with A* (Manhattan heuristic) over the junction graph.
+    Metrics, graph and probe are as in solve_maze_junction_bfs, with the suffix _jastar.
+    """
+    return _solve_maze_junction_search(maze_gen, "astar", "jastar", graph, probe)
+
+
+def _edge_rewards(graph, gamma):
+    """Discounted reward and discount of walking each edge: (-(1 - gamma^w) / (1 - gamma), gamma^w)."""
+    if not 0 <= gamma < 1:
+        raise ValueError(f"Junction MDP solvers need 0 <= gamma < 1, got {gamma}")
+    discount = np.power(gamma, graph.edge_weight.astype(np.float64))
+    return -(1 - discount) / (1 - gamma), discount
+
+
+def _steps_through(weights, target_distances):
+    """
+    Moves to the goal when taking a step or edge of the given lengths to cells that
+    are target_distances BFS moves from it; out of reach (negative) ranks last.
+    """
+    target_distances = np.asarray(target_distances, dtype=np.int64)
+    return np.where(target_distances >= 0, weights + target_distances, np.iinfo(np.int32).max)
+
+
+def _edge_distances(generator, graph):
+    """Moves to the goal through every edge: its length plus its target's BFS distance."""
+    node_distances = generator.goal_distances().ravel()[graph.node_cells]
+    return _steps_through(graph.edge_weight, node_distances[graph.edge_target])
+
+
+def _best_edges(graph, q_values, movable, edge_distances, tolerance):
+    """
+    Best edge of every movable node by Q-value, -1 elsewhere. Edges within
+    tolerance of the best Q-value are ties, broken toward the fewest moves to the
+    goal (edge_distances) and then toward the node's first edge, i.e. the first
+    action in U, D, L, R order: far from the goal the values round to the same
+    number, and the Q-values alone no longer point the way.
+    Returns (best_edge, best_value) per node, best_value being -inf where not movable.
+    """
+    # reduceat segments must cover every edge, so reduce over all nodes that have edges
+    has_edges = np.diff(graph.edge_offsets) > 0
+    segment_starts = graph.edge_offsets[:-1][has_edges]
+    best_value = np.full(graph.num_nodes, -np.inf)
+    best_edge = np.full(graph.num_nodes, -1, dtype=np.int64)
+    if segment_starts.size:
+        best_value[has_edges] = np.maximum.reduceat(q_values, segment_starts)
+        tied = q_values >= np.repeat(best_value, np.diff(graph.edge_offsets)) - tolerance
+        # One key per edge orders the ties by distance, then by edge index
+        key = edge_distances * graph.num_edges + np.arange(graph.num_edges)
+        candidates = np.where(tied, key, np.iinfo(np.int64).max)
+        best_edge[has_edges] = np.minimum.reduceat(candidates, segment_starts) % graph.num_edges
+    best_value[~movable] = -np.inf
+    best_edge[~movable] = -1
+    return best_edge, best_value
+
+
+def solve_maze_junction_value_iteration(generator, gamma=0.9, theta=1e-4, max_iter=5000, graph=None, probe=None):
+    """
+    Value Iteration on the junction graph, expanded back to every cell.
+    A backup of node u takes the best edge u -> v of length w:
+    -(1 - gamma^w) / (1 - gamma) + gamma^w * V(v), which is exactly what w
+    single steps along the corridor add up to. Values start from -distance (BFS
+    moves to the goal) like initialize_values_bfs, and only goal-reachable nodes
+    are backed up; the rest, with the cells that lead only to them, are -9999.
+    One sweep carries values a whole edge, so when the sweeps stop, far nodes can
+    still rank a route of few long edges above a shorter one of many: Q-values
+    within the error bound gamma * delta / (1 - gamma) of the last change delta
+    (at least value_tie_tolerance) are ties, going to the edge with the fewest
+    moves to the goal.
+    Returns the same triple as solve_maze_value_iteration: V (2D numpy array,
+    walls 0), the PolicyGrid policy, and the number of node backups.
+    graph reuses a JunctionGraph already built for this maze and goal.
+    With a memory_probe.MemoryProbe as probe, the sizes of V and the policy are recorded.
+    """
+    if graph is None:
+        graph = JunctionGraph(generator)
+    rewards, discounts = _edge_rewards(graph, gamma)
+    edge_offsets = graph.edge_offsets
+    targets = graph.edge_target
+    goal_node = graph.node_of[graph.goal_id]
+
+    # Nodes that get backed up: goal-reachable nodes other than the goal, which all have edges.
+    # reduceat segments must cover every edge, so maxima are taken over all nodes with edges
+    has_edges = np.diff(edge_offsets) > 0
+    distance = generator.goal_distances().ravel()[graph.node_cells]
+    movable = has_edges & (distance > 0)
+    segment_starts = edge_offsets[:-1][has_edges]
+    movable_with_edges = movable[has_edges]
+    num_movable = int(np.count_nonzero(movable))
+    # Start from -distance like solve_maze_value_iteration; nodes out of reach stay at -9999
+    V = np.where(distance >= 0, -distance.astype(np.float64), -9999.0)
+    if goal_node >= 0:
+        V[goal_node] = 0.0
+
+    states_expanded = 0
+    delta = 0.0
+    q_values = rewards.copy()
+    for _ in range(max_iter):
+        np.multiply(discounts, V[targets], out=q_values)
+        q_values += rewards
+        states_expanded += num_movable
+        if not num_movable:
+            break
+        best_value = np.maximum.reduceat(q_values, segment_starts)[movable_with_edges]
+        delta = np.max(np.abs(best_value - V[movable]), initial=0.0)
+        V[movable] = best_value
+        if delta < theta:
+            break
+
+    np.multiply(discounts, V[targets], out=q_values)
+    q_values += rewards
+    tolerance = max(value_tie_tolerance(gamma), gamma * delta / (1 - gamma))
+    best_edge, _ = _best_edges(graph, q_values, movable, _edge_distances(generator, graph), tolerance)
+    V_cells, policy_idx = graph.expand_values(V, best_edge, gamma, generator.goal_distances().ravel(), tolerance)
+    policy = PolicyGrid(policy_idx)
+    if probe is not None:
+        probe.record("V", V_cells)
+        probe.record("policy", policy)
+    return V_cells, policy, states_expanded
+
+
+def solve_maze_junction_policy_iteration(generator, gamma=0.9, graph=None, probe=None, max_iter=1000):
+    """
+    Policy Iteration on the junction graph, expanded back to every cell.
+    Each policy is evaluated exactly: following it from a node composes the
+    affine edge backups V(u) = r_e + gamma^w_e * V(v) along a functional graph,
+    which pointer jumping collapses in log2(nodes) array passes. Nodes whose
+    policy never reaches the goal are worth -1 / (1 - gamma); nodes that cannot
+    reach it at all are -9999 with no edge, as in the cell solvers.
+    A node keeps its edge unless another one is better by more than
+    value_tie_tolerance, or ties it with fewer moves to the goal (see _best_edges);
+    max_iter caps the number of improvement steps.
+    Returns the same triple as solve_maze_policy_iteration, with V as a 2D list.
+    graph and probe are as in solve_maze_junction_value_iteration.
+    """
+    if graph is None:
+        graph = JunctionGraph(generator)
+    rewards, discounts = _edge_rewards(graph, gamma)
+    edge_offsets = graph.edge_offsets
+    targets = graph.edge_target
+    num_nodes = graph.num_nodes
+    goal_node = graph.node_of[graph.goal_id]
+    nodes = np.arange(num_nodes)
+
+    reachable = generator.goal_distances().ravel()[graph.node_cells] >= 0
+    movable = (np.diff(edge_offsets) > 0) & reachable
+    if goal_node >= 0:
+        movable[goal_node] = False
+    num_movable = int(np.count_nonzero(movable))
+    edge_distances = _edge_distances(generator, graph)
+    tolerance = value_tie_tolerance(gamma)
+    # Start from every node's first edge, as the cell solver starts from 'U'
+    best_edge = np.where(movable, edge_offsets[:-1], -1)
+
+    states_expanded = 0
+    for _ in range(max_iter):
+        # Policy Evaluation
+        # Edge -1 picks the appended sentinel: nodes that cannot move keep V(u) = 0 + 1 * V(u)
+        nxt = np.append(targets, 0)[best_edge]
+        nxt[~movable] = nodes[~movable]
+        offset = np.append(rewards, 0.0)[best_edge]
+        scale = np.append(discounts, 1.0)[best_edge]
+        with np.errstate(under='ignore'):
+            for _ in range(max(1, int(num_nodes).bit_length())):
+                offset = offset + scale * offset[nxt]
+                scale = scale * scale[nxt]
+                nxt = nxt[nxt]
+        V = np.where(nxt == goal_node, offset, -1 / (1 - gamma))
+        V[~reachable] = -9999.0
+        if goal_node >= 0:
+            V[goal_node] = 0.0
+        states_expanded += num_movable
+
+        # Policy Improvement
+        q_values = rewards + discounts * V[targets]
+        new_edge, best_value = _best_edges(graph, q_values, movable, edge_distances, tolerance)
+        # Keep the current edge unless another one is better by more than rounding or
+        # as good and closer to the goal, otherwise ties can swap back and forth forever
+        current_q = np.append(q_values, -np.inf)[best_edge]
+        current_distance = np.append(edge_distances, 0)[best_edge]
+        keep = (current_q >= best_value - tolerance) & (current_distance <= np.append(edge_distances, 0)[new_edge])
+        new_edge = np.where(movable & keep, best_edge, new_edge)
+        states_expanded += num_movable
+        if np.array_equal(new_edge, best_edge):
+            break
+        best_edge = new_edge
+
+    V_cells, policy_idx = graph.expand_values(V, best_edge, gamma, generator.goal_distances().ravel())
+    V_cells = V_cells.tolist()
+    policy = PolicyGrid(policy_idx)
+    if probe is not None:
+        probe.record("V", V_cells)
+        probe.record("policy", policy)
+    return V_cells, policy, states_expanded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Contract a maze into a junction graph and solve it on the graph."
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=50,
+        help="Number of rows for the maze (default: 50)"
+    )
+    parser.add_argument(
+        "--cols",
+        type=int,
+        default=50,
+        help="Number of columns for the maze (default: 50)"
+    )
+    args = parser.parse_args()
+
+    maze_gen = MazeGenerator(args.rows, args.cols)
+    maze_gen.generate_maze()
+    maze_gen.add_loops(probability=0.1)
+    print("Junction graph:", JunctionGraph(maze_gen).stats())
+    for solver in (solve_maze_junction_bfs, solve_maze_junction_dijkstra, solve_maze_junction_astar):
+        path, metrics = solver(maze_gen)
+        print(f"{solver.__name__} metrics:", metrics)
+    maze_gen.visualize_maze(solution=path, title="Maze with Junction A* Solution")
@@ -0,0 +1,190 @@
+import time
+from array import array
+from collections import deque
+import argparse
+import numpy as np
+from maze import MazeGenerator
+
+PLACEMENT_STRATEGIES = ("farthest", "random", "corners")
+
+
+def bfs_distances(maze_gen, source_id, out=None, base=0):
+    """
+    BFS step counts from the flat cell id source_id to every cell, -1 where unreachable.
+    Writes into out[base:base + rows * cols] (an array('i') filled with -1) when given,
+    otherwise into a new array('i'), and returns it.
+    """
+    graph = maze_gen.neighbor_graph()
+    offsets = graph.offsets_list
+    neighbors = graph.neighbors_list
+    if out is None:
+        out = array('i', [-1]) * (maze_gen.rows * maze_gen.cols)
+    out[base + source_id] = 0
+    queue = deque([source_id])
+    while queue:
+        current = queue.popleft()
+        next_distance = out[base + current] + 1
+        for neighbor in neighbors[offsets[current]:offsets[current + 1]]:
+            if out[base + neighbor] < 0:
+                out[base + neighbor] = next_distance
+                queue.append(neighbor)
+    return out
+
+
+class Landmarks:
+    """
+    ALT (A*, landmarks, triangle inequality) preprocessing for repeated queries on one maze.
+    A BFS from each of count landmark cells fills one row of table, a count x (rows * cols)
+    int32 array of step counts (-1 where unreachable), so the tables take 4 * count bytes
+    per cell. For any landmark L, |d(L, goal) - d(L, cell)| never exceeds the true
+    distance from cell to goal, and the largest such bound over the landmarks is a
+    consistent A* heuristic (see heuristic()).
+    Landmarks are placed in the part of the maze reachable from maze_gen.start:
+      'farthest' -> the cell farthest from the start, then repeatedly the cell farthest
+                    from every landmark chosen so far (good bounds behind the goal).
+      'random'   -> uniformly random reachable cells (seed picks them).
+      'corners'  -> the reachable cells nearest to the grid corners, then to the edge
+                    midpoints, then 'farthest' for any landmarks left.
+    The tables describe the maze at construction time and must be rebuilt after it changes.
+    """
+    def __init__(self, maze_gen, count=8, strategy="farthest", seed=None):
+        if strategy not in PLACEMENT_STRATEGIES:
+            raise ValueError(f"Unknown landmark placement strategy: {strategy!r}")
+        start_time = time.perf_counter()
+        self.rows = maze_gen.rows
+        self.cols = maze_gen.cols
+        self.strategy = strategy
+        num_cells = self.rows * self.cols
+
+        start_id = maze_gen.start[0] * self.cols + maze_gen.start[1]
+        from_start = np.frombuffer(bfs_distances(maze_gen, start_id), dtype=np.int32)
+        reachable = np.flatnonzero(from_start >= 0)
+        count = max(0, min(count, reachable.size))
+
+        self._table = array('i', [-1]) * (count * num_cells)
+        self.table = np.frombuffer(self._table, dtype=np.int32).reshape(count, num_cells)
+        self.landmarks = []
+
+        if strategy == "random":
+            rng = np.random.default_rng(seed)
+            chosen = rng.choice(reachable, size=count, replace=False).tolist()
+        elif strategy == "corners":
+            rows, cols = divmod(reachable, self.cols)
+            targets = [(0, 0), (0, self.cols - 1), (self.rows - 1, 0), (self.rows - 1, self.cols - 1),
+                       (0, self.cols // 2), (self.rows - 1, self.cols // 2),
+                       (self.rows // 2, 0), (self.rows // 2, self.cols - 1)]
+            chosen = []
+            for r, c in targets:
+                if len(chosen) == count:
+                    break
+                cell = int(reachable[np.argmin(np.abs(rows - r) + np.abs(cols - c))])
+                if cell not in chosen:
+                    chosen.append(cell)
+        else:
+            chosen = []
+
+        for cell in chosen:
+            self._add(maze_gen, cell)
+        # 'farthest', or whatever 'corners' left over: maximize the distance to the chosen set
+        if len(self.landmarks) < count:
+            if self.landmarks:
+                nearest = self.table[:len(self.landmarks)][:, reachable].min(axis=0)
+            else:
+                nearest = from_start[reachable]
+            while len(self.landmarks) < count:
+                cell = int(reachable[np.argmax(nearest)])
+                row = self._add(maze_gen, cell)
+                np.minimum(nearest, row[reachable], out=nearest)
+
+        self.preprocessing_time = time.perf_counter() - start_time
+
+    def _add(self, maze_gen, cell):
+        index = len(self.landmarks)
+        bfs_distances(maze_gen, cell, out=self._table, base=index * self.rows * self.cols)
+        self.landmarks.append(cell)
+        return self.table[index]
+
+    @property
+    def count(self):
+        return len(self.landmarks)
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def heuristic(self, goal):
+        """
+        ALT heuristic toward goal, a (row, col) cell: a function of a flat cell id
+        returning max over landmarks L of |d(L, goal) - d(L, cell)|, skipping
+        landmarks that cannot reach both. Pass it to solve_maze_astar as heuristic.
+        """
+        num_cells = self.rows * self.cols
+        goal_id = goal[0] * self.cols + goal[1]
+        table = self._table
+        columns = [(index * num_cells, int(self.table[index, goal_id]))
+                   for index in range(self.count) if self.table[index, goal_id] >= 0]
+
+        def estimate(cell):
+            best = 0
+            for base, to_goal in columns:
+                from_cell = table[base + cell]
+                if from_cell >= 0:
+                    bound = from_cell - to_goal if from_cell > to_goal else to_goal - from_cell
+                    if bound > best:
+                        best = bound
+            return best
+        return estimate
+
+    def distance(self, source, target):
+        """
+        Lower and upper bounds on the step count between two (row, col) cells from the
+        tables alone: max |d(L, s) - d(L, t)| and min d(L, s) + d(L, t). Both are exact
+        when a landmark lies on a shortest path. Returns (lower, upper), upper being
+        None when no landmark reaches both cells.
+        """
+        source_id = source[0] * self.cols + source[1]
+        target_id = target[0] * self.cols + target[1]
+        a = self.table[:, source_id].astype(np.int64)
+        b = self.table[:, target_id].astype(np.int64)
+        both = (a >= 0) & (b >= 0)
+        if not both.any():
+            return 0, None
+        return int(np.abs(a - b)[both].max()), int((a + b)[both].min())
+
+
+if __name__ == "__main__":
+    from astar import solve_maze_astar
+
+    parser = argparse.ArgumentParser(
+        description="Compare A* with the Manhattan and the ALT landmark heuristic on random queries."
+    )
+    parser.add_argument("--rows", type=int, default=101, help="Number of rows (default: 101)")
+    parser.add_argument("--cols", type=int, default=101, help="Number of columns (default: 101)")
+    parser.add_argument("--landmarks", type=int, default=8, help="Number of landmarks (default: 8)")
+    parser.add_argument("--strategy", choices=PLACEMENT_STRATEGIES, default="farthest",
+                        help="Landmark placement (default: farthest)")
+    parser.add_argument("--queries", type=int, default=50, help="Random start/goal queries (default: 50)")
+    parser.add_argument("--seed", type=int, default=0, help="Maze and query seed (default: 0)")
+    args = parser.parse_args()
+
+    maze_gen = MazeGenerator(args.rows, args.cols, seed=args.seed)
+    maze_gen.generate_maze()
+    maze_gen.add_loops(probability=0.1)
+    landmarks = Landmarks(maze_gen, count=args.landmarks, strategy=args.strategy, seed=args.seed)
+    print(f"{landmarks.count} landmarks ({args.strategy}) in {landmarks.preprocessing_time:.3f}s, "
+          f"{landmarks.nbytes} bytes of tables")
+
+    rng = np.random.default_rng(args.seed)
+    open_cells = np.argwhere(maze_gen.maze == 0)
+    totals = {"manhattan": [0, 0.0], "alt": [0, 0.0]}
+    for _ in range(args.queries):
+        maze_gen.start, maze_gen.goal = (tuple(int(x) for x in open_cells[i])
+                                         for i in rng.integers(len(open_cells), size=2))
+        _, metrics = solve_maze_astar(maze_gen)
+        totals["manhattan"][0] += metrics["states_expanded_astar"]
+        totals["manhattan"][1] += metrics["runtime_astar"]
+        _, metrics = solve_maze_astar(maze_gen, heuristic=landmarks.heuristic(maze_gen.goal))
+        totals["alt"][0] += metrics["states_expanded_astar"]
+        totals["alt"][1] += metrics["runtime_astar"]
+    for name, (expanded, runtime) in totals.items():
+        print(f"{name:>10}: {expanded / args.queries:.1f} states expanded, {runtime / args.queries:.5f}s per query")
@@ -1,12 +1,116 @@
 import argparse
+import hashlib
+from array import array
 import numpy as np
 import random
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
-from collections import deque
+from collections.abc import Mapping
+
+class NeighborGraph:
+    """
+    Compressed sparse row (CSR) adjacency of a maze grid.
+    Cell (r, c) has the flat id r * cols + c, and its open neighbors, in
+    (up, down, left, right) order, are neighbors[offsets[id]:offsets[id + 1]].
+    offsets and neighbors are int32 NumPy arrays; offsets_list and neighbors_list
+    are array.array views of the same memory, for fast indexing from Python loops.
+    """
+    def __init__(self, offsets, neighbors):
+        self.offsets_list = array('i', offsets.astype(np.int32).tobytes())
+        self.neighbors_list = array('i', neighbors.astype(np.int32).tobytes())
+        self.offsets = np.frombuffer(self.offsets_list, dtype=np.int32)
+        self.neighbors = np.frombuffer(self.neighbors_list, dtype=np.int32)
+
+class OpenCellUnionFind:
+    """
+    Union-find (disjoint sets) over the cells of a rows x cols maze grid, on flat
+    ids r * cols + c: two open cells share a root exactly when they are connected,
+    and every wall is a set of its own until it is opened. The root of a set is
+    its smallest id. parent_list is an array.array for fast single finds from
+    Python loops, and parent a NumPy view of the same memory for whole-array work.
+    """
+    def __init__(self, grid):
+        self.rows, self.cols = grid.shape
+        self.parent_list = array('i', np.arange(grid.size, dtype=np.int32).tobytes())
+        self.parent = np.frombuffer(self.parent_list, dtype=np.int32)
+        open_cells = grid == 0
+        ids = np.arange(grid.size).reshape(grid.shape)
+        horizontal = open_cells[:, :-1] & open_cells[:, 1:]
+        vertical = open_cells[:-1, :] & open_cells[1:, :]
+        self.union_pairs(np.concatenate([ids[:, :-1][horizontal], ids[:-1, :][vertical]]),
+                         np.concatenate([ids[:, 1:][horizontal], ids[1:, :][vertical]]))
+
+    def _flatten(self):
+        """Point every cell straight at its root (pointer jumping)."""
+        parent = self.parent
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                return
+            parent[:] = jumped
+
+    def roots(self):
+        """Root of every cell, as a flat int32 array (a copy)."""
+        self._flatten()
+        return self.parent.copy()
+
+    def find(self, cell):
+        """Root of a flat id, halving the path on the way."""
+        parent = self.parent_list
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    def union(self, a, b):
+        """Join the sets of flat ids a and b; False if they were already joined."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        self.parent_list[max(root_a, root_b)] = min(root_a, root_b)
+        return True
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
+
+    def union_pairs(self, a, b):
+        """
+        Join the sets across many pairs of flat ids at once: every root hooks onto
+        the smallest root it shares a pair with, and the rounds repeat after pointer
+        jumping until no pair crosses two sets.
+        """
+        parent = self.parent
+        while True:
+            self._flatten()
+            root_a, root_b = parent[a], parent[b]
+            crossing = root_a != root_b
+            if not crossing.any():
+                return
+            a, b, root_a, root_b = a[crossing], b[crossing], root_a[crossing], root_b[crossing]
+            np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+
+    def open_cells(self, cells, grid):
+        """
+        Join the flat ids in cells, just opened in grid (rows x cols, 0 -> open),
+        to their open neighbors.
+        """
+        cells = np.asarray(cells, dtype=np.int64)
+        neighbors, sources = grid_neighbor_ids(cells, self.rows, self.cols)
+        is_open = grid.reshape(-1)[neighbors] == 0
+        self.union_pairs(sources[is_open], neighbors[is_open])
+
+def grid_neighbor_ids(cells, rows, cols):
+    """
+    In-grid (up, down, left, right) neighbors of an array of flat ids, walls
+    included, as (neighbors, cells) arrays of the same length.
+    """
+    r, c = np.divmod(cells, cols)
+    candidates = np.concatenate([cells - cols, cells + cols, cells - 1, cells + 1])
+    inside = np.concatenate([r > 0, r < rows - 1, c > 0, c < cols - 1])
+    return candidates[inside], np.tile(cells, 4)[inside]
 
 class MazeGenerator:
-    def __init__(self, rows, cols):
+    def __init__(self, rows, cols, seed=None, packed_grid=None, grid=None):
         """
         Single-array maze of size rows x cols:
           1 -> wall
@@ -14,10 +118,38 @@ class MazeGenerator:
         We'll cut out passages with a one-step DFS strategy.
         It holds for odd as well as even dimensions without asking them to be odd.
         Typical start/goal positions are set inside the grid.
+        seed makes generation reproducible; None draws fresh entropy.
+        The grid is stored as uint8 (1 byte per cell); pack() can shrink it
+        further to 1 bit per cell while the maze is not being used.
+        packed_grid adopts an existing np.packbits(grid, axis=1) array, such as a
+        memory-mapped corpus record, as the packed grid without copying it, and
+        grid adopts an existing rows x cols uint8 array (e.g. in shared memory).
         """
         self.rows = rows
         self.cols = cols
-        self.maze = np.ones((self.rows, self.cols), dtype=int)
+
+        # Adjacency caches derived from self.maze, rebuilt lazily after the grid changes
+        self._neighbor_masks = None
+        self._neighbor_graph = None
+        self._fingerprint = None
+        # (goal, distances) from the last goal_distances() call
+        self._goal_distances = None
+        # OpenCellUnionFind, kept up to date as open_walls and add_loops remove walls
+        self._connectivity = None
+        # Exactly one of these holds the grid: bytes per cell, or bits packed along rows
+        self._packed = None
+        if grid is not None:
+            self.maze = grid
+        elif packed_grid is None:
+            self.maze = np.ones((self.rows, self.cols), dtype=np.uint8)
+        else:
+            self._maze = None
+            self._packed = packed_grid
+
+        # Random sources: Python's for the original carve, NumPy's for the other engines
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.rng = np.random.default_rng(seed)
 
         # Typical start/goal inside the grid
         self.start = (1, 1)
@@ -26,19 +158,81 @@ class MazeGenerator:
         # Keep track of which cells have been visited during maze generation
         self.visited_maze_gen = np.zeros((self.rows, self.cols), dtype=bool)
 
+    @property
+    def maze(self):
+        """
+        The rows x cols uint8 grid (1 -> wall, 0 -> open).
+        A packed maze is unpacked on first access and stays unpacked.
+        """
+        if self._maze is None:
+            self._maze = np.unpackbits(self._packed, axis=1, count=self.cols)
+            self._packed = None
+        return self._maze
+
+    @maze.setter
+    def maze(self, grid):
+        self._maze = np.asarray(grid, dtype=np.uint8)
+        self._packed = None
+        self.invalidate_caches()
+
+    @property
+    def is_packed(self):
+        """True while the grid is held bit-packed."""
+        return self._maze is None
+
+    def pack(self):
+        """
+        Store the grid as bits packed along each row (np.packbits, 1 bit per cell)
+        and release the byte grid. Accessing self.maze unpacks it again.
+        """
+        if self._maze is not None:
+            self._packed = np.packbits(self._maze, axis=1)
+            self._maze = None
+
+    def packed_bits(self):
+        """Return the grid packed along rows without changing how it is stored."""
+        if self._maze is None:
+            return self._packed
+        return np.packbits(self._maze, axis=1)
+
+    def invalidate_caches(self):
+        """
+        Drop the cached adjacency structures, fingerprint and connectivity.
+        generate_maze, add_loops and add_outer_walls call this themselves; call it
+        after editing self.maze directly (open_walls keeps the connectivity).
+        """
+        self._neighbor_masks = None
+        self._neighbor_graph = None
+        self._fingerprint = None
+        self._goal_distances = None
+        self._connectivity = None
+
+    def fingerprint(self):
+        """
+        Content hash of the grid (shape and packed bits), cached until the grid changes.
+        Start and goal are not included.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(np.array([self.rows, self.cols], dtype="<u8").tobytes())
+            digest.update(np.ascontiguousarray(self.packed_bits()).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
     def count_open_neighbors(self, r, c):
         """
         Returns how many of the direct neighbors of (r, c) are open (0).
         """
+        maze = self.maze
         count = 0
         for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
             rr, cc = r + dr, c + dc
             if 0 <= rr < self.rows and 0 <= cc < self.cols:
-                if self.maze[rr, cc] == 0:
+                if maze[rr, cc] == 0:
                     count += 1
         return count
 
-    def generate_maze(self):
+    def generate_maze(self, algorithm="carve"):
         """
         Single-step DFS with '1 open neighbor' test for maze generation:
           - Start at self.start, mark it open (0).
@@ -47,9 +241,16 @@ class MazeGenerator:
             that have exactly 1 open neighbor.
           - Open one at random and push it onto the stack.
           - Backtrack if no valid neighbors are left.
+        algorithm='backtracker', 'kruskal' or 'wilson' switches to the much faster
+        lattice engines of generate_lattice_maze instead.
         """
+        if algorithm != "carve":
+            self.generate_lattice_maze(algorithm)
+            return
+
+        maze = self.maze
         sr, sc = self.start
-        self.maze[sr, sc] = 0
+        maze[sr, sc] = 0
         self.visited_maze_gen[sr, sc] = True
 
         stack_maze = [(sr, sc)]
@@ -60,12 +261,12 @@ class MazeGenerator:
             for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
                 nr, nc = r + dr, c + dc
                 if 1 <= nr < self.rows - 1 and 1 <= nc < self.cols - 1:
-                    if not self.visited_maze_gen[nr, nc] and self.maze[nr, nc] == 1:
+                    if not self.visited_maze_gen[nr, nc] and maze[nr, nc] == 1:
                         if self.count_open_neighbors(nr, nc) == 1:
                             neighbors.append((nr, nc))
             if neighbors:
-                nr, nc = random.choice(neighbors)
-                self.maze[nr, nc] = 0
+                nr, nc = self.random.choice(neighbors)
+                maze[nr, nc] = 0
                 self.visited_maze_gen[nr, nc] = True
                 stack_maze.append((nr, nc))
             else:
@@ -74,7 +275,199 @@ class MazeGenerator:
         # Ensure the goal cell is open if it's in range.
         gr, gc = self.goal
         if 0 <= gr < self.rows and 0 <= gc < self.cols:
-            self.maze[gr, gc] = 0
+            maze[gr, gc] = 0
+        self.invalidate_caches()
+
+    def generate_lattice_maze(self, algorithm="backtracker"):
+        """
+        Generate a perfect maze on the cell lattice: cells sit at odd (row, col)
+        positions and the wall between two lattice neighbors is opened to join them.
+        All state lives in flat byte buffers and random numbers are drawn from
+        self.rng in bulk, so this scales to mazes of several thousand cells a side.
+          - 'backtracker' -> iterative recursive backtracker (long winding corridors).
+          - 'kruskal'     -> randomized Kruskal with union-find, run as Boruvka rounds
+                             over randomly weighted walls (the same spanning tree).
+          - 'wilson'      -> Wilson's loop-erased random walks (uniform spanning tree,
+                             the slowest of the three on large grids).
+        The grid is rebuilt from scratch, and start and goal are opened and joined to
+        the nearest lattice cell, so the goal is always reachable.
+        """
+        engines = {
+            "backtracker": self._lattice_backtracker,
+            "kruskal": self._lattice_kruskal,
+            "wilson": self._lattice_wilson,
+        }
+        if algorithm not in engines:
+            raise ValueError(f"Unknown maze generation algorithm: {algorithm!r}")
+
+        lattice_rows = (self.rows - 1) // 2
+        lattice_cols = (self.cols - 1) // 2
+        if lattice_rows > 0 and lattice_cols > 0:
+            grid = engines[algorithm](lattice_rows, lattice_cols)
+        else:
+            grid = np.ones(self.rows * self.cols, dtype=np.uint8)
+        for cell in (self.start, self.goal):
+            self._join_lattice(grid, cell, lattice_rows, lattice_cols)
+
+        self.maze[:, :] = grid.reshape(self.rows, self.cols)
+        self.invalidate_caches()
+
+    def _padded_lattice(self, lattice_rows, lattice_cols):
+        """
+        Flat grid with two wall rows of padding above and below: 2 marks a lattice
+        cell not yet carved, 1 a wall. Lattice neighbors are 2 ids apart along a
+        row and 2 * cols apart down a column, and every step off the lattice lands
+        on a wall, so the carving loops need no bounds checks.
+        Returns (cells, offset), where offset is the padded id of grid cell (0, 0).
+        """
+        padded = np.ones((self.rows + 4, self.cols), dtype=np.uint8)
+        padded[3:2 * lattice_rows + 2:2, 1:2 * lattice_cols:2] = 2
+        return bytearray(padded.tobytes()), 2 * self.cols
+
+    def _unpad_lattice(self, cells, offset):
+        """Strip the padding from a _padded_lattice buffer and return the flat grid."""
+        return np.frombuffer(cells, dtype=np.uint8)[offset:offset + self.rows * self.cols].copy()
+
+    def _lattice_backtracker(self, lattice_rows, lattice_cols):
+        """Iterative backtracker; every cell tries its neighbors in a random order once."""
+        cells, offset = self._padded_lattice(lattice_rows, lattice_cols)
+        steps = (-2 * self.cols, 2 * self.cols, -2, 2)
+        orders = [tuple(steps[d] for d in order) for order in
+                  [(0, 1, 2, 3), (0, 1, 3, 2), (0, 2, 1, 3), (0, 2, 3, 1), (0, 3, 1, 2), (0, 3, 2, 1),
+                   (1, 0, 2, 3), (1, 0, 3, 2), (1, 2, 0, 3), (1, 2, 3, 0), (1, 3, 0, 2), (1, 3, 2, 0),
+                   (2, 0, 1, 3), (2, 0, 3, 1), (2, 1, 0, 3), (2, 1, 3, 0), (2, 3, 0, 1), (2, 3, 1, 0),
+                   (3, 0, 1, 2), (3, 0, 2, 1), (3, 1, 0, 2), (3, 1, 2, 0), (3, 2, 0, 1), (3, 2, 1, 0)]]
+        # One random neighbor order per padded cell, stored as bytes for cheap indexing
+        order_of = self.rng.integers(0, len(orders), size=len(cells), dtype=np.uint8).tobytes()
+
+        first = offset + self.cols + 1
+        cells[first] = 0
+        stack_cells = [first]
+        stack_next = [0]
+        while stack_cells:
+            cell = stack_cells[-1]
+            order = orders[order_of[cell]]
+            k = stack_next[-1]
+            while k < 4:
+                step = order[k]
+                k += 1
+                if cells[cell + step] == 2:
+                    break
+            else:
+                stack_cells.pop()
+                stack_next.pop()
+                continue
+            stack_next[-1] = k
+            nxt = cell + step
+            cells[nxt] = 0
+            cells[cell + step // 2] = 0
+            stack_cells.append(nxt)
+            stack_next.append(0)
+        return self._unpad_lattice(cells, offset)
+
+    def _lattice_kruskal(self, lattice_rows, lattice_cols):
+        """
+        Randomized Kruskal. With a random permutation as distinct wall weights, the
+        tree Kruskal builds is the unique minimum spanning tree, which Boruvka rounds
+        find with whole-array operations: every tree picks its lightest wall to
+        another tree, and the trees are merged by pointer jumping on the union-find
+        parent array.
+        """
+        num_cells = lattice_rows * lattice_cols
+        ids = np.arange(num_cells).reshape(lattice_rows, lattice_cols)
+        first = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+        second = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+        # Order walls by random weight so the wall index is its weight
+        order = self.rng.permutation(first.size)
+        first = first[order]
+        second = second[order]
+
+        parent = np.arange(num_cells)
+        accepted = np.zeros(first.size, dtype=bool)
+        walls = np.arange(first.size)
+        while walls.size:
+            root_a = parent[first[walls]]
+            root_b = parent[second[walls]]
+            crossing = root_a != root_b
+            walls, root_a, root_b = walls[crossing], root_a[crossing], root_b[crossing]
+            if not walls.size:
+                break
+            lightest = np.full(num_cells, first.size)
+            np.minimum.at(lightest, root_a, walls)
+            np.minimum.at(lightest, root_b, walls)
+            roots = np.flatnonzero(lightest < first.size)
+            wall = lightest[roots]
+            accepted[wall] = True
+
+            # Hook every tree onto the tree across its lightest wall; two trees that
+            # chose the same wall point at each other, and the smaller root stays
+            ends_a = parent[first[wall]]
+            ends_b = parent[second[wall]]
+            parent[roots] = np.where(ends_a == roots, ends_b, ends_a)
+            mutual = parent[parent[roots]] == roots
+            parent[roots[mutual & (roots < parent[roots])]] = roots[mutual & (roots < parent[roots])]
+            while True:
+                jumped = parent[parent]
+                if np.array_equal(jumped, parent):
+                    break
+                parent = jumped
+
+        grid = np.ones(self.rows * self.cols, dtype=np.uint8)
+        lattice_r, lattice_c = np.divmod(np.arange(num_cells), lattice_cols)
+        cell_ids = (2 * lattice_r + 1) * self.cols + 2 * lattice_c + 1
+        grid[cell_ids] = 0
+        grid[(cell_ids[first[accepted]] + cell_ids[second[accepted]]) // 2] = 0
+        return grid
+
+    def _lattice_wilson(self, lattice_rows, lattice_cols):
+        """Wilson's algorithm: loop-erased random walks that stop on the growing tree."""
+        cells, offset = self._padded_lattice(lattice_rows, lattice_cols)
+        steps = (-2 * self.cols, 2 * self.cols, -2, 2)
+        exit_dir = bytearray(len(cells))
+        lattice = np.flatnonzero(np.frombuffer(cells, dtype=np.uint8) == 2)
+        lattice = lattice[self.rng.permutation(lattice.size)].tolist()
+        cells[lattice[0]] = 0
+
+        chunk = max(1024, len(lattice))
+        draws = self.rng.integers(0, 4, size=chunk, dtype=np.uint8).tobytes()
+        pos = 0
+        for start in lattice[1:]:
+            # Random walk until the tree is hit; keeping only the last exit from
+            # each cell erases the loops
+            cell = start
+            while cells[cell] == 2:
+                if pos == chunk:
+                    draws = self.rng.integers(0, 4, size=chunk, dtype=np.uint8).tobytes()
+                    pos = 0
+                d = draws[pos]
+                pos += 1
+                if cells[cell + steps[d]] == 1:
+                    continue
+                exit_dir[cell] = d
+                cell += steps[d]
+            # Retrace the loop-erased walk and add it to the tree
+            cell = start
+            while cells[cell] == 2:
+                step = steps[exit_dir[cell]]
+                cells[cell] = 0
+                cells[cell + step // 2] = 0
+                cell += step
+        return self._unpad_lattice(cells, offset)
+
+    def _join_lattice(self, grid, cell, lattice_rows, lattice_cols):
+        """Open an in-range cell and an L-shaped link to the nearest lattice cell."""
+        r, c = cell
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            return
+        grid[r * self.cols + c] = 0
+        if lattice_rows == 0 or lattice_cols == 0:
+            return
+        lr = min(max(r if r % 2 else r - 1, 1), 2 * lattice_rows - 1)
+        lc = min(max(c if c % 2 else c - 1, 1), 2 * lattice_cols - 1)
+        for rr in range(min(r, lr), max(r, lr) + 1):
+            grid[rr * self.cols + c] = 0
+        for cc in range(min(c, lc), max(c, lc) + 1):
+            grid[lr * self.cols + cc] = 0
 
     def add_outer_walls(self):
         """
@@ -85,28 +478,157 @@ class MazeGenerator:
         self.maze[-1, :] = 1
         self.maze[:, 0] = 1
         self.maze[:, -1] = 1
+        self.invalidate_caches()
 
-    def add_loops(self, probability=0.1):
+    def add_loops(self, probability=0.1, connect=False):
         """
         Randomly remove some walls to create loops.
+        Each interior wall is opened independently with the given probability, using
+        one random mask from self.rng per block of rows to bound temporary memory.
+        connect=True then opens the fewest extra walls that join start and goal
+        (connect_start_goal), so one pass leaves the maze solvable at the requested
+        density, with no retries and no reachability check.
+        """
+        connectivity = self._connectivity
+        interior = self.maze[1:-1, 1:-1]
+        block_rows = max(1, (1 << 22) // max(1, interior.shape[1]))
+        opened = []
+        for r in range(0, interior.shape[0], block_rows):
+            block = interior[r:r + block_rows]
+            mask = self.rng.random(block.shape, dtype=np.float32) < probability
+            if connectivity is not None:
+                block_r, block_c = np.nonzero(mask & (block == 1))
+                opened.append((block_r + r + 1) * self.cols + block_c + 1)
+            block[mask] = 0
+        self.invalidate_caches()
+        if connectivity is not None and opened:
+            connectivity.open_cells(np.concatenate(opened), self.maze)
+            self._connectivity = connectivity
+        if connect:
+            self.connect_start_goal()
+
+    def connectivity(self):
         """
-        for r in range(1, self.rows - 1):
-            for c in range(1, self.cols - 1):
-                if self.maze[r, c] == 1 and random.random() < probability:
-                    self.maze[r, c] = 0
+        The cached OpenCellUnionFind of the grid, built on first use. open_walls and
+        add_loops update it incrementally instead of dropping it.
+        """
+        if self._connectivity is None:
+            self._connectivity = OpenCellUnionFind(self.maze)
+        return self._connectivity
+
+    def open_walls(self, cells):
+        """
+        Open the given (row, col) cells. The connectivity union-find, if built, is
+        updated by joining them to their open neighbors; the other caches are dropped.
+        Returns the number of cells that were walls.
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        flat = self.maze.reshape(-1)
+        ids = np.unique(cells[:, 0] * self.cols + cells[:, 1])
+        ids = ids[flat[ids] == 1]
+        flat[ids] = 0
+        connectivity = self._connectivity
+        self.invalidate_caches()
+        if connectivity is not None and ids.size:
+            connectivity.open_cells(ids, self.maze)
+            self._connectivity = connectivity
+        return int(ids.size)
+
+    def connect_start_goal(self):
+        """
+        Open the fewest walls that join self.start to self.goal, and return them as
+        a list of (row, col) cells (empty when already connected).
+        This is a 0-1 BFS in which stepping onto an open cell is free: each layer
+        steps from the cells reached so far onto the walls next to them (one more
+        wall opened), then takes in the whole union-find component of every open
+        cell beside those walls at once.
+        """
+        num_cells = self.rows * self.cols
+        start_id = self.start[0] * self.cols + self.start[1]
+        goal_id = self.goal[0] * self.cols + self.goal[1]
+        opened = [cell for cell in dict.fromkeys([tuple(self.start), tuple(self.goal)]) if self.maze[cell] == 1]
+        self.open_walls(opened)
+        connectivity = self.connectivity()
+        if connectivity.connected(start_id, goal_id):
+            return opened
+
+        flat = self.maze.reshape(-1)
+        roots = connectivity.roots()
+        # Members of every component, grouped by root
+        members = np.argsort(roots, kind="stable")
+        sizes = np.bincount(roots, minlength=num_cells)
+        first_member = np.cumsum(sizes) - sizes
+
+        # via[cell]: the cell it was reached from (a wall, for the members of a
+        # component); -1 in the start component, -2 not reached yet
+        via = np.full(num_cells, -2, dtype=np.int64)
+        frontier = members[first_member[roots[start_id]]:][:sizes[roots[start_id]]]
+        via[frontier] = -1
+        while via[goal_id] == -2:
+            neighbors, sources = grid_neighbor_ids(frontier, self.rows, self.cols)
+            new = via[neighbors] == -2
+            walls, index = np.unique(neighbors[new], return_index=True)
+            via[walls] = sources[new][index]
+
+            neighbors, sources = grid_neighbor_ids(walls, self.rows, self.cols)
+            new = (via[neighbors] == -2) & (flat[neighbors] == 0)
+            component_roots, index = np.unique(roots[neighbors[new]], return_index=True)
+            counts = sizes[component_roots]
+            offsets = np.repeat(first_member[component_roots] - np.cumsum(counts) + counts, counts)
+            cells = members[offsets + np.arange(offsets.size)]
+            via[cells] = np.repeat(sources[new][index], counts)
+            frontier = np.concatenate([walls, cells])
+
+        path = []
+        cell = goal_id
+        while via[cell] != -1:
+            if flat[cell] == 1:
+                path.append(divmod(int(cell), self.cols))
+            cell = via[cell]
+        self.open_walls(path)
+        return opened + path[::-1]
 
     def get_neighbors(self, r, c):
         """
         Return valid open neighbors in directions (up, down, left, right) of cell (r, c).
         """
-        neighbors = []
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                # Check for open cell.
-                if self.maze[nr, nc] == 0:
-                    neighbors.append((nr, nc))
-        return neighbors
+        graph = self.neighbor_graph()
+        cell = r * self.cols + c
+        cells = graph.neighbors_list[graph.offsets_list[cell]:graph.offsets_list[cell + 1]]
+        return [divmod(v, self.cols) for v in cells]
+
+    def open_neighbor_masks(self):
+        """
+        Boolean masks of shape (4, rows, cols) in (up, down, left, right) order.
+        masks[k, r, c] is True when the k-th neighbor of (r, c) is inside the grid and open.
+        The result is cached until the grid changes and must not be modified.
+        """
+        if self._neighbor_masks is None:
+            open_cells = self.maze == 0
+            masks = np.zeros((4, self.rows, self.cols), dtype=bool)
+            masks[0, 1:, :] = open_cells[:-1, :]
+            masks[1, :-1, :] = open_cells[1:, :]
+            masks[2, :, 1:] = open_cells[:, :-1]
+            masks[3, :, :-1] = open_cells[:, 1:]
+            self._neighbor_masks = masks
+        return self._neighbor_masks
+
+    def neighbor_graph(self):
+        """
+        Return the cached NeighborGraph of the grid, building it on first use.
+        Every cell, wall or open, lists its open neighbors, so the graph answers
+        the same queries as get_neighbors.
+        """
+        if self._neighbor_graph is None:
+            masks = self.open_neighbor_masks().reshape(4, -1)
+            ids = np.arange(self.rows * self.cols, dtype=np.int32)
+            candidates = np.stack([ids - self.cols, ids + self.cols, ids - 1, ids + 1], axis=1)
+            # Row-major selection keeps each cell's neighbors in U, D, L, R order
+            neighbors = candidates[masks.T]
+            offsets = np.zeros(ids.size + 1, dtype=np.int32)
+            np.cumsum(masks.sum(axis=0), out=offsets[1:])
+            self._neighbor_graph = NeighborGraph(offsets, neighbors)
+        return self._neighbor_graph
 
     def reconstruct_solution_path(self, came_from, start, goal):
         """
@@ -121,47 +643,93 @@ class MazeGenerator:
         if path and path[0] == start:
             return path
         return []
-    
+
+    def reconstruct_path_from_parents(self, parents, start_id, goal_id):
+        """
+        Reconstruct the path from 'start_id' to 'goal_id' using a flat parent array,
+        where parents[id] is the flat id of the cell that reached id, or -1 if none.
+        Returns the path as (row, col) tuples, or [] if the goal was not reached.
+        """
+        path = []
+        current = goal_id
+        while current != -1:
+            path.append(current)
+            current = parents[current]
+        path.reverse()
+        if path and path[0] == start_id:
+            return [divmod(cell, self.cols) for cell in path]
+        return []
+
     def is_path_to_goal(self):
         """
-        Verify through BFS if there is any path between self.start and self.goal.
+        Check whether self.start can reach self.goal, from the cached goal_distances().
         Returns True if within reach, False otherwise.
         """
-        queue = deque([self.start])
-        visited_maze_gen = set([self.start])
-        while queue:
-            r, c = queue.popleft()
-            if (r, c) == self.goal:
-                return True
-            for nr, nc in [(r-1, c), (r+1, c), (r, c-1), (r, c+1)]:
-                if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                    if self.maze[nr, nc] == 0 and (nr, nc) not in visited_maze_gen:
-                        visited_maze_gen.add((nr, nc))
-                        queue.append((nr, nc))
-        return False
-    
-    def initialize_values_bfs(self):
+        r, c = self.start
+        if (r, c) == tuple(self.goal):
+            return True
+        if self.maze[self.goal[0], self.goal[1]] == 1:
+            return False
+        dist = self.goal_distances()
+        if dist[r, c] >= 0:
+            return True
+        # A start on a wall still steps off it into an open neighbor
+        masks = self.open_neighbor_masks()
+        neighbors = [(r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)]
+        return any(masks[k, r, c] and dist[neighbors[k]] >= 0 for k in range(4))
+
+    def goal_distances(self):
         """
-        Perform a BFS from the goal and mark all the cells with the value -distance.
-        Cells out of reach of the target are -9999.
+        BFS moves from every cell to the goal as a read-only rows x cols int32 array,
+        -1 where the goal is out of reach.
+        The search is a wavefront: each step gathers the open neighbors of the whole
+        frontier at once from a (4, cells) table of neighbor ids, so the work is
+        O(cells) with a few array operations per BFS layer.
+        The result is cached until the grid or the goal changes.
         """
-        dist = np.full((self.rows, self.cols), np.inf)
-        queue = deque([self.goal])
-        dist[self.goal] = 0
-        while queue:
-            r, c = queue.popleft()
-            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                    if self.maze[nr, nc] == 0 and dist[nr, nc] > dist[r, c] + 1:
-                        dist[nr, nc] = dist[r, c] + 1
-                        queue.append((nr, nc))
-        V_init = np.full((self.rows, self.cols), -9999.0)
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if dist[i, j] < np.inf:
-                    V_init[i, j] = -dist[i, j]
-        return V_init
+        goal = tuple(self.goal)
+        if self._goal_distances is None or self._goal_distances[0] != goal:
+            num_cells = self.rows * self.cols
+            masks = self.open_neighbor_masks().reshape(4, -1)
+            ids = np.arange(num_cells)
+            # Blocked moves point at the sentinel id num_cells, which counts as visited
+            table = np.stack([ids - self.cols, ids + self.cols, ids - 1, ids + 1])
+            table[~masks] = num_cells
+            dist = np.full(num_cells + 1, -1, dtype=np.int32)
+            dist[num_cells] = 0
+            frontier = np.array([goal[0] * self.cols + goal[1]])
+            dist[frontier] = 0
+            layer = 0
+            while frontier.size:
+                layer += 1
+                candidates = table[:, frontier].ravel()
+                frontier = np.unique(candidates[dist[candidates] < 0])
+                dist[frontier] = layer
+            dist = dist[:num_cells].reshape(self.rows, self.cols)
+            dist.flags.writeable = False
+            self._goal_distances = (goal, dist)
+        return self._goal_distances[1]
+
+    def initialize_values_bfs(self, dist=None):
+        """
+        Mark all the cells with the value -distance to the goal (goal_distances()).
+        Cells out of reach of the target are -9999. dist reuses goal_distances().
+        """
+        if dist is None:
+            dist = self.goal_distances()
+        return np.where(dist >= 0, -dist.astype(np.float64), -9999.0)
+
+    def goal_component(self, dist=None):
+        """
+        Sorted flat ids (row * cols + col) of the open cells other than the goal that
+        can reach the goal, i.e. the cells initialize_values_bfs does not mark -9999.
+        dist reuses goal_distances().
+        """
+        if dist is None:
+            dist = self.goal_distances()
+        reachable = (dist >= 0).ravel()
+        reachable[self.goal[0] * self.cols + self.goal[1]] = False
+        return np.flatnonzero(reachable)
 
     def visualize_maze(self, solution=None, title="Generated Maze"):
         """
@@ -206,31 +774,194 @@ class MazeGenerator:
         plt.show()
 
 
-def extract_path(policy, start, goal, max_steps=1000):
-    """Extract a path for MDP algorithms by following the policy from start to goal."""
-    path_mdp = [start]
-    current = start
-    for _ in range(max_steps):
-        if current == goal:
+ACTION_NAMES = ('U', 'D', 'L', 'R', '')
+# Action code of cells without an action
+NO_ACTION = 4
+
+class PolicyGrid(Mapping):
+    """
+    Deterministic MDP policy as a (rows, cols) int8 grid of action codes:
+    0..3 for U, D, L, R (the order of ACTION_NAMES) and NO_ACTION elsewhere.
+    It also reads as the (row, col) -> action string mapping over every cell that
+    the solvers used to return as a dict; entries are only built on lookup.
+    """
+    __slots__ = ('actions',)
+
+    def __init__(self, actions):
+        self.actions = np.ascontiguousarray(actions, dtype=np.int8)
+
+    @classmethod
+    def from_dict(cls, policy, rows=None, cols=None):
+        """Encode a (row, col) -> action dict; the shape defaults to the largest key."""
+        if rows is None:
+            rows = max((i for i, _ in policy), default=-1) + 1
+        if cols is None:
+            cols = max((j for _, j in policy), default=-1) + 1
+        codes = {name: code for code, name in enumerate(ACTION_NAMES)}
+        actions = np.full((rows, cols), NO_ACTION, dtype=np.int8)
+        for (i, j), action in policy.items():
+            actions[i, j] = codes[action]
+        return cls(actions)
+
+    @property
+    def shape(self):
+        return self.actions.shape
+
+    @property
+    def nbytes(self):
+        return self.actions.nbytes
+
+    def _code(self, cell):
+        try:
+            i, j = cell
+        except (TypeError, ValueError):
+            raise KeyError(cell) from None
+        rows, cols = self.actions.shape
+        if not (0 <= i < rows and 0 <= j < cols):
+            raise KeyError(cell)
+        return self.actions[i, j]
+
+    def __getitem__(self, cell):
+        return ACTION_NAMES[self._code(cell)]
+
+    def __contains__(self, cell):
+        try:
+            self._code(cell)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        rows, cols = self.actions.shape
+        return ((i, j) for i in range(rows) for j in range(cols))
+
+    def __len__(self):
+        return self.actions.size
+
+    def to_dict(self):
+        """The full (row, col) -> action dict."""
+        labels = np.array(ACTION_NAMES)[self.actions].ravel().tolist()
+        return dict(zip(self, labels))
+
+def follow_policy(policy, start, goal, max_steps=None, maze=None):
+    """
+    Follow a policy from start toward goal on flat cell ids.
+    policy is a PolicyGrid or a (rows, cols) array of action codes; maze, when given,
+    is the grid it was solved on (MazeGenerator.maze, walls non-zero).
+    Returns (path of (row, col) cells, reason), where reason says why the walk ended:
+      'goal'      -> the goal was reached.
+      'no_action' -> the current cell has no action.
+      'blocked'   -> the action leads off the grid, or into a wall of maze.
+      'cycle'     -> the next cell is already on the path (found with a visited bitmap).
+      'max_steps' -> max_steps moves were taken without reaching the goal.
+    """
+    actions = policy.actions if isinstance(policy, PolicyGrid) else np.asarray(policy, dtype=np.int8)
+    rows, cols = actions.shape
+    num_cells = rows * cols
+    codes = memoryview(np.ascontiguousarray(actions).reshape(-1))
+    walls = None if maze is None else memoryview((np.asarray(maze) != 0).view(np.uint8).reshape(-1))
+    steps = (-cols, cols, -1, 1)
+    visited = bytearray(num_cells)
+    current = start[0] * cols + start[1]
+    goal_id = goal[0] * cols + goal[1]
+    path = [current]
+    reason = 'goal'
+    while current != goal_id:
+        if max_steps is not None and len(path) > max_steps:
+            reason = 'max_steps'
+            break
+        visited[current] = 1
+        code = codes[current]
+        if not 0 <= code < NO_ACTION:
+            reason = 'no_action'
             break
-        a = policy.get(current, '')
-        if not a:
+        following = current + steps[code]
+        if (not 0 <= following < num_cells or (code >= 2 and following // cols != current // cols)
+                or (walls is not None and walls[following])):
+            reason = 'blocked'
             break
-        di, dj = {'U': (-1, 0), 'D': (1, 0), 'L': (0, -1), 'R': (0, 1)}[a]
-        next_state = (current[0] + di, current[1] + dj)
-        if next_state == current:
+        if visited[following]:
+            reason = 'cycle'
             break
-        path_mdp.append(next_state)
-        current = next_state
-    return path_mdp
+        current = following
+        path.append(current)
+    return [divmod(cell, cols) for cell in path], reason
+
+def extract_path(policy, start, goal, max_steps=None, maze=None):
+    """
+    Extract a path for MDP algorithms by following the policy from start to goal.
+    policy is a PolicyGrid, an action-code grid or a (row, col) -> action dict;
+    see follow_policy, which also reports why the path ended.
+    """
+    if isinstance(policy, dict):
+        policy = PolicyGrid.from_dict(policy)
+    return follow_policy(policy, start, goal, max_steps, maze)[0]
+
+def greedy_path_gap(successors, start_id, goal_id, start_value, error_bound, gamma):
+    """
+    Follow successors (next flat id of every cell) from start_id toward goal_id.
+    If the goal is reached in L moves, the path's return is -(1 - gamma^L) / (1 - gamma),
+    and with V*(start) <= start_value + error_bound the path is at most
+    gap = start_value + error_bound - return worse than optimal.
+    Returns (path as a list of flat ids, gap), or (None, inf) when the walk stops
+    short of the goal or runs into a cycle.
+    """
+    path = [start_id]
+    seen = {start_id}
+    current = start_id
+    while current != goal_id:
+        current = int(successors[current])
+        if current < 0 or current in seen:
+            return None, float("inf")
+        seen.add(current)
+        path.append(current)
+    moves = len(path) - 1
+    path_return = -(1 - gamma ** moves) / (1 - gamma) if gamma < 1 else -float(moves)
+    return path, start_value + error_bound - path_return
+
+def value_tie_tolerance(gamma):
+    """
+    Largest gap between two Q-values that still counts as a tie. Every step costs
+    -1, so values lie in [-1 / (1 - gamma), 0]; cells a few hundred moves from the
+    goal all round to the bottom of that range, where the true differences fall
+    below float precision.
+    """
+    return 16 * np.finfo(float).eps / (1 - gamma) if gamma < 1 else 0.0
+
+def greedy_actions(q_values, successor_distances, tolerance, current=None):
+    """
+    Greedy action index per column of q_values (actions along axis 0).
+    Actions within tolerance of the best Q-value are ties, broken toward the
+    successor with the fewest BFS moves to the goal (successor_distances, same
+    shape, negative when out of reach) and then toward the first action, so a
+    policy read off saturated values still heads for the goal.
+    With current (the policy's action indices), a cell keeps its action unless
+    another one is better by more than tolerance, or ties it closer to the goal.
+    """
+    best = q_values.max(axis=0)
+    distance = np.asarray(successor_distances, dtype=np.int64)
+    unranked = np.iinfo(np.int64).max
+    distance = np.where(distance >= 0, distance, np.int64(unranked - 1))
+    distance = np.where(q_values >= best - tolerance, distance, np.int64(unranked))
+    action = np.argmin(distance, axis=0)
+    if current is not None:
+        current = np.asarray(current, dtype=np.int64)
+        keep = (np.take_along_axis(distance, current[np.newaxis], axis=0)[0]
+                <= np.take_along_axis(distance, action[np.newaxis], axis=0)[0])
+        action = np.where(keep, current, action)
+    return action
 
 if __name__ == '__main__':
     parser_maze_gen = argparse.ArgumentParser(description='Create a maze with rows x cols dimensions.')
     parser_maze_gen.add_argument('rows', type=int, help='Number of rows to be generated')
     parser_maze_gen.add_argument('cols', type=int, help='Number of columns to be generated.')
+    parser_maze_gen.add_argument('--algorithm', default='carve',
+                                 choices=['carve', 'backtracker', 'kruskal', 'wilson'],
+                                 help='Maze generation algorithm (default: carve)')
+    parser_maze_gen.add_argument('--seed', type=int, default=None, help='Random seed for generation.')
     args = parser_maze_gen.parse_args()
     
-    maze_gen = MazeGenerator(args.rows, args.cols)
-    maze_gen.generate_maze()
+    maze_gen = MazeGenerator(args.rows, args.cols, seed=args.seed)
+    maze_gen.generate_maze(algorithm=args.algorithm)
     maze_gen.add_loops(probability=0.1)
     maze_gen.visualize_maze()
\ No newline at end of file
@@ -0,0 +1,189 @@
+import os
+import argparse
+import numpy as np
+from maze import MazeGenerator
+
+# File layout (all little-endian):
+#   file header   -> magic, version, maze count, byte offset of the index
+#   records       -> record header followed by the maze packed along rows (np.packbits)
+#   index         -> one uint64 byte offset per record
+# Records start on 8-byte boundaries so their headers can be viewed in place.
+CORPUS_MAGIC = b"MAZECORP"
+CORPUS_VERSION = 1
+FILE_HEADER = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("count", "<u4"),
+    ("index_offset", "<u8"),
+    ("reserved", "<u8"),
+])
+RECORD_HEADER = np.dtype([
+    ("rows", "<u4"),
+    ("cols", "<u4"),
+    ("start_row", "<u4"),
+    ("start_col", "<u4"),
+    ("goal_row", "<u4"),
+    ("goal_col", "<u4"),
+    ("seed", "<i8"),
+    ("data_bytes", "<u8"),
+])
+
+
+class CorpusWriter:
+    """
+    Write mazes one at a time to a binary corpus file.
+    Use as a context manager; the index and file header are written on close.
+    A maze without a seed is stored with seed -1.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.offsets = []
+        self.file = open(path, "wb")
+        self.file.write(bytes(FILE_HEADER.itemsize))
+
+    def add(self, maze_gen):
+        """Append one MazeGenerator, including its start, goal and seed."""
+        bits = np.ascontiguousarray(maze_gen.packed_bits(), dtype=np.uint8)
+        header = np.zeros(1, dtype=RECORD_HEADER)
+        header["rows"], header["cols"] = maze_gen.rows, maze_gen.cols
+        header["start_row"], header["start_col"] = maze_gen.start
+        header["goal_row"], header["goal_col"] = maze_gen.goal
+        header["seed"] = -1 if maze_gen.seed is None else maze_gen.seed
+        header["data_bytes"] = bits.nbytes
+
+        self.offsets.append(self.file.tell())
+        self.file.write(header.tobytes())
+        self.file.write(bits.tobytes())
+        self.file.write(bytes(-self.file.tell() % 8))
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.offsets, dtype="<u8").tobytes())
+        header = np.zeros(1, dtype=FILE_HEADER)
+        header["magic"] = CORPUS_MAGIC
+        header["version"] = CORPUS_VERSION
+        header["count"] = len(self.offsets)
+        header["index_offset"] = index_offset
+        self.file.seek(0)
+        self.file.write(header.tobytes())
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_corpus(path, mazes):
+    """Write an iterable of MazeGenerator objects to a corpus file."""
+    with CorpusWriter(path) as writer:
+        for maze_gen in mazes:
+            writer.add(maze_gen)
+
+
+class MazeCorpus:
+    """
+    Read-only view of a corpus file through np.memmap.
+    Nothing is parsed or copied up front: corpus[i] returns a packed MazeGenerator
+    whose grid is a view into the mapped file, and the grid is only unpacked when
+    a solver first touches maze_gen.maze.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        header = self.data[:FILE_HEADER.itemsize].view(FILE_HEADER)[0]
+        if header["magic"] != CORPUS_MAGIC or header["version"] != CORPUS_VERSION:
+            raise ValueError(f"{path} is not a version {CORPUS_VERSION} maze corpus")
+        count = int(header["count"])
+        index_offset = int(header["index_offset"])
+        self.offsets = self.data[index_offset:index_offset + 8 * count].view("<u8")
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def header(self, i):
+        """Record header of maze i as a NumPy structured scalar."""
+        offset = int(self.offsets[i])
+        return self.data[offset:offset + RECORD_HEADER.itemsize].view(RECORD_HEADER)[0]
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError("maze corpus index out of range")
+        header = self.header(i)
+        rows, cols = int(header["rows"]), int(header["cols"])
+        data_start = int(self.offsets[i]) + RECORD_HEADER.itemsize
+        bits = self.data[data_start:data_start + int(header["data_bytes"])].reshape(rows, -1)
+        seed = int(header["seed"])
+        maze_gen = MazeGenerator(rows, cols, seed=None if seed < 0 else seed, packed_grid=bits)
+        maze_gen.start = (int(header["start_row"]), int(header["start_col"]))
+        maze_gen.goal = (int(header["goal_row"]), int(header["goal_col"]))
+        return maze_gen
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def experiment_mazes(maze_sizes, num_runs, build, corpus_path=None):
+    """
+    Yield (rows, cols, run, maze_gen) for every maze size and run.
+    build(rows, cols, seed) creates a maze. With corpus_path, an existing corpus is
+    replayed instead of generating (it must hold the same sizes and runs), and a
+    missing one is written while the mazes are generated, so later runs reuse them.
+    """
+    plan = [(rows, cols, run) for rows, cols in maze_sizes for run in range(1, num_runs + 1)]
+    if corpus_path is not None and os.path.exists(corpus_path):
+        corpus = MazeCorpus(corpus_path)
+        if len(corpus) != len(plan):
+            raise ValueError(f"{corpus_path} holds {len(corpus)} mazes, expected {len(plan)}")
+        for (rows, cols, run), maze_gen in zip(plan, corpus):
+            if (maze_gen.rows, maze_gen.cols) != (rows, cols):
+                raise ValueError(f"{corpus_path} does not match the requested maze sizes")
+            yield rows, cols, run, maze_gen
+        return
+
+    seeds = np.random.SeedSequence().generate_state(len(plan), dtype=np.uint64) >> np.uint64(1)
+    writer = CorpusWriter(corpus_path) if corpus_path is not None else None
+    try:
+        for (rows, cols, run), seed in zip(plan, seeds.tolist()):
+            maze_gen = build(rows, cols, seed)
+            if writer is not None:
+                writer.add(maze_gen)
+            yield rows, cols, run, maze_gen
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a corpus of mazes, or list the mazes in an existing one."
+    )
+    parser.add_argument("path", help="Corpus file")
+    parser.add_argument("--rows", type=int, default=50, help="Number of rows (default: 50)")
+    parser.add_argument("--cols", type=int, default=50, help="Number of columns (default: 50)")
+    parser.add_argument("--count", type=int, default=0,
+                        help="Number of mazes to generate; 0 lists the existing corpus (default: 0)")
+    parser.add_argument("--algorithm", default="backtracker",
+                        choices=["carve", "backtracker", "kruskal", "wilson"],
+                        help="Maze generation algorithm (default: backtracker)")
+    parser.add_argument("--loops", type=float, default=0.1, help="add_loops probability (default: 0.1)")
+    args = parser.parse_args()
+
+    if args.count > 0:
+        def generate(seed):
+            maze_gen = MazeGenerator(args.rows, args.cols, seed=seed)
+            maze_gen.generate_maze(algorithm=args.algorithm)
+            maze_gen.add_loops(probability=args.loops)
+            return maze_gen
+        write_corpus(args.path, (generate(seed) for seed in range(args.count)))
+
+    corpus = MazeCorpus(args.path)
+    print(f"{args.path}: {len(corpus)} mazes")
+    for i in range(len(corpus)):
+        header = corpus.header(i)
+        print(f"  {i}: {header['rows']}x{header['cols']} start=({header['start_row']}, {header['start_col']}) "
+              f"goal=({header['goal_row']}, {header['goal_col']}) seed={header['seed']}")
@@ -1,105 +1,133 @@
 import time
 import csv
+import argparse
 import matplotlib.pyplot as plt
 
 # Import from our separate modules
-from maze import MazeGenerator, extract_path
+from maze import MazeGenerator, follow_policy
+from maze_corpus import experiment_mazes
+from memory_probe import probe_call
+from parallel_runner import run_parallel
 from value_iteration import solve_maze_value_iteration
 from policy_iteration import solve_maze_policy_iteration
+from multigrid import solve_maze_multigrid_value_iteration
+from junction_graph import solve_maze_junction_value_iteration, solve_maze_junction_policy_iteration
+
+def build_mdp_maze(rows, cols, seed=None):
+    """
+    Generate one experiment maze: the DFS carve plus 10% extra loops, and the
+    fewest further walls opened that join start and goal (always solvable).
+    """
+    generator = MazeGenerator(rows, cols, seed=seed)
+    generator.generate_maze()
+    generator.add_loops(probability=0.1, connect=True)
+    return generator
+
+# Algorithm name -> (solver, solver parameters)
+MDP_ALGORITHMS = {
+    "Value Iteration": (solve_maze_value_iteration, {"gamma": 0.9, "theta": 1e-4, "max_iter": 5000}),
+    "Value Iteration (Gauss-Seidel)": (solve_maze_value_iteration,
+                                       {"gamma": 0.9, "theta": 1e-4, "max_iter": 5000, "mode": "gauss-seidel"}),
+    "Value Iteration (Prioritized)": (solve_maze_value_iteration,
+                                      {"gamma": 0.9, "theta": 1e-4, "max_iter": 5000, "mode": "prioritized"}),
+    "Multigrid Value Iteration": (solve_maze_multigrid_value_iteration, {"gamma": 0.9, "theta": 1e-4, "max_iter": 5000}),
+    "Policy Iteration": (solve_maze_policy_iteration, {"gamma": 0.9, "theta": 1e-4}),
+    "Modified Policy Iteration": (solve_maze_policy_iteration,
+                                  {"gamma": 0.9, "theta": 1e-4, "evaluation": "modified", "evaluation_sweeps": 64}),
+    "Junction Value Iteration": (solve_maze_junction_value_iteration, {"gamma": 0.9, "theta": 1e-4, "max_iter": 5000}),
+    "Junction Policy Iteration": (solve_maze_junction_policy_iteration, {"gamma": 0.9}),
+}
+
+def mdp_row(algorithm, rows, cols, run, generator):
+    """Solve one maze with one MDP algorithm and return its CSV row."""
+    solver, params = MDP_ALGORITHMS[algorithm]
+    start_time = time.perf_counter()
+    V, policy, states_expanded = solver(generator, **params)
+    runtime = time.perf_counter() - start_time
+
+    # Extract solution path and measure length; a policy that never reaches the goal has none
+    solution, termination = follow_policy(policy, generator.start, generator.goal, maze=generator.maze)
+    if termination != "goal":
+        print(f"Warning: {algorithm} policy on {rows}x{cols} run {run} stopped before the goal ({termination}).")
+
+    # Memory comes from a second, probed solve so tracemalloc does not skew the runtime
+    _, probe = probe_call(solver, generator, **params)
+
+    row = {
+        "algorithm": algorithm,
+        "maze_size": f"{rows}x{cols}",
+        "run": run,
+        "runtime": runtime,
+        "states_expanded": states_expanded,
+        "peak_memory": probe.peak_bytes,
+        "solution_length": len(solution) if termination == "goal" else ""
+    }
+    row.update(probe.metrics())
+    return row
+
+def solvable_mazes(mazes):
+    """Pass through (rows, cols, run, generator) items whose goal is reachable, warning about the rest."""
+    for rows, cols, run, generator in mazes:
+        print(f"\n--- Maze Size {rows}x{cols}, Run {run} ---")
+        if not generator.is_path_to_goal():
+            print(f"Warning: Maze {rows}x{cols} run {run} is not solvable. Skipping.")
+            continue
+        yield rows, cols, run, generator
 
 def main():
     """
-    Compare MDP Value Iteration and Policy Iteration for various sizes of mazes.
+    Compare MDP Value Iteration and Policy Iteration for various sizes of mazes,
+    on the full grid and on the contracted junction graph.
     Saves results to 'mdp_comparison_results.csv' and prints an example maze run.
+    Rows are written as soon as each solve finishes; with --workers the
+    (size, run, algorithm) matrix runs on a process pool.
     """
+    parser = argparse.ArgumentParser(
+        description="Compare MDP Value Iteration and Policy Iteration (grid and junction graph) across maze sizes."
+    )
+    parser.add_argument(
+        "--corpus",
+        default=None,
+        help="Maze corpus file to replay, or to create if it does not exist"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes; 0 uses one per spare CPU (default: 1, serial)"
+    )
+    args = parser.parse_args()
+
     # 1. Maze sizes and runs
     maze_sizes = [(10, 10), (30, 30), (50, 50),(150, 150),(200, 200)]
     # Number of runs per maze size
     num_runs = 3  
-    
-    results = []  
-
-    for rows, cols in maze_sizes:
-        for run in range(1, num_runs + 1):
-            print(f"\n--- Maze Size {rows}x{cols}, Run {run} ---")
-            # Create a new maze
-            generator = MazeGenerator(rows, cols)
-            generator.generate_maze()
-            generator.add_loops(probability=0.1)
-
-            # Ensure there's a path from start to goal.
-            attempts = 0
-            while not generator.is_path_to_goal() and attempts < 10:
-                generator.add_loops(probability=0.2)
-                attempts += 1
-
-            if not generator.is_path_to_goal():
-                print(f"Warning: Maze {rows}x{cols} run {run} is not solvable. Skipping.")
-                continue
-
-            # 2A. MDP Value Iteration
-            start_time = time.time()
-            V_vi, policy_vi, states_expanded_vi = solve_maze_value_iteration(
-                generator, gamma=0.9, theta=1e-4, max_iter=5000
-            )
-            runtime_vi = time.time() - start_time
-
-            # Extract solution path and measure length
-            policy_dict_vi = {(i, j): policy_vi[(i, j)] for i in range(generator.rows) for j in range(generator.cols)}
-            solution_vi = extract_path(policy_dict_vi, generator.start, generator.goal)
-
-            # Peak memory usage is a placeholder => total maze cells
-            peak_memory_vi = rows * cols
-
-            # Record metrics for Value Iteration
-            results.append({
-                "algorithm": "Value Iteration",
-                "maze_size": f"{rows}x{cols}",
-                "run": run,
-                "runtime": runtime_vi,
-                "states_expanded": states_expanded_vi,
-                "peak_memory": peak_memory_vi,
-                "solution_length": len(solution_vi)
-            })
-
-            # 2B. MDP Policy Iteration
-            start_time = time.time()
-            V_pi, policy_pi, states_expanded_pi = solve_maze_policy_iteration(
-                generator, gamma=0.9, theta=1e-4
-            )
-            runtime_pi = time.time() - start_time
-
-            # Extract solution path and measure length
-            policy_dict_pi = {(i, j): policy_pi[(i, j)] for i in range(generator.rows) for j in range(generator.cols)}
-            solution_pi = extract_path(policy_dict_pi, generator.start, generator.goal)
-
-            # Peak memory usage is a placeholder => total maze cells
-            peak_memory_pi = rows * cols
-
-            # Record metrics for Policy Iteration
-            results.append({
-                "algorithm": "Policy Iteration",
-                "maze_size": f"{rows}x{cols}",
-                "run": run,
-                "runtime": runtime_pi,
-                "states_expanded": states_expanded_pi,
-                "peak_memory": peak_memory_pi,
-                "solution_length": len(solution_pi)
-            })
-
-    # 3. Save results to CSV
+
+    mazes = solvable_mazes(experiment_mazes(maze_sizes, num_runs, build_mdp_maze, args.corpus))
+
+    # 2. Solve every maze with both algorithms, saving results to CSV as they finish
     csv_filename = "mdp_algorithm_results.csv"
     with open(csv_filename, "w", newline="") as csvfile:
         fieldnames = [
             "algorithm", "maze_size", "run",
-            "runtime", "states_expanded", "peak_memory", "solution_length"
+            "runtime", "states_expanded", "peak_memory", "solution_length",
+            "tracemalloc_peak_bytes", "rss_delta_bytes", "V_bytes", "q_values_bytes", "policy_bytes"
         ]
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
-        for row in results:
+
+        def write_row(row):
             writer.writerow(row)
+            csvfile.flush()
+
+        if args.workers != 1:
+            run_parallel(mazes, list(MDP_ALGORITHMS), mdp_row, write_row, workers=args.workers or None)
+        else:
+            for rows, cols, run, generator in mazes:
+                for algorithm in MDP_ALGORITHMS:
+                    write_row(mdp_row(algorithm, rows, cols, run, generator))
 
     print(f"\nExperiment results saved to {csv_filename}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,113 @@
+import os
+import sys
+import tracemalloc
+from array import array
+from collections import deque
+from solution_cache import estimate_size
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def structure_bytes(obj):
+    """
+    Approximate bytes held by one solver data structure.
+    Flat buffers (array.array, bytearray, NumPy arrays) are exact; containers of
+    Python objects (deques, heaps, dicts, nested lists) are estimated like
+    solution_cache.estimate_size, by sampling their first item.
+    Items are counted as if unshared, so structures full of interned strings or
+    small ints (like a policy dict) can report more than tracemalloc sees.
+    """
+    if isinstance(obj, (array, bytearray, bytes)):
+        # getsizeof already includes the element buffer
+        return sys.getsizeof(obj)
+    if isinstance(obj, deque):
+        if not obj:
+            return sys.getsizeof(obj)
+        return sys.getsizeof(obj) + len(obj) * estimate_size(obj[0])
+    return estimate_size(obj)
+
+
+def current_rss():
+    """
+    Resident set size of this process in bytes.
+    Read from /proc on Linux; elsewhere falls back to the peak RSS reported by
+    getrusage, and to 0 where neither is available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class MemoryProbe:
+    """
+    Opt-in memory instrumentation for one solver call.
+    Used as a context manager around the call, it records:
+      peak_bytes      -> peak Python/NumPy allocation above the starting point (tracemalloc).
+      rss_delta_bytes -> change in the process resident set size.
+      structures      -> name -> bytes for the structures the solver reports with record().
+    Solvers accept probe=None and, when given a probe, call record() on their
+    frontier, visited set, parents, values and policy. record() keeps the
+    largest size seen per name, so a frontier can be recorded whenever it grows.
+    tracemalloc slows allocation-heavy code down, so runtimes should be taken
+    from a separate, unprobed call.
+    """
+    def __init__(self):
+        self.peak_bytes = 0
+        self.rss_delta_bytes = 0
+        self.structures = {}
+        self._started_tracing = False
+        self._baseline = 0
+        self._rss_before = 0
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        # Read RSS first: reading /proc allocates, and that must not count toward the peak
+        self._rss_before = current_rss()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        peak = tracemalloc.get_traced_memory()[1]
+        self.rss_delta_bytes = current_rss() - self._rss_before
+        self.peak_bytes = max(0, peak - self._baseline)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def record(self, name, obj):
+        """Record the size of a structure under name, keeping the largest size seen."""
+        size = structure_bytes(obj)
+        if size > self.structures.get(name, 0):
+            self.structures[name] = size
+
+    def metrics(self):
+        """Flat dict for CSV rows: peak and RSS columns plus '<name>_bytes' per structure."""
+        row = {
+            "tracemalloc_peak_bytes": self.peak_bytes,
+            "rss_delta_bytes": self.rss_delta_bytes,
+        }
+        for name, size in self.structures.items():
+            row[f"{name}_bytes"] = size
+        return row
+
+
+def probe_call(function, *args, **kwargs):
+    """Call function(*args, probe=probe, **kwargs) under a new MemoryProbe; returns (result, probe)."""
+    with MemoryProbe() as probe:
+        result = function(*args, probe=probe, **kwargs)
+    return result, probe
@@ -0,0 +1,268 @@
+from maze import MazeGenerator, PolicyGrid, NO_ACTION, follow_policy, greedy_actions, value_tie_tolerance
+from memory_probe import MemoryProbe
+from value_iteration import neighbor_table, jacobi_backup
+import numpy as np
+import matplotlib.pyplot as plt
+import argparse
+import time
+
+
+class GridLevel:
+    """
+    One resolution of the maze as a graph. On the original grid every cell is a
+    node; on a coarser level a node is one aggregate: a connected piece of the
+    open nodes inside a block of the level below, so a block split by walls gives
+    several nodes. neighbors is a (width, nodes) table of neighbor ids padded with
+    the sentinel id num_nodes, as value_iteration.neighbor_table (whose U, D, L, R
+    rows the original grid uses). block_rows and block_cols place every node in a
+    rows x cols grid of blocks; open marks the nodes that are not walls, reachable
+    those that can reach goal; parent maps the nodes of the level below onto this
+    one (-1 for walls). Each move stands for `scale` moves on the original grid.
+    """
+    def __init__(self, neighbors, block_rows, block_cols, open_nodes, reachable, goal, scale, parent=None):
+        self.neighbors = neighbors
+        self.block_rows = block_rows
+        self.block_cols = block_cols
+        self.open = open_nodes
+        self.reachable = reachable
+        self.goal = goal
+        self.scale = scale
+        self.parent = parent
+        self.num_nodes = neighbors.shape[1]
+        self.rows = int(block_rows.max(initial=-1)) + 1
+        self.cols = int(block_cols.max(initial=-1)) + 1
+
+    @classmethod
+    def from_maze(cls, generator):
+        rows, cols = generator.rows, generator.cols
+        block_rows, block_cols = np.divmod(np.arange(rows * cols), cols)
+        return cls(neighbor_table(rows, cols, generator.open_neighbor_masks()), block_rows, block_cols,
+                   (generator.maze == 0).ravel(), (generator.goal_distances() >= 0).ravel(),
+                   generator.goal[0] * cols + generator.goal[1], 1)
+
+    def coarsen(self, block):
+        """
+        Aggregate the open nodes of every block x block group of blocks into its
+        connected pieces: the ends of an edge inside a group share an aggregate, and
+        two aggregates are neighbors if any edge joins them.
+        """
+        num_nodes = self.num_nodes
+        ids = np.arange(num_nodes)
+        key = (self.block_rows // block) * (-(-self.cols // block)) + self.block_cols // block
+        # Edges between open nodes; the sentinel is closed, so padding drops out
+        open_ext = np.append(self.open, False)
+        has_edge = open_ext[self.neighbors] & self.open
+        key_ext = np.append(key, -1)
+        inside_table = np.where(has_edge & (key_ext[self.neighbors] == key), self.neighbors, ids)
+
+        # Label propagation with pointer jumping: every node ends on the smallest id of its piece
+        label = ids
+        while True:
+            merged = np.min(label[inside_table], axis=0)
+            merged = merged[merged]
+            if np.array_equal(merged, label):
+                break
+            label = merged
+        open_ids = np.flatnonzero(self.open)
+        _, aggregate = np.unique(label[open_ids], return_inverse=True)
+        parent = np.full(num_nodes, -1, dtype=np.int64)
+        parent[open_ids] = aggregate
+        num_coarse = int(aggregate.max(initial=-1)) + 1
+
+        # One coarse edge per pair of aggregates joined by a fine edge, packed into table rows
+        crossing = has_edge & (inside_table != self.neighbors)
+        edge_from = np.broadcast_to(ids, self.neighbors.shape)[crossing]
+        pairs = np.sort(parent[edge_from] * num_coarse + parent[self.neighbors[crossing]])
+        pairs = pairs[np.append(True, pairs[1:] != pairs[:-1])]
+        coarse_from, coarse_to = np.divmod(pairs, num_coarse)
+        degree = np.bincount(coarse_from, minlength=num_coarse)
+        slot = np.arange(pairs.size) - np.repeat(np.cumsum(degree) - degree, degree)
+        neighbors = np.full((int(degree.max(initial=0)), num_coarse), num_coarse, dtype=np.int64)
+        neighbors[slot, coarse_from] = coarse_to
+
+        block_rows = np.zeros(num_coarse, dtype=np.int64)
+        block_cols = np.zeros(num_coarse, dtype=np.int64)
+        block_rows[aggregate] = self.block_rows[open_ids] // block
+        block_cols[aggregate] = self.block_cols[open_ids] // block
+        reachable = np.zeros(num_coarse, dtype=bool)
+        reachable[parent[self.reachable & self.open]] = True
+        return GridLevel(neighbors, block_rows, block_cols, np.ones(num_coarse, dtype=bool), reachable,
+                         int(parent[self.goal]), self.scale * block, parent)
+
+    def initial_values(self):
+        """
+        -distance to the goal in original-grid moves (BFS over this level's edges),
+        -9999 where the goal is out of reach, like MazeGenerator.initialize_values_bfs.
+        Flat, with the -inf sentinel that padded neighbors point at.
+        """
+        # The wavefront of MazeGenerator.goal_distances; the sentinel counts as visited
+        dist = np.full(self.num_nodes + 1, -1, dtype=np.int64)
+        dist[self.num_nodes] = 0
+        frontier = np.array([self.goal])
+        dist[frontier] = 0
+        layer = 0
+        while frontier.size:
+            layer += 1
+            candidates = self.neighbors[:, frontier].ravel()
+            frontier = np.unique(candidates[dist[candidates] < 0])
+            dist[frontier] = layer
+        values = np.where(dist >= 0, -dist * float(self.scale), -9999.0)
+        values[self.num_nodes] = -np.inf
+        return values
+
+    def states(self):
+        """Ids of the nodes that are backed up: goal-reachable open nodes other than the goal."""
+        states = np.flatnonzero(self.reachable & self.open)
+        return states[states != self.goal]
+
+
+def _value_iteration_sweeps(level, values, gamma, theta, max_iter):
+    """
+    Synchronous Bellman sweeps (value_iteration.jacobi_backup) of the goal-reachable
+    nodes of one level, with one move worth -(1 - gamma^scale) / (1 - gamma) and
+    discounted by gamma^scale. values is flat with the -inf sentinel at the end and
+    is updated in place.
+    Returns (iterations, states, state_neighbors, q_values, delta): the sweeps run,
+    the ids of the swept nodes, their neighbor ids, and the Q-values and largest
+    change of the last sweep.
+    """
+    discount = gamma ** level.scale
+    reward = -(1 - discount) / (1 - gamma)
+    states = level.states()
+    state_neighbors = level.neighbors[:, states]
+    values[level.goal] = 0.0
+
+    iterations = 0
+    delta = 0.0
+    q_values = None
+    for _ in range(max_iter):
+        q_values, _, delta = jacobi_backup(values, states, state_neighbors, discount, reward)
+        iterations += 1
+        if delta < theta:
+            break
+    if q_values is None:
+        q_values = values[state_neighbors] * discount + reward
+    return iterations, states, state_neighbors, q_values, delta
+
+
+def solve_maze_multigrid_value_iteration(generator, gamma=0.9, theta=1e-4, max_iter=5000,
+                                         block=2, min_size=16, probe=None, level_stats=None):
+    """
+    Solve the maze with coarse-to-fine (multigrid) Value Iteration.
+    The grid is aggregated into block x block groups repeatedly until a level is at
+    most min_size blocks on a side; every connected piece of a group becomes one
+    coarse node (see GridLevel.coarsen), so walls inside a block are respected.
+    The coarsest level is solved from its own BFS distances; each finer level then
+    starts from the value of the aggregate every node belongs to (prolongation) and
+    is refined by synchronous sweeps until the change is below theta. Coarse moves
+    cost and discount like `scale` fine moves, so coarse values are already on the
+    fine scale. As in solve_maze_value_iteration, only goal-reachable cells are
+    swept and cells out of reach are -9999 with no action.
+    The prolongated values are only close to the fine ones, so when the sweeps
+    stop far cells can still rank a longer route first: Q-values within the error
+    bound gamma * delta / (1 - gamma) of the last change delta (at least
+    value_tie_tolerance) are ties, going toward the goal (maze.greedy_actions).
+    level_stats, when a list, receives one dict per level from coarsest to finest with
+    level (0 = original grid), rows and cols (in blocks), nodes, iterations,
+    states_expanded and time.
+    With a memory_probe.MemoryProbe as probe, the sizes of V and the policy are recorded.
+    Returns:
+    V: 2D numpy value estimates array.
+    policy: PolicyGrid of int8 action codes, also readable as a (row, col) -> action mapping.
+    states_expanded_value: Number of state evaluations over all levels.
+    """
+    if block < 2:
+        raise ValueError(f"block must be at least 2, got {block}")
+
+    levels = [GridLevel.from_maze(generator)]
+    while max(levels[-1].rows, levels[-1].cols) > min_size:
+        levels.append(levels[-1].coarsen(block))
+
+    states_expanded_value = 0
+    values = None
+    for depth in range(len(levels) - 1, -1, -1):
+        level = levels[depth]
+        start_time = time.perf_counter()
+        if values is None:
+            values = level.initial_values()
+        else:
+            # Prolongation: every node starts from the value of its aggregate, walls from -9999
+            parent = levels[depth + 1].parent
+            values = np.append(np.where(parent >= 0, values[parent], -9999.0), -np.inf)
+        iterations, states, state_neighbors, q_values, delta = _value_iteration_sweeps(
+            level, values, gamma, theta, max_iter)
+        states_expanded = iterations * int(states.size)
+        states_expanded_value += states_expanded
+        if level_stats is not None:
+            level_stats.append({
+                "level": depth,
+                "rows": level.rows,
+                "cols": level.cols,
+                "nodes": int(np.count_nonzero(level.open)),
+                "iterations": iterations,
+                "states_expanded": states_expanded,
+                "time": time.perf_counter() - start_time
+            })
+
+    # Policy from the last fine sweep; walls, the goal and cells out of reach get ''
+    dist = generator.goal_distances()
+    V = values[:-1].reshape(dist.shape)
+    V[dist < 0] = -9999.0
+    successor_distances = np.append(dist.ravel(), -1)[state_neighbors]
+    tolerance = max(value_tie_tolerance(gamma), gamma * delta / (1 - gamma))
+    policy_idx = np.full(V.size, NO_ACTION, dtype=np.int8)
+    policy_idx[states] = greedy_actions(q_values, successor_distances, tolerance)
+    policy = PolicyGrid(policy_idx.reshape(V.shape))
+    if probe is not None:
+        probe.record("V", V)
+        probe.record("policy", policy)
+    return V, policy, states_expanded_value
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate and solve a maze using coarse-to-fine (multigrid) Value Iteration."
+    )
+    parser.add_argument("--rows", type=int, default=100, help="Number of rows for the maze (default: 100)")
+    parser.add_argument("--cols", type=int, default=100, help="Number of columns for the maze (default: 100)")
+    parser.add_argument("--gamma", type=float, default=0.9, help="Discount factor (default: 0.9)")
+    parser.add_argument("--block", type=int, default=2, help="Cells per block side when coarsening (default: 2)")
+    parser.add_argument("--min-size", type=int, default=16,
+                        help="Stop coarsening once a level is this small (default: 16)")
+    args = parser.parse_args()
+
+    generator = MazeGenerator(args.rows, args.cols)
+    generator.generate_maze()
+    # 10% extra loops, plus the fewest walls that join start and goal
+    generator.add_loops(probability=0.1, connect=True)
+
+    level_stats = []
+    start_time = time.perf_counter()
+    V, policy, states_expanded_value = solve_maze_multigrid_value_iteration(
+        generator, gamma=args.gamma, block=args.block, min_size=args.min_size, level_stats=level_stats
+    )
+    runtime_value = time.perf_counter() - start_time
+    solution, termination = follow_policy(policy, generator.start, generator.goal, maze=generator.maze)
+
+    probe = MemoryProbe()
+    with probe:
+        solve_maze_multigrid_value_iteration(
+            generator, gamma=args.gamma, block=args.block, min_size=args.min_size, probe=probe
+        )
+
+    print("Evaluation Metrics:")
+    print(f"runtime_value (seconds): {runtime_value:.4f}")
+    print(f"States Expanded: {states_expanded_value}")
+    print(f"Peak Memory Usage (bytes): {probe.peak_bytes}")
+    for stats in level_stats:
+        print(f"  level {stats['level']} ({stats['rows']}x{stats['cols']} blocks, {stats['nodes']} nodes): "
+              f"{stats['iterations']} sweeps, {stats['states_expanded']} states, {stats['time']:.4f}s")
+
+    print("Solution path length (Multigrid Value Iteration):", len(solution))
+    if termination != "goal":
+        print(f"Warning: the policy path stopped before the goal ({termination}).")
+    generator.visualize_maze(solution=solution, title="Multigrid Value Iteration Path")
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+import numpy as np
+from maze import MazeGenerator
+
+# Thread pools that NumPy or its BLAS may start inside each worker. They are read
+# when NumPy is first imported, so they must already be set when a worker starts.
+THREAD_LIMIT_VARIABLES = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                          "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS"]
+
+
+def default_workers():
+    """One worker per available CPU, leaving one for the parent that generates mazes."""
+    if hasattr(os, "sched_getaffinity"):
+        available = len(os.sched_getaffinity(0))
+    else:
+        available = os.cpu_count() or 1
+    return max(1, available - 1)
+
+
+def _init_worker(counter, cpus):
+    """
+    Where the OS allows it, pin every worker to its own CPU so concurrent solves
+    do not compete for cores and skew the timings (run_parallel has already made
+    the workers single-threaded through THREAD_LIMIT_VARIABLES).
+    """
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+
+
+def _run_task(row_function, algorithm, descriptor, rows, cols, run):
+    """Attach to a shared maze, wrap it without copying, and compute one CSV row."""
+    shm = shared_memory.SharedMemory(name=descriptor["name"])
+    try:
+        grid = np.ndarray((descriptor["rows"], descriptor["cols"]), dtype=np.uint8, buffer=shm.buf)
+        maze_gen = MazeGenerator(descriptor["rows"], descriptor["cols"], seed=descriptor["seed"], grid=grid)
+        maze_gen.start = descriptor["start"]
+        maze_gen.goal = descriptor["goal"]
+        row = row_function(algorithm, rows, cols, run, maze_gen)
+        # Drop every view of the buffer before closing the mapping
+        del maze_gen, grid
+        return row
+    finally:
+        shm.close()
+
+
+def _share_maze(maze_gen):
+    """Copy a maze grid into a new shared memory block; returns (block, descriptor)."""
+    shm = shared_memory.SharedMemory(create=True, size=max(1, maze_gen.rows * maze_gen.cols))
+    np.ndarray((maze_gen.rows, maze_gen.cols), dtype=np.uint8, buffer=shm.buf)[:] = maze_gen.maze
+    descriptor = {
+        "name": shm.name,
+        "rows": maze_gen.rows,
+        "cols": maze_gen.cols,
+        "start": tuple(maze_gen.start),
+        "goal": tuple(maze_gen.goal),
+        "seed": maze_gen.seed,
+    }
+    return shm, descriptor
+
+
+def run_parallel(mazes, algorithms, row_function, on_row, workers=None):
+    """
+    Spread the (maze, algorithm) matrix over a process pool.
+    mazes yields (rows, cols, run, maze_gen); each grid is placed in shared memory
+    once and every worker maps it instead of receiving a pickled copy.
+    row_function(algorithm, rows, cols, run, maze_gen) must be a module-level
+    function returning one result row; on_row(row) is called in the parent as
+    soon as each row is ready, in completion order.
+    At most two mazes per worker are kept in flight, which bounds shared memory.
+    """
+    workers = workers or default_workers()
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = []
+    context = multiprocessing.get_context("spawn")
+    counter = context.Value("i", 0)
+
+    pending = {}
+    remaining = {}
+    blocks = {}
+    mazes = iter(mazes)
+    # Spawned workers copy the parent's environment at start-up, before they import
+    # NumPy; the parent's own thread pools are already running and stay as they are
+    saved_environment = {name: os.environ.get(name) for name in THREAD_LIMIT_VARIABLES}
+    os.environ.update({name: "1" for name in THREAD_LIMIT_VARIABLES})
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(counter, cpus)) as pool:
+            _drain(pool, mazes, algorithms, row_function, on_row, workers, pending, remaining, blocks)
+    finally:
+        for name, value in saved_environment.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        for shm in blocks.values():
+            shm.close()
+            shm.unlink()
+
+
+def _drain(pool, mazes, algorithms, row_function, on_row, workers, pending, remaining, blocks):
+    """Submit mazes while few are in flight and hand finished rows to on_row."""
+    exhausted = False
+    while True:
+        while not exhausted and len(blocks) < 2 * workers:
+            item = next(mazes, None)
+            if item is None:
+                exhausted = True
+                break
+            rows, cols, run, maze_gen = item
+            shm, descriptor = _share_maze(maze_gen)
+            blocks[shm.name] = shm
+            remaining[shm.name] = len(algorithms)
+            for algorithm in algorithms:
+                future = pool.submit(_run_task, row_function, algorithm, descriptor, rows, cols, run)
+                pending[future] = shm.name
+        if not pending:
+            break
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            try:
+                on_row(future.result())
+            finally:
+                remaining[name] -= 1
+                if remaining[name] == 0:
+                    del remaining[name]
+                    shm = blocks.pop(name)
+                    shm.close()
+                    shm.unlink()
@@ -1,69 +1,337 @@
-from maze import MazeGenerator, extract_path
+from maze import (MazeGenerator, PolicyGrid, NO_ACTION, ACTION_NAMES, follow_policy, greedy_path_gap,
+                  greedy_actions, value_tie_tolerance)
+from memory_probe import MemoryProbe
+import numpy as np
 import matplotlib.pyplot as plt
 import argparse
 import time
 
-def solve_maze_policy_iteration(generator, gamma=0.9, theta=1e-4):
+def policy_successors(generator, policy_idx, masks):
+    """
+    Successor of every cell under a policy of action indices (0..3 for U, D, L, R).
+    Blocked moves stay in place, as in the iterative evaluation.
+    Returns a flat int64 array of cell ids (row * cols + col).
+    """
+    cols = generator.cols
+    ids = np.arange(generator.rows * cols)
+    steps = np.array([-cols, cols, -1, 1])
+    action = np.clip(policy_idx.ravel(), 0, 3)
+    allowed = np.take_along_axis(masks.reshape(4, -1), action[np.newaxis], axis=0)[0]
+    return np.where(allowed, ids + steps[action], ids)
+
+def evaluate_policy_exact(successors, goal_id, gamma):
+    """
+    Exact values of a deterministic policy given as a functional graph.
+    Every step costs -1 and the goal is absorbing with value 0, so a cell that
+    reaches the goal in k steps is worth -(1 - gamma^k) / (1 - gamma).
+    A cell whose chain ends in a cycle (including a self-loop into a wall) never
+    reaches the goal and is worth -1 / (1 - gamma).
+    The step counts are found by pointer jumping: O(N log N) work in log2(N) array passes.
+    """
+    nxt = successors.copy()
+    nxt[goal_id] = goal_id
+    steps = np.ones(nxt.size, dtype=np.int64)
+    steps[goal_id] = 0
+    # After r rounds nxt[v] is 2^r steps ahead of v and steps[v] counts the moves taken
+    for _ in range(max(1, int(nxt.size).bit_length())):
+        steps += steps[nxt]
+        nxt = nxt[nxt]
+    reaches_goal = nxt == goal_id
+    if gamma < 1:
+        with np.errstate(over='ignore', under='ignore'):
+            V = -(1 - np.power(gamma, np.where(reaches_goal, steps, 0))) / (1 - gamma)
+        V[~reaches_goal] = -1 / (1 - gamma)
+    else:
+        V = np.where(reaches_goal, -steps.astype(float), -np.inf)
+    return V
+
+def _action_successor_values(grid, masks):
+    """
+    (4, rows, cols) array of grid at the successor of every cell under each of
+    the U, D, L, R moves; blocked moves stay in place.
+    """
+    shifted = np.repeat(grid[np.newaxis], 4, axis=0)
+    shifted[0, 1:, :] = np.where(masks[0, 1:, :], grid[:-1, :], grid[1:, :])
+    shifted[1, :-1, :] = np.where(masks[1, :-1, :], grid[1:, :], grid[:-1, :])
+    shifted[2, :, 1:] = np.where(masks[2, :, 1:], grid[:, :-1], grid[:, 1:])
+    shifted[3, :, :-1] = np.where(masks[3, :, :-1], grid[:, 1:], grid[:, :-1])
+    return shifted
+
+def _reachable_mask(generator):
+    """(rows, cols) bool mask of MazeGenerator.goal_component, the states Policy Iteration updates."""
+    active = np.zeros(generator.rows * generator.cols, dtype=bool)
+    active[generator.goal_component()] = True
+    return active.reshape(generator.rows, generator.cols)
+
+def _solve_policy_iteration_exact(generator, gamma, max_iter, probe=None, trace=None, path_tolerance=None):
+    """
+    Policy Iteration with exact policy evaluation and a vectorized improvement step.
+    Mirrors the iterative version: blocked moves stay in place, only goal-reachable
+    states are updated, and a state keeps its action unless another one is better
+    by more than value_tie_tolerance or ties it closer to the goal (greedy_actions).
+    Stops when the policy is stable, or after max_iter improvements.
+    """
+    rows, cols = generator.rows, generator.cols
+    start_id = generator.start[0] * cols + generator.start[1]
+    goal_id = generator.goal[0] * cols + generator.goal[1]
+    masks = generator.open_neighbor_masks()
+    active = _reachable_mask(generator)
+    num_active = int(np.count_nonzero(active))
+    successor_distances = _action_successor_values(generator.goal_distances(), masks)[:, active]
+    tolerance = value_tie_tolerance(gamma)
+
+    # Start from the all-'U' policy; NO_ACTION marks cells without an action ('')
+    policy_idx = np.where(active, 0, NO_ACTION).astype(np.int8)
+    V = np.zeros((rows, cols))
+
+    states_expanded_policy = 0
+    previous_path = None
+    for _ in range(max_iter):
+        # Policy Evaluation: one exact solve per policy
+        successors = policy_successors(generator, policy_idx, masks)
+        V_flat = evaluate_policy_exact(successors, goal_id, gamma)
+        V = np.where(active, V_flat.reshape(rows, cols), 0.0)
+        states_expanded_policy += num_active
+
+        # Policy Improvement: blocked moves back up the cell's own value
+        shifted = _action_successor_values(V, masks)
+        q_values = -1 + gamma * shifted
+        best_action = greedy_actions(q_values[:, active], successor_distances, tolerance,
+                                     policy_idx[active]).astype(np.int8)
+        states_expanded_policy += num_active
+        policy_stable = np.array_equal(best_action, policy_idx[active])
+        policy_idx[active] = best_action
+        residual = float(np.max(np.abs(np.max(q_values, axis=0) - V)[active], initial=0.0))
+        if trace is not None:
+            trace.append(residual)
+        if policy_stable:
+            break
+        if path_tolerance is not None:
+            path, gap = greedy_path_gap(policy_successors(generator, policy_idx, masks), start_id, goal_id,
+                                        V.flat[start_id], residual / (1 - gamma), gamma)
+            if path is not None and path == previous_path and gap <= path_tolerance:
+                break
+            previous_path = path
+
+    policy = PolicyGrid(policy_idx)
+    V = V.tolist()
+    if probe is not None:
+        probe.record("V", V)
+        probe.record("q_values", shifted)
+        probe.record("policy", policy)
+    return V, policy, states_expanded_policy
+
+def _solve_policy_iteration_modified(generator, gamma, theta, sweeps, max_iter, probe=None, trace=None,
+                                     path_tolerance=None):
+    """
+    Modified Policy Iteration: each improvement is followed by a bounded evaluation
+    of exactly sweeps backups (at least 1) instead of a full solve.
+    Values start from initialize_values_bfs, which is below the fixed point, so the
+    first greedy policy already heads down the BFS distances and V rises monotonically.
+    One evaluation sweep is the affine map V <- -1 + gamma * V[successor] on active
+    cells (identity on walls and the goal); squaring that map gives the 2^r-sweep
+    maps, and composing those for the binary digits of sweeps gives exactly sweeps
+    sweeps in about 2 log2(sweeps) array passes. states_expanded still counts every
+    sweep as one evaluation of each active state. Walls and cells out of reach are 0
+    in the returned V, as in the other modes.
+    Stops once the Bellman residual of the greedy step is below theta, or after
+    max_iter improvements. Blocked moves stay in place and ties are settled by
+    greedy_actions, as in the other modes.
+    """
+    if sweeps < 1:
+        raise ValueError(f"evaluation_sweeps must be at least 1, got {sweeps}")
+    rows, cols = generator.rows, generator.cols
+    start_id = generator.start[0] * cols + generator.start[1]
+    goal_id = generator.goal[0] * cols + generator.goal[1]
+    masks = generator.open_neighbor_masks()
+    active = _reachable_mask(generator)
+    active_flat = active.ravel()
+    num_active = int(np.count_nonzero(active))
+    ids = np.arange(rows * cols)
+    successor_distances = _action_successor_values(generator.goal_distances(), masks)[:, active]
+    tolerance = value_tie_tolerance(gamma)
+
+    V = generator.initialize_values_bfs()
+    V[generator.goal] = 0.0
+    policy_idx = np.where(active, 0, NO_ACTION).astype(np.int8)
+    shifted = np.empty((4, rows, cols))
+
+    states_expanded_policy = 0
+    previous_path = None
+    for _ in range(max_iter):
+        # Policy Improvement: greedy step on V, blocked moves back up the cell's own value
+        shifted[:] = V
+        shifted[0, 1:, :] = np.where(masks[0, 1:, :], V[:-1, :], V[1:, :])
+        shifted[1, :-1, :] = np.where(masks[1, :-1, :], V[1:, :], V[:-1, :])
+        shifted[2, :, 1:] = np.where(masks[2, :, 1:], V[:, :-1], V[:, 1:])
+        shifted[3, :, :-1] = np.where(masks[3, :, :-1], V[:, 1:], V[:, :-1])
+        shifted *= gamma
+        shifted -= 1
+        best_value = np.max(shifted, axis=0)
+        states_expanded_policy += num_active
+        policy_idx[active] = greedy_actions(shifted[:, active], successor_distances, tolerance,
+                                            policy_idx[active])
+        residual = np.max(np.abs(best_value[active] - V[active]), initial=0.0)
+        V[active] = best_value[active]
+        if trace is not None:
+            trace.append(float(residual))
+        if residual < theta:
+            break
+        if path_tolerance is not None:
+            # V is now the greedy backup, within gamma * residual / (1 - gamma) of V*
+            path, gap = greedy_path_gap(policy_successors(generator, policy_idx, masks), start_id, goal_id,
+                                        V.flat[start_id], gamma * residual / (1 - gamma), gamma)
+            if path is not None and path == previous_path and gap <= path_tolerance:
+                break
+            previous_path = path
+
+        # Policy Evaluation: sweeps sweeps of the policy's affine map V <- offset + scale * V[successors],
+        # composed from its 2^r-sweep powers (by repeated squaring) for the binary digits of sweeps
+        successors = np.where(active_flat, policy_successors(generator, policy_idx, masks), ids)
+        offset = np.where(active_flat, -1.0, 0.0)
+        scale = np.where(active_flat, gamma, 1.0)
+        total_offset = np.zeros(rows * cols)
+        total_scale = np.ones(rows * cols)
+        total_successors = ids
+        remaining = sweeps
+        while True:
+            if remaining & 1:
+                total_offset = total_offset + total_scale * offset[total_successors]
+                total_scale = total_scale * scale[total_successors]
+                total_successors = successors[total_successors]
+            remaining >>= 1
+            if not remaining:
+                break
+            offset += scale * offset[successors]
+            scale *= scale[successors]
+            successors = successors[successors]
+        V_flat = V.ravel()
+        V_flat[:] = total_offset + total_scale * V_flat[total_successors]
+        states_expanded_policy += sweeps * num_active
+
+    policy = PolicyGrid(policy_idx)
+    # Walls and cells out of reach keep -9999 from initialize_values_bfs; the other modes give them 0
+    V = np.where(active, V, 0.0).tolist()
+    if probe is not None:
+        probe.record("V", V)
+        probe.record("q_values", shifted)
+        probe.record("policy", policy)
+    return V, policy, states_expanded_policy
+
+def solve_maze_policy_iteration(generator, gamma=0.9, theta=1e-4, evaluation="iterative", probe=None,
+                                evaluation_sweeps=64, trace=None, path_tolerance=None, max_iter=1000):
     """
     Solve maze with Policy Iteration.
+    Only the goal-reachable open cells (MazeGenerator.goal_component) are evaluated
+    and improved; walls, the goal and cells cut off from the goal get no action.
+    evaluation selects how each policy is evaluated:
+      'iterative' -> repeated sweeps until the change is below theta.
+      'exact'     -> direct solve on the policy's functional graph (theta is unused).
+      'modified'  -> modified policy iteration: evaluation_sweeps vectorized sweeps per
+                     improvement, warm-started from the BFS distances.
+    A state keeps its action unless another one is better by more than
+    value_tie_tolerance(gamma) or ties it with a successor closer to the goal: far
+    from the goal the values round to the same -1 / (1 - gamma), and these ties
+    would otherwise flip forever. max_iter caps the number of improvement steps.
+    trace, when a list, receives the Bellman residual max |max_a Q(s, a) - V(s)| of
+    every improvement step.
+    path_tolerance, when set, stops once the greedy path from start reaches the goal,
+    is the same as after the previous improvement, and is provably within
+    path_tolerance of the optimal discounted return (greedy_path_gap, with the
+    error bound residual / (1 - gamma)).
+    With a memory_probe.MemoryProbe as probe, the sizes of V and the policy are recorded.
     Returns:
     V: List of value estimates, 2D.
-    policy: (row, col) -> action dictionary.
+    policy: PolicyGrid of int8 action codes, also readable as a (row, col) -> action mapping.
     states_expanded_policy: Overall number of state evaluations.
     """
+    if evaluation == "exact":
+        return _solve_policy_iteration_exact(generator, gamma, max_iter, probe, trace, path_tolerance)
+    if evaluation == "modified":
+        return _solve_policy_iteration_modified(generator, gamma, theta, evaluation_sweeps, max_iter, probe,
+                                                trace, path_tolerance)
+    if evaluation != "iterative":
+        raise ValueError(f"Unknown policy evaluation mode: {evaluation!r}")
+
     actions = {'U': (-1, 0), 'D': (1, 0), 'L': (0, -1), 'R': (0, 1)}
-    # Initialize V as a 2D list and policy as a 2D list with default action 'U'
+    cols = generator.cols
+    start_id = generator.start[0] * cols + generator.start[1]
+    goal_id = generator.goal[0] * cols + generator.goal[1]
+    # Goal-reachable states as (i, j), computed once; nothing else is ever updated
+    dist = generator.goal_distances()
+    states = [divmod(int(cell), cols) for cell in generator.goal_component(dist)]
+    dist = dist.tolist()
+    tolerance = value_tie_tolerance(gamma)
+    # Initialize V as a 2D list and policy as a 2D list with default action 'U' on the states
     V = [[0 for _ in range(generator.cols)] for _ in range(generator.rows)]
-    policy_arr = [['U' for _ in range(generator.cols)] for _ in range(generator.rows)]
-    for i in range(generator.rows):
-        for j in range(generator.cols):
-            if generator.maze[i, j] == 1:
-                policy_arr[i][j] = ''
+    policy_arr = [['' for _ in range(generator.cols)] for _ in range(generator.rows)]
+    for i, j in states:
+        policy_arr[i][j] = 'U'
 
     states_expanded_policy = 0
-    policy_stable = False
-    while not policy_stable:
+    previous_path = None
+    for _ in range(max_iter):
         # Policy Evaluation
         while True:
             delta = 0
             new_V = [row[:] for row in V]
-            for i in range(generator.rows):
-                for j in range(generator.cols):
-                    if generator.maze[i, j] == 1 or (i, j) == generator.goal:
-                        continue
-                    states_expanded_policy += 1
-                    a = policy_arr[i][j]
-                    di, dj = actions[a]
-                    ni, nj = i + di, j + dj
-                    if not (0 <= ni < generator.rows and 0 <= nj < generator.cols) or generator.maze[ni][nj] == 1:
-                        ni, nj = i, j
-                    v_new = -1 + gamma * V[ni][nj]
-                    new_V[i][j] = v_new
-                    delta = max(delta, abs(v_new - V[i][j]))
+            for i, j in states:
+                states_expanded_policy += 1
+                a = policy_arr[i][j]
+                di, dj = actions[a]
+                ni, nj = i + di, j + dj
+                if not (0 <= ni < generator.rows and 0 <= nj < generator.cols) or generator.maze[ni][nj] == 1:
+                    ni, nj = i, j
+                v_new = -1 + gamma * V[ni][nj]
+                new_V[i][j] = v_new
+                delta = max(delta, abs(v_new - V[i][j]))
             V = [row[:] for row in new_V]
             if delta < theta:
                 break
 
         # Policy Improvement
         policy_stable = True
-        for i in range(generator.rows):
-            for j in range(generator.cols):
-                if generator.maze[i, j] == 1 or (i, j) == generator.goal:
-                    continue
-                states_expanded_policy += 1
-                old_action = policy_arr[i][j]
-                q_values_policy = {}
-                for a, (di, dj) in actions.items():
-                    ni, nj = i + di, j + dj
-                    if not (0 <= ni < generator.rows and 0 <= nj < generator.cols) or generator.maze[ni][nj] == 1:
-                        ni, nj = i, j
-                    q_values_policy[a] = -1 + gamma * V[ni][nj]
-                best_action = max(q_values_policy, key=q_values_policy.get)
-                policy_arr[i][j] = best_action
-                if best_action != old_action:
-                    policy_stable = False
-
-    policy = {(i, j): policy_arr[i][j] for i in range(generator.rows) for j in range(generator.cols)}
+        residual = 0.0
+        successors = [-1] * (generator.rows * cols)
+        for i, j in states:
+            states_expanded_policy += 1
+            old_action = policy_arr[i][j]
+            q_values_policy = {}
+            next_cells = {}
+            for a, (di, dj) in actions.items():
+                ni, nj = i + di, j + dj
+                if not (0 <= ni < generator.rows and 0 <= nj < generator.cols) or generator.maze[ni][nj] == 1:
+                    ni, nj = i, j
+                q_values_policy[a] = -1 + gamma * V[ni][nj]
+                next_cells[a] = ni * cols + nj
+            # Ties (within tolerance) go to the successor closest to the goal, then to
+            # the current action, then to the first action in U, D, L, R order
+            best_value = max(q_values_policy.values())
+            best_action = min(
+                (a for a in actions if q_values_policy[a] >= best_value - tolerance),
+                key=lambda a: (dist[next_cells[a] // cols][next_cells[a] % cols], a != old_action)
+            )
+            policy_arr[i][j] = best_action
+            successors[i * cols + j] = next_cells[best_action]
+            residual = max(residual, abs(q_values_policy[best_action] - V[i][j]))
+            if best_action != old_action:
+                policy_stable = False
+        if trace is not None:
+            trace.append(residual)
+        if policy_stable:
+            break
+        if path_tolerance is not None:
+            path, gap = greedy_path_gap(successors, start_id, goal_id, V[generator.start[0]][generator.start[1]],
+                                        residual / (1 - gamma), gamma)
+            if path is not None and path == previous_path and gap <= path_tolerance:
+                break
+            previous_path = path
+
+    codes = {name: code for code, name in enumerate(ACTION_NAMES)}
+    policy = PolicyGrid([[codes[a] for a in row] for row in policy_arr])
+    if probe is not None:
+        probe.record("V", V)
+        probe.record("policy", policy)
     return V, policy, states_expanded_policy
 
 def main():
@@ -82,40 +350,65 @@ def main():
         default=100,
         help="Number of columns for the maze (default: 100)"
     )
+    parser.add_argument(
+        "--evaluation",
+        choices=["iterative", "exact", "modified"],
+        default="iterative",
+        help="Policy evaluation mode (default: iterative)"
+    )
+    parser.add_argument(
+        "--evaluation-sweeps",
+        type=int,
+        default=64,
+        help="Evaluation sweeps per improvement for --evaluation modified (default: 64)"
+    )
+    parser.add_argument(
+        "--path-tolerance",
+        type=float,
+        default=None,
+        help="Stop once the greedy path is stable and within this much of the optimal return (default: off)"
+    )
     args = parser.parse_args()
 
     generator = MazeGenerator(args.rows, args.cols)
     generator.generate_maze()
-    generator.add_loops(probability=0.1)
-    
-    # Ensure a path exists from start to goal.
-    attempts = 0
-    while not generator.is_path_to_goal() and attempts < 10:
-        generator.add_loops(probability=0.2)
-        attempts += 1
-    if not generator.is_path_to_goal():
-        print("Warning: Maze is not solvable from start to goal.")
-        return
+    # 10% extra loops, plus the fewest walls that join start and goal
+    generator.add_loops(probability=0.1, connect=True)
 
     # Solve the maze and measure runtime_policy.
-    start_time = time.time()
-    V, policy, states_expanded_policy = solve_maze_policy_iteration(generator, gamma=0.9, theta=1e-4)
-    runtime_policy = time.time() - start_time
+    trace = []
+    start_time = time.perf_counter()
+    V, policy, states_expanded_policy = solve_maze_policy_iteration(
+        generator, gamma=0.9, theta=1e-4, evaluation=args.evaluation,
+        evaluation_sweeps=args.evaluation_sweeps, trace=trace, path_tolerance=args.path_tolerance
+    )
+    runtime_policy = time.perf_counter() - start_time
 
     # Extract the solution path.
-    policy_dict = {(i, j): policy[(i, j)] for i in range(generator.rows) for j in range(generator.cols)}
-    solution = extract_path(policy_dict, generator.start, generator.goal)
+    solution, termination = follow_policy(policy, generator.start, generator.goal, maze=generator.maze)
     
-    # Define and print evaluation metrics.
-    peak_memory_policy = generator.rows * generator.cols  # Placeholder for peak memory usage
+    # Measure memory on a second, probed solve so tracemalloc does not skew runtime_policy
+    probe = MemoryProbe()
+    with probe:
+        solve_maze_policy_iteration(
+            generator, gamma=0.9, theta=1e-4, evaluation=args.evaluation, probe=probe,
+            evaluation_sweeps=args.evaluation_sweeps, path_tolerance=args.path_tolerance
+        )
     
     
     print("Evaluation Metrics:")
     print(f"runtime_policy (seconds): {runtime_policy:.4f}")
     print(f"States Expanded: {states_expanded_policy}")
-    print(f"Peak Memory Usage (cells): {peak_memory_policy}")
+    if trace:
+        print(f"Residual trace: {len(trace)} improvements, first {trace[0]:.4g}, last {trace[-1]:.4g}")
+    print(f"Peak Memory Usage (bytes): {probe.peak_bytes}")
+    print(f"RSS Delta (bytes): {probe.rss_delta_bytes}")
+    for name, size in probe.structures.items():
+        print(f"  {name} (bytes): {size}")
 
     print("Solution path length (Policy Iteration):", len(solution))
+    if termination != "goal":
+        print(f"Warning: the policy path stopped before the goal ({termination}).")
     generator.visualize_maze(solution=solution, title="MDP Policy Iteration Path")
     plt.show()
 
@@ -1,79 +1,165 @@
 import csv
+import argparse
 from maze import MazeGenerator
+from maze_corpus import experiment_mazes
+from memory_probe import probe_call
+from parallel_runner import run_parallel
 from dfs import solve_maze_dfs
 from bfs import solve_maze_bfs
 from astar import solve_maze_astar
+from jps import solve_maze_jps
+from junction_graph import solve_maze_junction_bfs, solve_maze_junction_dijkstra, solve_maze_junction_astar
+from bidirectional import solve_maze_bidirectional_bfs, solve_maze_bidirectional_astar
 
-def run_experiments_search(num_runs, maze_sizes, csv_filename="maze_algorithms_results.csv"):
+def build_search_maze(rows, cols, seed=None):
+    """Generate one experiment maze: the DFS carve plus 10% extra loops."""
+    maze_gen = MazeGenerator(rows, cols, seed=seed)
+    maze_gen.generate_maze()
+    maze_gen.add_loops(probability=0.1)
+    return maze_gen
+
+# Algorithm name -> (solver, metric key for each CSV column)
+SEARCH_ALGORITHMS = {
+    'DFS': (solve_maze_dfs, {
+        'runtime': 'runtime_dfs',
+        'graph_build_time': 'graph_build_time_dfs',
+        'states_expanded': 'states_expanded_dfs',
+        'peak_memory_usage': 'peak_memory_usage_dfs',
+        'path_length': 'path_length_dfs'
+    }),
+    'BFS': (solve_maze_bfs, {
+        'runtime': 'runtime_bfs',
+        'graph_build_time': 'graph_build_time_bfs',
+        'states_expanded': 'states_expanded_bfs',
+        'peak_memory_usage': 'peak_memory_usage_bfs',
+        'path_length': 'path_bfs_length'
+    }),
+    'A*': (solve_maze_astar, {
+        'runtime': 'runtime_astar',
+        'graph_build_time': 'graph_build_time_astar',
+        'states_expanded': 'states_expanded_astar',
+        'peak_memory_usage': 'peak_memory_usage_astar',
+        'path_length': 'path_length_astar'
+    }),
+    'Bidirectional BFS': (solve_maze_bidirectional_bfs, {
+        'runtime': 'runtime_bibfs',
+        'graph_build_time': 'graph_build_time_bibfs',
+        'states_expanded': 'states_expanded_bibfs',
+        'peak_memory_usage': 'peak_memory_usage_bibfs',
+        'path_length': 'path_length_bibfs'
+    }),
+    'Bidirectional A*': (solve_maze_bidirectional_astar, {
+        'runtime': 'runtime_biastar',
+        'graph_build_time': 'graph_build_time_biastar',
+        'states_expanded': 'states_expanded_biastar',
+        'peak_memory_usage': 'peak_memory_usage_biastar',
+        'path_length': 'path_length_biastar'
+    }),
+    'JPS': (solve_maze_jps, {
+        'runtime': 'runtime_jps',
+        'states_expanded': 'states_expanded_jps',
+        'peak_memory_usage': 'peak_memory_usage_jps',
+        'path_length': 'path_length_jps',
+        'jump_points': 'jump_points_jps'
+    }),
+    'Junction BFS': (solve_maze_junction_bfs, {
+        'runtime': 'runtime_jbfs',
+        'states_expanded': 'states_expanded_jbfs',
+        'peak_memory_usage': 'peak_memory_usage_jbfs',
+        'path_length': 'path_length_jbfs',
+        'graph_nodes': 'graph_nodes_jbfs'
+    }),
+    'Junction Dijkstra': (solve_maze_junction_dijkstra, {
+        'runtime': 'runtime_jdijkstra',
+        'states_expanded': 'states_expanded_jdijkstra',
+        'peak_memory_usage': 'peak_memory_usage_jdijkstra',
+        'path_length': 'path_length_jdijkstra',
+        'graph_nodes': 'graph_nodes_jdijkstra'
+    }),
+    'Junction A*': (solve_maze_junction_astar, {
+        'runtime': 'runtime_jastar',
+        'states_expanded': 'states_expanded_jastar',
+        'peak_memory_usage': 'peak_memory_usage_jastar',
+        'path_length': 'path_length_jastar',
+        'graph_nodes': 'graph_nodes_jastar'
+    }),
+}
+
+def search_row(algorithm, rows, cols, run, maze_gen):
+    """Solve one maze with one search algorithm and return its CSV row."""
+    solver, columns = SEARCH_ALGORITHMS[algorithm]
+    path, metrics = solver(maze_gen)
+    row = {'algorithm': algorithm, 'maze_rows': rows, 'maze_cols': cols, 'run': run}
+    for column, key in columns.items():
+        row[column] = metrics.get(key, 0)
+    # Memory comes from a second, probed solve so tracemalloc does not skew the runtime
+    _, probe = probe_call(solver, maze_gen)
+    row.update(probe.metrics())
+    return row
+
+def run_experiments_search(num_runs, maze_sizes, csv_filename="maze_algorithms_results.csv", corpus_path=None,
+                           workers=1):
     """
     For every maze size, perform several trials (num_runs).
-    Every trial generates a new maze, conducts DFS, BFS, and A*.
-    and saves the results (runtime, states expanded, max memory usage, path length) to CSV.
+    Every trial generates a new maze, conducts DFS, BFS, A*, their bidirectional variants, JPS
+    and BFS/Dijkstra/A* on the contracted junction graph.
+    and saves the results (runtime, states expanded, max memory usage, path length) to CSV,
+    together with tracemalloc peak bytes, RSS delta and per-structure sizes from a probed re-run.
+    With corpus_path, the mazes are replayed from that corpus file if it exists,
+    or saved to it as they are generated.
+    With workers > 1 (or None for one per spare CPU), the (size, run, algorithm)
+    matrix runs on a process pool and rows are written as they finish.
         """
     fieldnames = [
         'algorithm', 'maze_rows', 'maze_cols', 'run',
-        'runtime', 'states_expanded', 'peak_memory_usage', 'path_length'
+        'runtime', 'graph_build_time', 'states_expanded', 'peak_memory_usage', 'path_length', 'jump_points',
+        'graph_nodes',
+        'tracemalloc_peak_bytes', 'rss_delta_bytes', 'frontier_bytes', 'visited_bytes', 'parents_bytes',
+        'g_score_bytes'
     ]
+    mazes = experiment_mazes(maze_sizes, num_runs, build_search_maze, corpus_path)
     with open(csv_filename, mode='w', newline='') as csv_file:
         writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
         writer.writeheader()
 
-        for rows, cols in maze_sizes:
-            for run in range(1, num_runs + 1):
-                print(f"\n--- Maze Size {rows}x{cols}, Run {run} ---")
-                # Generate a new maze instance
-                maze_gen = MazeGenerator(rows, cols)
-                maze_gen.generate_maze()
-                maze_gen.add_loops(probability=0.1)
+        def write_row(row):
+            writer.writerow(row)
+            csv_file.flush()
 
-                # 1) DFS metrics
-                path_dfs, metrics_dfs = solve_maze_dfs(maze_gen)
-                writer.writerow({
-                    'algorithm': 'DFS',
-                    'maze_rows': rows,
-                    'maze_cols': cols,
-                    'run': run,
-                    'runtime': metrics_dfs.get('runtime_dfs', 0),
-                    'states_expanded': metrics_dfs.get('states_expanded_dfs', 0),
-                    'peak_memory_usage': metrics_dfs.get('peak_memory_usage_dfs', 0),
-                    'path_length': metrics_dfs.get('path_length_dfs', 0)
-                })
+        if workers != 1:
+            run_parallel(mazes, list(SEARCH_ALGORITHMS), search_row, write_row, workers=workers)
+            return
 
-                # 2) BFS metrics
-                path_bfs, metrics_bfs = solve_maze_bfs(maze_gen)
-                writer.writerow({
-                    'algorithm': 'BFS',
-                    'maze_rows': rows,
-                    'maze_cols': cols,
-                    'run': run,
-                    'runtime': metrics_bfs.get('runtime_bfs', 0),
-                    'states_expanded': metrics_bfs.get('states_expanded_bfs', 0),
-                    'peak_memory_usage': metrics_bfs.get('peak_memory_usage_bfs', 0),
-                    'path_length': metrics_bfs.get('path_bfs_length', 0)
-                })
-
-                # 3) A* metrics
-                path_astar, metrics_astar = solve_maze_astar(maze_gen)
-                writer.writerow({
-                    'algorithm': 'A*',
-                    'maze_rows': rows,
-                    'maze_cols': cols,
-                    'run': run,
-                    'runtime': metrics_astar.get('runtime_astar', 0),
-                    'states_expanded': metrics_astar.get('states_expanded_astar', 0),
-                    'peak_memory_usage': metrics_astar.get('peak_memory_usage_astar', 0),
-                    'path_length': metrics_astar.get('path_length_astar', 0)
-                })
-
-                print(f"Finished run {run} for maze size {rows}x{cols}.")
+        for rows, cols, run, maze_gen in mazes:
+            print(f"\n--- Maze Size {rows}x{cols}, Run {run} ---")
+            for algorithm in SEARCH_ALGORITHMS:
+                write_row(search_row(algorithm, rows, cols, run, maze_gen))
+            print(f"Finished run {run} for maze size {rows}x{cols}.")
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Compare DFS, BFS, A*, bidirectional BFS/A*, JPS and junction-graph searches across maze sizes."
+    )
+    parser.add_argument(
+        "--corpus",
+        default=None,
+        help="Maze corpus file to replay, or to create if it does not exist"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes; 0 uses one per spare CPU (default: 1, serial)"
+    )
+    args = parser.parse_args()
+
     # Define different maze sizes (rows, cols)
     maze_sizes = [(10, 10), (30, 30), (50, 50), (100, 100), (150, 150), (200, 200)]
      # Number of runs per maze size
     num_runs = 3 
     csv_filename = "search_algorithms_results.csv"
-    run_experiments_search(num_runs, maze_sizes, csv_filename)
+    run_experiments_search(num_runs, maze_sizes, csv_filename, corpus_path=args.corpus,
+                           workers=args.workers or None)
     print(f"\nExperiment results saved to {csv_filename}")
 
 if __name__ == '__main__':
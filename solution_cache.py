@@ -0,0 +1,139 @@
+import os
+import sys
+import pickle
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from maze import PolicyGrid
+
+
+def estimate_size(obj):
+    """
+    Rough size in bytes of a solver result: NumPy arrays and PolicyGrid by nbytes,
+    containers by their own size plus their items. Large dicts and lists are
+    estimated from their first entry instead of being walked.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + sys.getsizeof(obj)
+    if isinstance(obj, PolicyGrid):
+        return sys.getsizeof(obj) + estimate_size(obj.actions)
+    if isinstance(obj, dict):
+        if not obj:
+            return sys.getsizeof(obj)
+        key, value = next(iter(obj.items()))
+        return sys.getsizeof(obj) + len(obj) * (estimate_size(key) + estimate_size(value))
+    if isinstance(obj, (list, tuple)):
+        if len(obj) > 64:
+            return sys.getsizeof(obj) + len(obj) * estimate_size(obj[0])
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class SolutionCache:
+    """
+    Content-addressed cache of solver results.
+    Keys hash the maze grid, start, goal, the solver and its parameters (gamma,
+    theta, ...), so the same maze solved again hits the cache even through a
+    fresh MazeGenerator or a corpus reload. Entries are kept in memory up to
+    max_bytes with least-recently-used eviction. With directory set, every entry
+    is also pickled there, and memory misses fall back to disk.
+    Cached results are shared between callers and must be treated as read-only.
+    """
+    def __init__(self, max_bytes=256 * 1024 * 1024, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(maze_gen, solver_name, params):
+        """Hex key for one (maze, start, goal, solver, parameters) query."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(maze_gen.fingerprint().encode())
+        digest.update(repr((tuple(maze_gen.start), tuple(maze_gen.goal), solver_name,
+                            sorted(params.items()))).encode())
+        return digest.hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.directory is not None and os.path.exists(self._disk_path(key)):
+            with open(self._disk_path(key), "rb") as f:
+                value = pickle.load(f)
+            self.disk_hits += 1
+            self._store(key, value)
+            return value
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """Cache value under key, writing it through to disk when a directory is set."""
+        if self.directory is not None:
+            tmp_path = self._disk_path(key) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._disk_path(key))
+        self._store(key, value)
+
+    def _store(self, key, value):
+        if key in self.entries:
+            self.current_bytes -= self.sizes.pop(key)
+            del self.entries[key]
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            # Too large for the memory tier; it can still be served from disk
+            return
+        self.entries[key] = value
+        self.sizes[key] = size
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            old_key, _ = self.entries.popitem(last=False)
+            self.current_bytes -= self.sizes.pop(old_key)
+            self.evictions += 1
+
+    def clear(self):
+        """Empty the memory tier; files on disk are kept."""
+        self.entries.clear()
+        self.sizes.clear()
+        self.current_bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def cached_solve(cache, solver, maze_gen, **params):
+    """
+    Call solver(maze_gen, **params) through the cache.
+    Works with every solve_maze_* function: search solvers cache (path, metrics)
+    and the MDP solvers cache (V, policy, states_expanded).
+    """
+    solver_name = f"{solver.__module__}.{solver.__qualname__}"
+    key = cache.make_key(maze_gen, solver_name, params)
+    result = cache.get(key)
+    if result is None:
+        result = solver(maze_gen, **params)
+        cache.put(key, result)
+    return result
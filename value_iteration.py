@@ -1,56 +1,242 @@
-from maze import MazeGenerator, extract_path
+from maze import (MazeGenerator, PolicyGrid, NO_ACTION, follow_policy, greedy_path_gap, greedy_actions,
+                  value_tie_tolerance)
+from memory_probe import MemoryProbe
+import numpy as np
 import matplotlib.pyplot as plt
 import argparse
+import heapq
 import time
 
-def solve_maze_value_iteration(generator, gamma=0.9, theta=1e-4, max_iter=5000):
+VALUE_ITERATION_MODES = ("jacobi", "gauss-seidel", "prioritized")
+
+def neighbor_table(rows, cols, masks):
+    """
+    Flat ids of the U, D, L, R neighbors of every cell, shape (4, rows * cols).
+    Blocked moves point at the sentinel id rows * cols, whose value is kept at -inf.
+    """
+    num_cells = rows * cols
+    ids = np.arange(num_cells)
+    table = np.stack([ids - cols, ids + cols, ids - 1, ids + 1])
+    table[~masks.reshape(4, -1)] = num_cells
+    return table
+
+def jacobi_backup(values, states, state_neighbors, discount, reward=-1.0):
+    """
+    One synchronous Bellman backup of states (flat ids) with the given reward and
+    discount per move. values is flat with the -inf sentinel at the end and is
+    updated in place; state_neighbors is the neighbor_table columns of states.
+    Returns (q_values, best_action, delta): the (4, states) backups of every move,
+    the first best move per state (argmax) and the largest value change.
+    """
+    q_values = values[state_neighbors]
+    q_values *= discount
+    q_values += reward
+    best_action = np.argmax(q_values, axis=0)
+    best_value = q_values[best_action, np.arange(states.size)]
+    delta = np.max(np.abs(best_value - values[states]), initial=0.0)
+    values[states] = best_value
+    return q_values, best_action, delta
+
+def _gauss_seidel_sweeps(values, states, table, gamma, theta, max_iter, trace=None):
+    """
+    In-place Gauss-Seidel backups of the goal-reachable states, ordered by BFS
+    distance from the goal. values is flat with the -inf sentinel at the end.
+    Neighboring cells always sit in adjacent BFS layers (the grid is bipartite), so
+    backing up one layer at a time with numpy is exactly a cell-by-cell in-place
+    sweep in that order. A layer is only revisited after a neighboring layer moved
+    by theta or more, so settled parts of the maze stop costing evaluations.
+    trace, when a list, receives the largest change of every sweep.
+    Returns the number of state evaluations.
+    """
+    # initialize_values_bfs leaves -distance on every reachable cell
+    distance = -values[states]
+    order = np.argsort(distance, kind="stable")
+    layer_cells = states[order]
+    _, layer_starts = np.unique(distance[order], return_index=True)
+    groups = np.split(layer_cells, layer_starts[1:]) if layer_cells.size else []
+    num_layers = len(groups)
+
+    dirty = [True] * num_layers
+    states_expanded = 0
+    for _ in range(max_iter):
+        if not any(dirty):
+            break
+        sweep_delta = 0.0
+        for g, group in enumerate(groups):
+            if not dirty[g]:
+                continue
+            dirty[g] = False
+            best = np.max(values[table[:, group]], axis=0) * gamma - 1
+            delta = np.max(np.abs(best - values[group]), initial=0.0)
+            values[group] = best
+            states_expanded += group.size
+            sweep_delta = max(sweep_delta, delta)
+            if delta >= theta:
+                if g > 0:
+                    dirty[g - 1] = True
+                if g + 1 < num_layers:
+                    dirty[g + 1] = True
+        if trace is not None:
+            trace.append(float(sweep_delta))
+    return states_expanded
+
+def _prioritized_sweeping(generator, values, states, table, gamma, theta, max_iter, trace=None):
+    """
+    Asynchronous backups driven by a priority queue: states restart from the -9999
+    floor and the state whose backup max_a Q(s, a) is largest is backed up next,
+    after which its neighbors' backups are raised and requeued. While a state sits
+    on the floor its Bellman error is that backup plus 9999, so this is the largest
+    error first, but ranked on the backup itself: far from the goal the backups
+    differ by less than the precision left in 9999 + V, and ranking on the error
+    backed up cells before their best neighbor was settled. Backups are
+    non-increasing in queue order, so, as in Dijkstra, every state is backed up
+    once with its final value; equal backups (values saturated at -1 / (1 - gamma))
+    go nearest to the goal first. Only states whose first error reaches theta are
+    queued, and at most max_iter backups per state are made.
+    values is flat with the -inf sentinel at the end and is updated in place.
+    trace, when a list, receives the error of every len(states)-th backup.
+    Returns the number of state evaluations (backups plus neighbor updates).
+    """
+    num_cells = values.size - 1
+    values[states] = -9999.0
+    backed_up = np.max(values[table[:, states]], axis=0) * gamma - 1
+    states_expanded = int(states.size)
+
+    graph = generator.neighbor_graph()
+    offsets = graph.offsets_list
+    neighbors = graph.neighbors_list
+    distance = generator.goal_distances().ravel().tolist()
+    values_list = values[:num_cells].tolist()
+    # 0 for cells that are not states, 1 for queued states, 2 once backed up
+    status = bytearray(num_cells)
+    # Backup each queued state is currently queued with
+    priority = [0.0] * num_cells
+    queue = []
+    for cell, value in zip(states.tolist(), backed_up.tolist()):
+        status[cell] = 1
+        priority[cell] = value
+        if value - values_list[cell] >= theta:
+            queue.append((-value, distance[cell], cell))
+    heapq.heapify(queue)
+
+    num_states = int(states.size)
+    backups = 0
+    while queue and backups < max_iter * num_states:
+        negative_value, _, cell = heapq.heappop(queue)
+        if status[cell] != 1 or -negative_value != priority[cell]:
+            continue
+        status[cell] = 2
+        error = -negative_value - values_list[cell]
+        values_list[cell] = -negative_value
+        states_expanded += 1
+        backups += 1
+        if trace is not None and backups % num_states == 0:
+            trace.append(error)
+        # Only this cell changed, so each neighbor's backup is the larger of its old one and this move
+        candidate = values_list[cell] * gamma - 1
+        for neighbor in neighbors[offsets[cell]:offsets[cell + 1]]:
+            if status[neighbor] != 1:
+                continue
+            states_expanded += 1
+            if candidate > priority[neighbor]:
+                priority[neighbor] = candidate
+                heapq.heappush(queue, (-candidate, distance[neighbor], neighbor))
+    values[:num_cells] = values_list
+    return states_expanded
+
+def solve_maze_value_iteration(generator, gamma=0.9, theta=1e-4, max_iter=5000, probe=None, mode="jacobi",
+                               trace=None, path_tolerance=None):
     """
     Solve the maze with Value Iteration.
+    Only the goal-reachable open cells (MazeGenerator.goal_component) are backed up,
+    through a compact list of their flat ids and a table of their neighbors' ids.
+    Walls, the goal and cells cut off from the goal keep their initialize_values_bfs
+    value (-9999 when out of reach) and get no action.
+    mode picks how backups are scheduled:
+      'jacobi'       -> each sweep is a synchronous Bellman backup of all reachable states.
+      'gauss-seidel' -> in-place sweeps in BFS order from the goal that skip settled layers.
+      'prioritized'  -> prioritized sweeping on a priority queue of Bellman errors.
+    The asynchronous modes read the policy off the converged V in one greedy pass,
+    which is not counted in states_expanded_value.
+    Far from the goal the values converge to -1 / (1 - gamma) and round to the same
+    number, so actions within value_tie_tolerance of the best are ties, broken
+    toward the neighbor with the fewest BFS moves to the goal (maze.greedy_actions).
+    trace, when a list, receives the residual (largest value change) of every sweep;
+    see _prioritized_sweeping for what it holds in that mode.
+    path_tolerance, when set, stops the Jacobi sweeps early once the greedy path
+    from start reaches the goal, is the same as after the previous sweep, and is
+    provably within path_tolerance of the optimal discounted return
+    (greedy_path_gap with the error bound gamma * delta / (1 - gamma)).
+    With a memory_probe.MemoryProbe as probe, the sizes of V, the per-action
+    q_values buffer and the policy are recorded.
     Returns:
     V: 2D numpy value estimates array.
-    policy: Dict mapping (row, col) -> action.
+    policy: PolicyGrid of int8 action codes, also readable as a (row, col) -> action mapping.
     states_expanded_value: Number of state evaluations.
     """
-    actions = {'U': (-1, 0), 'D': (1, 0), 'L': (0, -1), 'R': (0, 1)}
-    
-    V = generator.initialize_values_bfs()
+    if mode not in VALUE_ITERATION_MODES:
+        raise ValueError(f"Unknown value iteration mode: {mode!r}")
+    rows, cols = generator.rows, generator.cols
+    num_cells = rows * cols
+    start_id = generator.start[0] * cols + generator.start[1]
+    goal_id = generator.goal[0] * cols + generator.goal[1]
+
+    dist = generator.goal_distances()
+    V = generator.initialize_values_bfs(dist)
     V[generator.goal] = 0.0
-    # Create a 2D array to hold policy actions
-    policy_arr_value = [['' for _ in range(generator.cols)] for _ in range(generator.rows)]
-    
+    # Open neighbors in U, D, L, R order; moves into walls or off the grid are invalid
+    masks = generator.open_neighbor_masks()
+    # Every reachable state has an open neighbor (its BFS parent), so all of them can move
+    states = generator.goal_component(dist)
+    num_states = int(states.size)
+    table = neighbor_table(rows, cols, masks)
+    state_neighbors = table[:, states]
+    # Flat values with the -inf sentinel that blocked moves point at
+    values = np.empty(num_cells + 1)
+    values[:num_cells] = V.ravel()
+    values[num_cells] = -np.inf
+    # Action codes in U, D, L, R order, NO_ACTION for cells that are never backed up
+    policy_idx = np.full(num_cells, NO_ACTION, dtype=np.int8)
+
     states_expanded_value = 0
-    for _ in range(max_iter):
-        delta = 0
-        new_V = V.copy()
-        for i in range(generator.rows):
-            for j in range(generator.cols):
-                # Skip walls and the goal
-                if generator.maze[i, j] == 1 or (i, j) == generator.goal:
-                    continue
-                # Count this state evaluation
-                states_expanded_value += 1  
-                q_values = {}
-                for a, (di, dj) in actions.items():
-                    ni, nj = i + di, j + dj
-                    if 0 <= ni < generator.rows and 0 <= nj < generator.cols and generator.maze[ni, nj] == 0:
-                        val = -1 + gamma * V[ni, nj]
-                    else:
-                        val = float('-inf')
-                    q_values[a] = val
-                best_action = max(q_values, key=q_values.get)
-                best_value = q_values[best_action]
-                if best_value == float('-inf'):
-                    new_V[i, j] = V[i, j]
-                    policy_arr_value[i][j] = ''
-                else:
-                    new_V[i, j] = best_value
-                    policy_arr_value[i][j] = best_action
-                    delta = max(delta, abs(best_value - V[i, j]))
-        V = new_V
-        if delta < theta:
-            break
-    
-    policy = {(i, j): policy_arr_value[i][j] for i in range(generator.rows) for j in range(generator.cols)}
+    q_values = None
+    if mode == "gauss-seidel":
+        states_expanded_value = _gauss_seidel_sweeps(values, states, table, gamma, theta, max_iter, trace)
+    elif mode == "prioritized":
+        states_expanded_value = _prioritized_sweeping(generator, values, states, table, gamma, theta,
+                                                      max_iter, trace)
+    else:
+        previous_path = None
+        for _ in range(max_iter):
+            # q_values[k, s] is the backup of the k-th move of state s
+            q_values, best_action, delta = jacobi_backup(values, states, state_neighbors, gamma)
+            states_expanded_value += num_states
+            if trace is not None:
+                trace.append(float(delta))
+            if delta < theta:
+                break
+            if path_tolerance is not None:
+                successors = np.full(num_cells, -1)
+                successors[states] = state_neighbors[best_action, np.arange(num_states)]
+                path, gap = greedy_path_gap(successors, start_id, goal_id, values[start_id],
+                                            gamma * delta / (1 - gamma), gamma)
+                if path is not None and path == previous_path and gap <= path_tolerance:
+                    break
+                previous_path = path
+    if q_values is None:
+        # Greedy pass on the converged values, not counted in states_expanded_value
+        q_values = values[state_neighbors] * gamma - 1
+
+    # Moves to the goal from every state's neighbors; blocked moves rank last
+    successor_distances = np.append(dist.ravel(), -1)[state_neighbors]
+    policy_idx[states] = greedy_actions(q_values, successor_distances, value_tie_tolerance(gamma))
+
+    V = values[:num_cells].reshape(rows, cols)
+    policy = PolicyGrid(policy_idx.reshape(rows, cols))
+    if probe is not None:
+        probe.record("V", V)
+        probe.record("q_values", q_values)
+        probe.record("policy", policy)
     return V, policy, states_expanded_value
 
 def main():
@@ -69,40 +255,57 @@ def main():
         default=100,
         help="Number of columns for the maze (default: 100)"
     )
+    parser.add_argument(
+        "--mode",
+        choices=VALUE_ITERATION_MODES,
+        default="jacobi",
+        help="Backup schedule: synchronous sweeps, Gauss-Seidel in BFS order, or prioritized sweeping (default: jacobi)"
+    )
+    parser.add_argument(
+        "--path-tolerance",
+        type=float,
+        default=None,
+        help="Stop once the greedy path is stable and within this much of the optimal return (default: off)"
+    )
     args = parser.parse_args()
 
     generator = MazeGenerator(args.rows, args.cols)
     generator.generate_maze()
-    generator.add_loops(probability=0.1)
-    
-    # Ensure a path exists from start to goal.
-    attempts = 0
-    while not generator.is_path_to_goal() and attempts < 10:
-        generator.add_loops(probability=0.2)
-        attempts += 1
-    if not generator.is_path_to_goal():
-        print("Warning: Maze is not solvable from start to goal.")
-        return
+    # 10% extra loops, plus the fewest walls that join start and goal
+    generator.add_loops(probability=0.1, connect=True)
 
     # Solve the maze and track runtime_value.
-    start_time = time.time()
-    V, policy, states_expanded_value = solve_maze_value_iteration(generator, gamma=0.9, theta=1e-4, max_iter=5000)
-    runtime_value = time.time() - start_time
+    trace = []
+    start_time = time.perf_counter()
+    V, policy, states_expanded_value = solve_maze_value_iteration(
+        generator, gamma=0.9, theta=1e-4, max_iter=5000, mode=args.mode, trace=trace,
+        path_tolerance=args.path_tolerance
+    )
+    runtime_value = time.perf_counter() - start_time
 
     # Extract the solution path
-    policy_dict = {(i, j): policy[(i, j)] for i in range(generator.rows) for j in range(generator.cols)}
-    solution = extract_path(policy_dict, generator.start, generator.goal)
+    solution, termination = follow_policy(policy, generator.start, generator.goal, maze=generator.maze)
     
-    # Define and print evaluation metrics:
-    peak_memory_value = generator.rows * generator.cols  # Placeholder metric for peak memory usage
+    # Measure memory on a second, probed solve so tracemalloc does not skew runtime_value
+    probe = MemoryProbe()
+    with probe:
+        solve_maze_value_iteration(generator, gamma=0.9, theta=1e-4, max_iter=5000, probe=probe, mode=args.mode,
+                                   path_tolerance=args.path_tolerance)
     
    
     print("Evaluation Metrics:")
     print(f"runtime_value (seconds): {runtime_value:.4f}")
     print(f"States Expanded: {states_expanded_value}")
-    print(f"Peak Memory Usage (cells): {peak_memory_value}")
+    if trace:
+        print(f"Residual trace: {len(trace)} entries, first {trace[0]:.4g}, last {trace[-1]:.4g}")
+    print(f"Peak Memory Usage (bytes): {probe.peak_bytes}")
+    print(f"RSS Delta (bytes): {probe.rss_delta_bytes}")
+    for name, size in probe.structures.items():
+        print(f"  {name} (bytes): {size}")
 
     print("Solution path length (Value Iteration):", len(solution))
+    if termination != "goal":
+        print(f"Warning: the policy path stopped before the goal ({termination}).")
     generator.visualize_maze(solution=solution, title="MDP Value Iteration Path")
     plt.show()
 